@@ -0,0 +1,284 @@
+"""
+AES in ECB, CBC and CTR modes, built on the ECB cipher of PyCryptodome
+PyCryptodome is imported where a cipher or padding is first needed, keeping this module cheap to import.
+@author: Lawrence Arscott
+"""
+
+##
+from functools import lru_cache
+
+# My files
+from EasyByte import EasyByte
+from ByteUtils import xorbytes, rand_bytes, empty_bytes
+
+BLOCK_SIZE = 16  # AES block size in bytes
+
+@lru_cache(maxsize=256)
+def ecb_cipher(key: bytes):
+    # ECB cipher under key, shared by every AESCode using that key
+    # ECB keeps no state from one block to the next, so a single expanded key serves any number of messages
+    from Crypto.Cipher import AES
+    return AES.new(key, AES.MODE_ECB)
+
+class AESCode:
+    """Class for the manipulation of messages encoded with AES
+
+    Attributes
+    ----------
+    easybyte : EasyByte
+        See class EasyByte
+
+    cipher : Crypto.Cipher._mode_ecb.EcbMode
+        ECB Cipher, generated by key, to encode/decode message contained in 'code'
+
+    iv : bytes
+        Initialisation vector, used in CBC mode
+
+    Parameters
+    ----------
+    code : str or .txt file
+        Message. May be passed as a .txt file
+        May be plain text or encrypted
+        Purpose of the class is to then encrypt or decrypt 'code'
+    base : str, optional
+        Base in which the code is encoded.
+        If not given, it is assumed the code is in byte format.
+        May otherwise be 'text' for text, 'hex' for hexadecimal or 'b64' for base64
+    """
+    def __init__(self, code=b'', base=None, key=None, iv=None, nonce=None):
+        self.easybyte = EasyByte(code, base)
+        self.cipher = None
+        self.iv = None
+        self.nonce = None
+        if key:
+            self.cipher = self.gen_cipher(key)
+        if iv:
+            self.iv = self.gen_iv(iv)
+        if nonce:
+            self.nonce = self.gen_nonce(nonce)
+
+    @classmethod
+    def from_bytes(cls, b: bytes, key: bytes = None, iv: bytes = None, nonce: bytes = None):
+        # AESCode holding the byte string b, under key, iv and nonce given as bytes
+        # Skips the file check and format conversion of EasyByte and the options of gen_cipher, gen_iv
+        # and gen_nonce, for the many messages of a session under the same key
+        code = cls.__new__(cls)
+        code.easybyte = EasyByte.from_bytes(b)
+        code.cipher = ecb_cipher(key) if key else None
+        code.iv = iv
+        code.nonce = nonce
+
+        return code
+
+    def gen_cipher(self, key):
+        # Generates cipher according to key
+        # May request random key by entering key as the string 'random'
+        # Ciphers under given keys come from the cache of ecb_cipher, random keys are used once and left out
+        if key == 'random':
+            from Crypto.Cipher import AES
+            return AES.new(rand_bytes(16), AES.MODE_ECB)
+        elif type(key) == bytes:
+            return ecb_cipher(key)
+        else:
+            raise Exception('TypeError')
+
+    def gen_iv(self, iv):
+        if iv == 'random':
+            iv = rand_bytes(16)
+        elif type(iv) == bytes:
+            pass
+        else:
+            raise Exception('TypeError')
+        return iv
+
+    def gen_nonce(self, nonce):
+        # Generates nonce
+        # If an integer is passed, nonce will be an empty byte of that length (composed of b'\x00')
+        if type(nonce) == int:
+            return empty_bytes(nonce)
+        elif type(nonce) == bytes:
+            return nonce
+        else:
+            raise Exception('TypeError')
+
+    def ecb_solve(self, letsunpad=True):
+        # Returns message decrypted according to self.cipher
+        from Crypto.Util.Padding import unpad
+        ans = self.cipher.decrypt(self.easybyte.b)
+
+        # Unpad removes padding originally added to make the message a multiple of 128 bits
+        if letsunpad:
+            ans = unpad(ans, BLOCK_SIZE)
+
+        return ans
+
+    def block_list(self, n=16):
+        # Returns list of code byte seperated into bytes of length n
+        blen = len(self.easybyte.b)
+        assert blen % n == 0
+        nblocks = blen//n
+        return [EasyByte.from_bytes(self.easybyte.b[n*i:n*i + n]) for i in range(nblocks)]
+
+    def repeat(self):
+        # Counts how many times blocks repeat when code byte is separated into blocks
+        count = 0
+        blocks = self.block_list()
+        for i in range(len(blocks) - 1):
+            for j in range(i + 1, len(blocks)):
+                if blocks[i].b == blocks[j].b:
+                    count += 1
+        return count
+
+    def ecb_encrypt(self, padding=True):
+        # Encodes message according to key
+        from Crypto.Util.Padding import pad
+        if padding:
+            self.easybyte.b = pad(self.easybyte.b, BLOCK_SIZE)
+        self.easybyte.b = self.cipher.encrypt(self.easybyte.b)
+        return self
+
+    def cbc_encrypt(self):
+        # Encrypt according to CBC cipher generated by key, iv
+        from Crypto.Util.Padding import pad
+        self.easybyte.b = pad(self.easybyte.b, BLOCK_SIZE)  # pad
+        blocks = self.block_list()
+        prev_cipher_block = self.iv
+        gibberish = b''
+        for i in range(len(blocks)):
+            new_easybyte = blocks[i].xor(prev_cipher_block)
+            new_code = self.cipher.encrypt(new_easybyte.b)
+            gibberish += new_code
+            prev_cipher_block = new_code
+        self.easybyte = EasyByte.from_bytes(gibberish)
+        return self
+
+    def cbc_solve(self):
+        # Decrypt according to cbc cipher generated by self.key and self.iv
+        from Crypto.Util.Padding import unpad
+        blocks = self.block_list()
+        sol = b''
+        for i in range(1, len(blocks)):
+            deciphered = self.cipher.decrypt(blocks[i].b)
+            unxored = xorbytes(deciphered, blocks[i - 1].b)
+            sol += unxored
+        pos1deciphered = self.cipher.decrypt(blocks[0].b)
+        pos1unxored = xorbytes(pos1deciphered, self.iv)
+        sol = pos1unxored + sol
+        sol = unpad(sol, BLOCK_SIZE)
+
+        return sol
+
+    def ctr_stream(self):
+        # Generates the ctr stream from self.nonce
+
+        # start counter at 0
+        counter = 0
+
+        # In the challenge, little-endian seems to be used
+        # so 1 is b'\x01\x00\x00...'
+        # nonce + counter should have length blocksize
+        while True:
+            bytes_counter = bytearray(counter.to_bytes(16 - len(self.nonce), byteorder='little'))
+
+            # Yield (nonce|counter)
+            yield self.nonce + bytes_counter
+
+            counter += 1  # Up the counter for next block in stream
+
+    def ctr(self):
+        # CTR encrypts/decrypts.
+        # Written as if for encryption, but is the same for decryption.
+        from Crypto.Util.Padding import pad
+        extra_byte_n = len(self.easybyte.b) % 16  # Number of bytes short of full block
+
+        # If required, pad. Padding bytes will be removed manually at the end.
+        if extra_byte_n:
+            self.easybyte.b = pad(self.easybyte.b, BLOCK_SIZE)
+
+        # Obtain stream
+        stream = self.ctr_stream()
+
+        encrypted = b''  # byte string to add ciphertext as we go
+
+        blocks = self.block_list()
+        for block in blocks:
+            # Encrypt (nonce|counter) according to AES cipher
+            to_encrypt = next(stream)
+
+            to_xor = self.cipher.encrypt(to_encrypt)
+
+            # XOR result with plaintext and append to ciphertext
+            encrypted += block.xor(to_xor).b
+
+        self.easybyte.b = encrypted[:-extra_byte_n]  # Remove padding bytes before returning
+
+        return self
+
+    def gen_ecb_oracle(self, bstr_fun: callable):
+        # Generates an oracle function according to bstr_fun, see below
+        from Crypto.Util.Padding import pad
+        def ecb_oracle(bstring: bytes):
+            # First manipulates bstring according to bstr_fun
+            # Then ecb encrypts according to cypher
+            to_be_encrypted = pad(bstr_fun(bstring), BLOCK_SIZE)
+            return self.cipher.encrypt(to_be_encrypted)
+
+        return ecb_oracle
+
+    def gen_cbc_oracle(self, bstr_fun: callable):
+        # Generates an oracle function according to bstr_fun, see below
+
+        def cbc_oracle(bstring: bytes):
+            # First manipulates bstring according to bstr_fun
+            # Then cbc encrypts according to cypher
+            self.easybyte.b = bstr_fun(bstring)
+            return self.cbc_encrypt().easybyte.b
+
+        return cbc_oracle
+
+    def gen_cbc_oracle_rand(self, rand_byte_gen_fun: callable):
+        # Define a cbc oracle that encrypts a random byte string generated by fun
+        def oracle():
+            self.easybyte = rand_byte_gen_fun()
+            return self.cbc_encrypt().easybyte.b
+
+        return oracle
+
+    def gen_ctr_oracle(self, bstr_fun: callable):
+        # Generates an oracle function according to bstr_fun, see below
+
+        def ctr_oracle(bstring: bytes):
+            # First manipulates bstring according to bstr_fun
+            # Then ctr encrypts according to self.nonce
+            self.easybyte.b = bstr_fun(bstring)
+            return self.ctr().easybyte.b
+
+        return ctr_oracle
+
+class ListECB:
+    """Class to deal with multiple messages, passed as lines in a .txt file
+
+    Attributes
+    ----------
+    codes : list of AESCode
+        See class AESCode
+
+    Parameters
+    ----------
+    code_file : .txt file
+        Message, passed as a .txt file
+    base : str, optional
+        Base in which the code is encoded.
+        If not given, it is assumed the code is in byte format.
+        May otherwise be 'text' for text, 'hex' for hexadecimal or 'b64' for base64
+    """
+    def __init__(self, code_file, base=None):
+        with open(code_file) as file:
+            self.codes = [AESCode(line, base) for line in file]
+
+    def simple_repeat_test(self):
+        # Tests each byte array in the list self.codes for repeats when split into blocks
+        for k in range(len(self.codes)):
+            repeat_k = self.codes[k].repeat()
+            if repeat_k != 0:
+                print(f'Code {k} has {repeat_k} repeats')
@@ -0,0 +1,63 @@
+"""
+Benchmark of EGroup scaling on the challenge 59 curve:
+affine double-and-add and sliding window, each operation paying for a modular inversion,
+against the Montgomery ladder in Jacobian coordinates (EGroup.scale),
+and batches of additions and scalings sharing one modular inversion per step
+"""
+
+import os
+import sys
+import timeit
+from random import Random
+
+# Run as a script from anywhere, the modules benchmarked are in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Group import Group, EGroup
+
+p = 233970423115425145524320034830162017933
+a = 233970423115425145524320034830162017933 - 95051
+b = 11279326
+g = (182, 85518893674295321206118380980485522083)
+q = 29246302889428143187362802287225875743
+
+def double_and_add(group, pt, k):
+    # Original Group.scale
+    result = group.id
+    while k > 0:
+        if k % 2 == 1:
+            result = group.add(result, pt)
+        pt = group.add(pt, pt)
+        k = k >> 1
+
+    return result
+
+def main(number=20):
+    curve = EGroup(p, a, b)
+    scalars = [Random(0).randrange(1, q) for _ in range(number)]
+
+    for method, fun in [('affine double-and-add', lambda k: double_and_add(curve, g, k)),
+                        ('affine sliding window', lambda k: Group.scale(curve, g, k)),
+                        ('Jacobian ladder', lambda k: curve.scale(g, k))]:
+        seconds = timeit.timeit(lambda: [fun(k) for k in scalars], number=1) / number
+        print(f'{method}: {seconds * 1e3:.3f} ms')
+
+    # Batches of independent additions and scalings
+    rand = Random(1)
+    n_batch = 4096
+    pts1 = curve.scale_many([g] * n_batch, [rand.randrange(1, q) for _ in range(n_batch)])
+    pts2 = curve.scale_many([g] * n_batch, [rand.randrange(1, q) for _ in range(n_batch)])
+
+    seconds = timeit.timeit(lambda: [curve.add(pt1, pt2) for pt1, pt2 in zip(pts1, pts2)], number=1)
+    print(f'{n_batch} additions, one at a time: {seconds * 1e3:.1f} ms')
+    seconds = timeit.timeit(lambda: curve.add_many(pts1, pts2), number=1)
+    print(f'{n_batch} additions, add_many: {seconds * 1e3:.1f} ms')
+
+    ks = [rand.randrange(1, q) for _ in range(256)]
+    seconds = timeit.timeit(lambda: [curve.scale(pt, k) for pt, k in zip(pts1, ks)], number=1)
+    print(f'{len(ks)} scalings, one at a time: {seconds * 1e3:.1f} ms')
+    seconds = timeit.timeit(lambda: curve.scale_many(pts1[:len(ks)], ks), number=1)
+    print(f'{len(ks)} scalings, scale_many: {seconds * 1e3:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark of Group.scale against the original double-and-add
+ModP with the challenge 58 parameters, EGroup with the challenge 59 curve,
+and their cyclic groups, which look powers of the generator up in a table
+"""
+
+import os
+import sys
+import timeit
+from random import Random
+
+# Run as a script from anywhere, the modules benchmarked are in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Group import ModP, EGroup, CycGroup
+
+# Challenge 58
+mod_p = int('DB020645333C52A8D8BD194950CBD48DDF752BAE8F346150C6410DBA6BEFDBC6CF93D7CFC4568FFB017B2'
+            '8BEF26242493C606596B7FF8625055F73E888B86117', 16)
+mod_g = int('BE4ED76592B0FC7A8F2A160840C664BD8A4E0DFF8DED0B2ED0843714C3B7BD12EE50CB56A829A999CA957'
+            '14A520BA0C080E7A5866309E4BBCCE1F897EAFB77D', 16)
+mod_q = 335062023296420808191071248367701059461
+
+# Challenge 59
+curve_p = 233970423115425145524320034830162017933
+curve_a = 233970423115425145524320034830162017933 - 95051
+curve_b = 11279326
+curve_g = (182, 85518893674295321206118380980485522083)
+curve_q = 29246302889428143187362802287225875743
+
+def double_and_add(group, g, k):
+    # Original Group.scale
+    result = group.id
+    x = g
+    while k > 0:
+        if k % 2 == 1:
+            result = group.add(result, x)
+        x = group.add(x, x)
+        k = k >> 1
+
+    return result
+
+def main(number=20):
+    rand = Random(0)
+
+    cases = [('ModP', ModP(mod_p), mod_g, mod_q),
+             ('EGroup', EGroup(curve_p, curve_a, curve_b), curve_g, curve_q)]
+
+    for name, group, g, q in cases:
+        scalars = [rand.randrange(1, q) for _ in range(number)]
+        cyc = CycGroup.from_generator(group, g, q)
+        cyc.scale(g, q - 1)  # Build the table beforehand
+
+        for method, fun in [('double-and-add', lambda k: double_and_add(group, g, k)),
+                            ('scale', lambda k: group.scale(g, k)),
+                            ('fixed base', lambda k: cyc.scale(g, k))]:
+            seconds = timeit.timeit(lambda: [fun(k) for k in scalars], number=1) / number
+            print(f'{name}, {method}: {seconds * 1e3:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark of DH.power_mod against the original square-and-multiply loop
+Base g = 2 over the 1536-bit SRP modulus, as in DH.Server and DH.Client
+"""
+
+import os
+import sys
+import timeit
+from random import Random
+
+# Run as a script from anywhere, the modules benchmarked are in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from DH import power_mod, fixed_base
+
+N = int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024e088a67cc'
+        '74020bbea63b139b22514a08798e3404ddef9519b3cd3a431b302b0a6df25f'
+        '14374fe1356d6d51c245e485b576625e7ec6f44c42e9a637ed6b0bff5cb6f4'
+        '06b7edee386bfb5a899fa5ae9f24117c4b1fe649286651ece45b3dc2007cb8'
+        'a163bf0598da48361c55d39a69163fa8fd24cf5f83655d23dca3ad961c62f3'
+        '56208552bb9ed529077096966d670c354e4abc9804f1746c08ca237327ffff'
+        'ffffffffffff', 16)
+g = 2
+
+def loop_power_mod(b, e, m):
+    # Original right-to-left binary exponentiation
+    x = 1
+    while e > 0:
+        b, e, x = (
+            b * b % m,
+            e // 2,
+            b * x % m if e % 2 else x
+        )
+
+    return x
+
+def main(number=20):
+    rand = Random(0)
+
+    # 256-bit exponents as in gen_v (x is a SHA-256 hash), 1536-bit as in Server.__init__
+    for bits in [256, 1536]:
+        exponents = [rand.getrandbits(bits) for _ in range(number)]
+
+        # Build the table beforehand, it is shared by every call with base g
+        fixed_base(g, N).power(exponents[0])
+
+        for name, fun in [('loop', lambda e: loop_power_mod(g, e, N)),
+                          ('pow', lambda e: power_mod(g, e, N)),
+                          ('fixed base', lambda e: power_mod(g, e, N, fixed=True))]:
+            seconds = timeit.timeit(lambda: [fun(e) for e in exponents], number=1) / number
+            print(f'{bits}-bit exponent, {name}: {seconds * 1e3:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,395 @@
+"""
+Benchmarks of the project's hot primitives, with results written as JSON
+so that they can be compared across commits:
+    python Benchmarks/run_benchmarks.py --out before.json
+    python Benchmarks/run_benchmarks.py --out after.json --compare before.json
+Inputs come from fixed seeds, and each case runs in its own process with a timeout.
+AES at 64 MB is left out unless --large is given: CBC and CTR build their output a block
+at a time, so their running time grows with the square of the message length.
+"""
+
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import subprocess
+import sys
+import time
+import timeit
+from random import Random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SIZES = {'1KB': 1 << 10, '1MB': 1 << 20}
+LARGE_SIZES = {'64MB': 1 << 26}
+
+# Challenge 57 group
+P_57 = int('8977C3217DA1F838B8D24B4A790DE8FC8E35AD5483E463028EF9BBF9AF23A9BD1231EBA9A'
+           'C7E44363D8311D610B09AA224A023268EE8A60AC484FD9381962563', 16)
+G_57 = int('572AFF4A93EC6214C1036C62E1818FE5E4E1D6DB635C1B12D9572203C47D241A0E543A89B'
+           '0B12BA61062411FCF3D29C6AB8C3CE6DAC7D2C9F7F0EBD3B7878AAF', 16)
+Q_57 = 236234353446506858198510045061214171961
+FACTORS_57 = [2, 5, 109, 7963, 8539, 20641, 38833, 39341, 46337, 51977, 54319, 57529]
+
+# Challenge 58 group
+P_58 = int('DB020645333C52A8D8BD194950CBD48DDF752BAE8F346150C6410DBA6BEFDBC6CF93D7CFC4568FFB017B2'
+           '8BEF26242493C606596B7FF8625055F73E888B86117', 16)
+G_58 = int('BE4ED76592B0FC7A8F2A160840C664BD8A4E0DFF8DED0B2ED0843714C3B7BD12EE50CB56A829A999CA957'
+           '14A520BA0C080E7A5866309E4BBCCE1F897EAFB77D', 16)
+
+# Challenge 59 curve
+CURVE_59 = (233970423115425145524320034830162017933, 233970423115425145524320034830162017933 - 95051, 11279326)
+G_59 = (182, 85518893674295321206118380980485522083)
+Q_59 = 29246302889428143187362802287225875743
+
+KEY = b'YELLOW SUBMARINE'
+IV = b'ORANGE SUBMARINE'
+
+# Registered benchmarks, {name: (setup function, list of parameters)}
+# A setup function takes a Random and a parameter, and returns a function to time,
+# the amount of work done by one call, and the unit it is counted in
+BENCHMARKS = {}
+
+def benchmark(name: str, params=(None,), large_params=()):
+    # Registers the decorated setup function under name, large_params are only run with --large
+    def register(setup):
+        BENCHMARKS[name] = (setup, params, large_params)
+        return setup
+
+    return register
+
+
+# Byte operations
+@benchmark('xorbytes', SIZES)
+def bench_xorbytes(rand, size):
+    from Cryptopals_main import xorbytes
+    ba1, ba2 = rand.randbytes(size), rand.randbytes(size)
+
+    return lambda: xorbytes(ba1, ba2), size, 'bytes'
+
+@benchmark('xorb', SIZES)
+def bench_xorb(rand, size):
+    from EasyByte import xorb
+    ba1, key = rand.randbytes(size), rand.randbytes(16)
+
+    return lambda: xorb(ba1, key), size, 'bytes'
+
+@benchmark('hamming', {'1KB': 1 << 10, '64KB': 1 << 16})
+def bench_hamming(rand, size):
+    from EasyByte import EasyByte
+    byte1, ba2 = EasyByte(rand.randbytes(size)), rand.randbytes(size)
+
+    return lambda: byte1.hamming(ba2), size, 'bytes'
+
+@benchmark('find_v_key')
+def bench_find_v_key(rand, _):
+    # Challenge 1-6, key length 29
+    from Cryptopals_main import VCode
+    code = VCode(os.path.join(ROOT, 'Challenge_txt_files', 'Challenge_1-6.txt'), 'b64')
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            code.find_v_key(29)
+
+    return run, len(code.easybyte.b), 'bytes'
+
+
+# Randomness
+@benchmark('rand_bytes', {'16B': 16, '1MB': 1 << 20})
+def bench_rand_bytes(rand, size):
+    from Cryptopals_main import rand_bytes
+
+    return lambda: rand_bytes(size), size, 'bytes'
+
+@benchmark('aes_random_key')
+def bench_aes_random_key(rand, _):
+    # A fresh oracle with a random key and IV, as made for each game of challenge 2-11
+    from Cryptopals_main import AESCode
+
+    return lambda: AESCode(key='random', iv='random'), 1, 'instances'
+
+
+# AES
+def _aes_setup(rand, size, mode: str):
+    from Cryptopals_main import AESCode
+    data = rand.randbytes(size)
+
+    if mode == 'ecb_encrypt':
+        return lambda: AESCode(data, key=KEY).ecb_encrypt(), size, 'bytes'
+    if mode == 'ecb_decrypt':
+        ciphertext = AESCode(data, key=KEY).ecb_encrypt().easybyte.b
+        return lambda: AESCode(ciphertext, key=KEY).ecb_solve(), size, 'bytes'
+    if mode == 'cbc_encrypt':
+        return lambda: AESCode(data, key=KEY, iv=IV).cbc_encrypt(), size, 'bytes'
+    if mode == 'cbc_decrypt':
+        ciphertext = AESCode(data, key=KEY, iv=IV).cbc_encrypt().easybyte.b
+        return lambda: AESCode(ciphertext, key=KEY, iv=IV).cbc_solve(), size, 'bytes'
+
+    return lambda: AESCode(data, key=KEY, nonce=8).ctr(), size, 'bytes'
+
+for _mode in ['ecb_encrypt', 'ecb_decrypt', 'cbc_encrypt', 'cbc_decrypt', 'ctr']:
+    benchmark(f'aes_{_mode}', SIZES, LARGE_SIZES)(
+        lambda rand, size, mode=_mode: _aes_setup(rand, size, mode))
+
+@benchmark('det_oracle_solve')
+def bench_det_oracle_solve(rand, _):
+    # Challenge 2-12: byte at a time ECB decryption
+    from Cryptopals_main import AESCode, DetOracle, gen_sandwich
+    secret = rand.randbytes(138)
+    oracle_fun = AESCode(key=KEY).gen_ecb_oracle(gen_sandwich(app=secret))
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert DetOracle(oracle_fun).solve() == secret
+
+    return run, len(secret), 'bytes recovered'
+
+@benchmark('dh_message', {'64B': 64, '1KB': 1 << 10})
+def bench_dh_message(rand, size):
+    # Encryption then decryption of a message of a DH session, key and IV fixed for the session
+    from DH import DH
+    dh = DH(None)
+    dh.key, dh.iv = KEY, IV
+    msg = rand.randbytes(size)
+
+    def run():
+        ciphertext = dh.gen_code(msg).cbc_encrypt().easybyte.b
+        assert dh.gen_code(ciphertext).cbc_solve() == msg
+
+    return run, 1, 'messages'
+
+
+# MT19937
+@benchmark('mt19937_output')
+def bench_mt19937_output(rand, _):
+    from MT19937 import MT19937
+    rng = MT19937(rand.getrandbits(32)).rand_num_gen
+    n_outputs = 10000
+
+    return lambda: [rng() for _ in range(n_outputs)], n_outputs, 'outputs'
+
+@benchmark('mt19937_clone')
+def bench_mt19937_clone(rand, _):
+    from MT19937 import MT19937
+    rng = MT19937(rand.getrandbits(32))
+
+    return lambda: rng.clone(rng.rand_num_gen), 1, 'clones'
+
+
+# SHA-1 and HMAC
+@benchmark('sha_1', {'1KB': 1 << 10, '64KB': 1 << 16})
+def bench_sha_1(rand, size):
+    from SHA_1 import sha_1
+    msg = rand.randbytes(size)
+
+    return lambda: sha_1(msg), size, 'bytes'
+
+@benchmark('sha_1_hmac', {'1KB': 1 << 10})
+def bench_sha_1_hmac(rand, size):
+    from SHA_1 import hmac
+    key, msg = rand.randbytes(16), rand.randbytes(size)
+
+    return lambda: hmac(key, msg), size, 'bytes'
+
+@benchmark('sha_1_gen_hmac', {'1KB': 1 << 10})
+def bench_sha_1_gen_hmac(rand, size):
+    # Keyed blocks processed once, as in the HMAC server
+    from SHA_1 import gen_hmac
+    keyed_hmac, msg = gen_hmac(rand.randbytes(16)), rand.randbytes(size)
+
+    return lambda: keyed_hmac(msg), size, 'bytes'
+
+
+# Number theory
+@benchmark('power_mod', ['pow', 'fixed'])
+def bench_power_mod(rand, method):
+    # 256-bit exponents of g = 2 over the SRP modulus, as in gen_verifier
+    from DH import SRP_N, power_mod
+    exponents = [rand.getrandbits(256) for _ in range(100)]
+    fixed = method == 'fixed'
+    power_mod(2, exponents[0], SRP_N, fixed)  # Builds the table beforehand
+
+    return lambda: [power_mod(2, e, SRP_N, fixed) for e in exponents], len(exponents), 'exponentiations'
+
+@benchmark('group_scale', ['modp', 'modp_table', 'egroup', 'egroup_table'])
+def bench_group_scale(rand, kind):
+    # Scalings of the generators of the challenge 57 group and the challenge 59 curve,
+    # with Group.scale or with the table of powers of the generator (CycGroup)
+    from Group import ModP, EGroup, CycGroup
+    group, g, q = (ModP(P_57), G_57, Q_57) if kind.startswith('modp') else (EGroup(*CURVE_59), G_59, Q_59)
+    if kind.endswith('table'):
+        group = CycGroup.from_generator(group, g, q)
+    scalars = [rand.randrange(1, q) for _ in range(100)]
+    group.scale(g, q - 1)  # Builds the table beforehand
+
+    return lambda: [group.scale(g, k) for k in scalars], len(scalars), 'scalings'
+
+@benchmark('disc_log', [24, 32])
+def bench_disc_log(rand, bits):
+    # Kangaroo over an interval of 2**bits in the challenge 58 group
+    from Group import ModP
+    group = ModP(P_58)
+    x = rand.randrange(1 << bits)
+    y = pow(G_58, x, P_58)
+
+    def run():
+        assert group.disc_log(0, 1 << bits, G_58, y, seed=0).x == x
+
+    return run, 1, 'logarithms'
+
+@benchmark('crt', ['accumulator', 'garner'])
+def bench_crt(rand, method):
+    # Residues modulo the challenge 57 factors
+    from Cryptopals_main import crt, garner
+    rems = [rand.randrange(factor) for factor in FACTORS_57]
+    fun = crt if method == 'accumulator' else garner
+
+    return lambda: [fun(FACTORS_57, rems) for _ in range(100)], 100, 'combinations'
+
+
+def case_name(name: str, param):
+    return name if param is None else f'{name}[{param}]'
+
+def cases(large=False, only=None):
+    # Returns (case name, benchmark name, parameter) for every case to run
+    # Dicts of parameters are named by their keys, and their values passed to setup
+    selected = []
+    for name, (_, params, large_params) in BENCHMARKS.items():
+        for param in list(params) + (list(large_params) if large else []):
+            case = case_name(name, param)
+            if not only or any(pattern in case for pattern in only):
+                selected.append((case, name, param))
+
+    return selected
+
+def _param_value(name: str, param):
+    _, params, large_params = BENCHMARKS[name]
+    for group in (params, large_params):
+        if isinstance(group, dict) and param in group:
+            return group[param]
+
+    return param
+
+def measure(fun, repeat: int):
+    # Returns the fastest and median time per call, and the number of calls per timing
+    # Calls are timed in batches lasting at least 0.2s
+    timer = timeit.Timer(fun)
+    number, seconds = timer.autorange()
+    times = sorted([seconds] + timer.repeat(repeat - 1, number))
+
+    return times[0] / number, times[len(times) // 2] / number, number
+
+def _run_case(name: str, param, seed: int, repeat: int, results):
+    # Runs in a process of its own, puts the result of a case in results
+    try:
+        import random
+        import Randomness
+        random.seed(seed)
+        Randomness.seed(seed)  # Keys, IVs and salts
+        setup = BENCHMARKS[name][0]
+        fun, work, unit = setup(Random(seed), _param_value(name, param))
+        best, median, number = measure(fun, repeat)
+        results.put({'status': 'ok', 'seconds': best, 'median': median, 'number': number, 'repeat': repeat,
+                     'work': work, 'unit': unit, 'per_sec': work / best})
+
+    except Exception as e:
+        results.put({'status': 'error', 'error': repr(e)})
+
+def run_case(name: str, param, seed=0, repeat=5, timeout=300.0):
+    # Runs a case in a new process, returns its result
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_case, args=(name, param, seed, repeat, results))
+    process.start()
+
+    try:
+        result = results.get(timeout=timeout)
+    except queue.Empty:
+        process.terminate()
+        result = {'status': 'timeout', 'timeout': timeout}
+    process.join()
+
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    # Prints how each case moved against baseline, returns the cases slower by more than tolerance
+    regressions = []
+    for case, result in results.items():
+        old = baseline.get(case)
+        if not old or result['status'] != 'ok' or old['status'] != 'ok':
+            continue
+
+        ratio = result['seconds'] / old['seconds']
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressions.append(case)
+        elif ratio < 1 - tolerance:
+            flag = '  faster'
+        print(f'{case:32} {old["seconds"] * 1e3:12.4f} ms -> {result["seconds"] * 1e3:12.4f} ms  x{ratio:.2f}{flag}')
+
+    return regressions
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmarks of the hot primitives, JSON output')
+    parser.add_argument('only', nargs='*', help='run the cases whose name contains one of these')
+    parser.add_argument('--out', default=None, help='JSON file the results are written to')
+    parser.add_argument('--compare', default=None, help='JSON file of earlier results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown reported as a regression')
+    parser.add_argument('--large', action='store_true', help='include 64 MB messages')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=300.0, help='seconds allowed per case')
+    parser.add_argument('--list', action='store_true', help='list the cases and exit')
+    args = parser.parse_args()
+
+    selected = cases(args.large, args.only)
+    if args.list:
+        print('\n'.join(case for case, _, _ in selected))
+        return 0
+
+    results = {}
+    for case, name, param in selected:
+        result = run_case(name, param, args.seed, args.repeat, args.timeout)
+        results[case] = result
+        if result['status'] == 'ok':
+            print(f'{case:32} {result["seconds"] * 1e3:12.4f} ms  {result["per_sec"]:14.1f} {result["unit"]}/s')
+        else:
+            print(f'{case:32} {result["status"]}: {result.get("error", result.get("timeout"))}')
+
+    report = {
+        'commit': git_commit(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f'\nAgainst {args.compare} (commit {baseline.get("commit")}):')
+        if compare(results, baseline['results'], args.tolerance):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Byte and text utilities shared across the challenges
+@author: Lawrence Arscott
+"""
+
+##
+from random import randint
+
+# My files
+from EasyByte import EasyByte
+import Randomness
+
+# Byte operations
+def xorbytes(ba1: bytes, ba2: bytes):
+    # Returns ba1 XOR key, where arguments are b strings
+    # https://nitratine.net/blog/post/xor-python-byte-strings/
+    try:
+        assert len(ba1) == len(ba2)
+
+    except AssertionError:
+        print('Byte arrays must have the same length')
+
+    return bytes([_a ^ _b for _a, _b in zip(ba1, ba2)])
+
+def rand_bytes(n: int):
+    # Returns a byte string composed of n random bytes, sliced from the buffer of Randomness
+    return Randomness.rand_bytes(n)
+
+def b_remove(b: bytes, rem: bytes) -> bytes:
+    # Removes all characters in the bstring rem from the bstring s, returns s
+    for i in range(len(rem)):
+        c = rem[i:i+1]
+        b = b.replace(c, b'')
+
+    return b
+
+def gen_sandwich(prep=b'', app=b'', rem=b'') -> callable:
+    # Generates a function that removes characters in rem from a bstring b,
+    # prepends prep to the result and appends app to it
+    def sandwich(b: bytes) -> bytes:
+        # Removes characters in rem from prep and app, prepends prep and appends app to s, and returns s
+
+        return prep + b_remove(b, rem) + app
+
+    return sandwich
+
+def user_profile_for(email: bytes):
+    # Used in challenge 2-13
+    # Encodes a user profile as a byte
+    email = b_remove(email, b'&=')
+    return 'email='.encode() + email + f'&uid='.encode() + \
+           str(randint(0, 9999)).zfill(4).encode() + '&role=user'.encode()
+
+def create_rand_byte_fun(txtdoc, base=None):
+    # Returns a function that returns a random line in txtdoc as a byte
+    # base gives basis in which the file is encoded (see class EasyByte)
+    def rand_byte():
+        return EasyByte(rand_line(txtdoc), base)
+
+    return rand_byte
+
+def empty_bytes(n: int):
+    # Returns a byte string of length n, all bytes = \x00
+    return b'\x00' * n
+
+# Text formatting
+def str_split(text: str, n: int):
+    # From a string, returns a list of strings consisting of every nth character,
+    # starting from character 0, ..., n-1
+    return [text[i::n] for i in range(n)]
+
+def parser(s, sep1='=', sep2='&'):
+    # Takes string of form 'key1=value1&key2=value2&...' and returns dict
+    # of form {'key1': 'value1', 'key2': 'value2', ...}
+    lst = [x.split(sep1) for x in s.split(sep2)]
+
+    return {two_lst[0]: two_lst[1] for two_lst in lst}
+
+def rand_line(txtdoc):
+    # Returns random line in .txt file
+    with open(txtdoc) as file:
+        lines = file.readlines()
+        return lines[randint(0, len(lines) - 1)]  # Remembering lists are indexed 0 to length - 1
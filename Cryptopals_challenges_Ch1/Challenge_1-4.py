@@ -4,7 +4,7 @@
 from Cryptopals_main import ListVCode
 
 def main():
-    c1_4 = ListVCode('../Challenge_1-4.txt', 'hex')
+    c1_4 = ListVCode('Challenge_1-4.txt', 'hex')
     print('The following lines in the file pass a simple frequency test,\n'
           'decryption follows the line number if the line is indeed XORed\n'
           'against a single byte repreating key.')
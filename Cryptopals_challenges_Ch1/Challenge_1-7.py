@@ -5,7 +5,7 @@ from Cryptopals_main import AESCode
 
 def main():
     # Declare AESCode, passing the challenge's ciphertext
-    c1_7 = AESCode('../Challenge_1-7.txt', 'b64')
+    c1_7 = AESCode('Challenge_1-7.txt', 'b64')
 
     print(c1_7.easybyte.b)
 
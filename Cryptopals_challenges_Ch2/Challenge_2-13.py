@@ -1,13 +1,13 @@
 ## Challenge 2-5
 #
 
-from Cryptopals_main import AESCode, Profile, DetOracle, string_to_dict, user_profile_for
+from Cryptopals_main import AESCode, Profile, DetOracle, parser, user_profile_for
 
 def main():
     basic_profile_string = Profile(b'foo@baz').p  # Create a profile
     c2_5 = AESCode(basic_profile_string, 'text', key='random')  # ecb encrypt it
     c2_5.ecb_encrypt()
-    print(string_to_dict(c2_5.ecb_solve().decode()))  # decrypt it
+    print(parser(c2_5.ecb_solve().decode()))  # decrypt it
 
     # b) Generate oracle using user profile as the string function
     c2_5b = AESCode(key='random')
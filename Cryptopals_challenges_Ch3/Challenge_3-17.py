@@ -8,7 +8,7 @@ def main():
     c3_1 = AESCode(key='random', iv='random')  # Random cipher
 
     # Create function that randomly returns a string from Challenge_3-17.txt as a byte
-    c3_1_rand_byte_fun = create_rand_byte_fun('..\Challenge_3-17.txt', 'b64')
+    c3_1_rand_byte_fun = create_rand_byte_fun('Challenge_3-17.txt', 'b64')
 
     # Create oracle out of random cipher and byte generator
     c3_1_oracle = c3_1.gen_cbc_oracle_rand(c3_1_rand_byte_fun)
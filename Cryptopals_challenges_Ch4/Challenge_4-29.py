@@ -1,7 +1,6 @@
 # Challenge 4-29
 # Break a SHA-1 keyed MAC using length extension
 
-from math import ceil
 from SHA_1 import *
 from Cryptopals_main import rand_bytes
 
@@ -15,12 +14,6 @@ def main():
     # Sender creates a mac
     og_mac = sha_1(key + og_msg)
 
-    # Number of bytes shaed into og_mac is also known to attacker
-    # This is the length of padded (key|msg)
-    # Use math.ceil to return the lowest integer greater than the length divided by the blocksize
-    # This gives us the number of blocks padded (key|msg) occupies
-    l_shaed = ceil((len(key) + len(og_msg)) / 64) * 64  # Blocksize 64
-
     # Attacker wishes to append an extension to the message without breaking the MAC
     extension = b';admin=true'
 
@@ -28,18 +21,22 @@ def main():
     # Result is (og_msg|glue padding|extension)
     # Glue padding is the padding of (key|og_msg)
     # This is a result of picking up SHA where it left off, i.e. after it has already shaed padded (key|msg)
-    extended_msg = pad(b'\x00'*len(key) + og_msg)[len(key):] + extension
-
-    # Extend MAC only using original MAC and length of padded (key|msg)
-    extended_mac = extend(og_mac, extension, l_shaed)  # attacker created
-
-    # Check this passes authentication, print success or failure
-    try:
-        # Append mac to extended message in preparation for check_mac
-        ext_msg_and_mac = extended_msg + extended_mac
-        check_mac(ext_msg_and_mac, key)
+    # The length of the key is unknown to the attacker, so we forge a candidate for each plausible length
+    candidates = forge_extensions(og_mac, og_msg, extension, range(33))  # attacker created
+
+    # Receiver accepts a message if its mac passes authentication
+    def oracle(msg, mac):
+        try:
+            check_mac(msg + mac, key)
+            return True
+        except AssertionError:
+            return False
+
+    # Check whether a candidate passes authentication, print success or failure
+    forgery = find_forgery(candidates, oracle)
+    if forgery:
         print('Message authenticated !')
-    except AssertionError:
+    else:
         print('Authentication error')
 
 
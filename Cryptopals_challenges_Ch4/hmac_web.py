@@ -1,13 +1,14 @@
-from flask import Flask, request
+import time
+import warnings
+from functools import lru_cache
+from flask import Flask, request, g, jsonify
 from Cryptopals_main import rand_bytes
-
-key = rand_bytes(64)
-app = Flask(__name__)
+from SHA_1 import gen_hmac
+from Metrics import LatencyRecorder
 
 def insecure_compare_sig(dummy: str, target: str, delay=50e-3):
     # Compares strings dummy and target one character at a time with early exit
     # Delay between each comparison is set by delay
-    import time  # for delays
 
     try:
         # Compare characters in order
@@ -35,29 +36,90 @@ def insecure_compare_sig(dummy: str, target: str, delay=50e-3):
         else:
             return 'Coding error: index error when dummy and target supposedly have equal length'
 
+def create_app(key: bytes = None, delay=50e-3, cache_size=1024):
+    # Returns the Flask app checking signatures under key, a random 64-byte key if not given
+    # (also an app factory for 'flask --app hmac_web run')
+    # delay: pause after each matching character of the signature
+    # cache_size: number of file names for which the expected signature is kept
+    app = Flask(__name__)
+    metrics = LatencyRecorder()
+
+    # Keyed HMAC blocks are processed once, expected signatures are cached by file name
+    keyed_hmac = gen_hmac(rand_bytes(64) if key is None else key, 'hex')
+
+    @lru_cache(maxsize=cache_size)
+    def expected_hmac(file: str):
+        return keyed_hmac(str.encode(file))
+
+    app.expected_hmac = expected_hmac  # For expected_hmac.cache_info()
+
+    @app.before_request
+    def start_timer():
+        g.start = time.perf_counter()
+
+    @app.after_request
+    def record_latency(response):
+        # Recorded by route rather than path, so that made up URLs do not each add an entry
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        metrics.record(rule, time.perf_counter() - g.start)
+        return response
+
+    @app.route("/")
+    def home():
+        return 'Hello World!'
+
+    @app.route("/test")
+    def test():
+        # Searches for file= and signature= in URL
+        # Checks signature = hmac(file)
+        # File is in text format while signature will be in hex
+
+        # Obtain values
+        file = request.args.get('file')  # text
+        signature = request.args.get('signature')  # hex
+        if file is None or signature is None:
+            return 'Failure: file and signature are both required', 400
+
+        # Character-at-a-time comparison with delay and early exit
+        return insecure_compare_sig(signature, expected_hmac(file), delay)
+
+    @app.route("/metrics")
+    def show_metrics():
+        # Request counts and latency percentiles by endpoint
+        return jsonify(metrics.snapshot())
+
+    return app
+
+def serve(app, port=5001, threads=8):
+    # Serves app with a multi-threaded WSGI server rather than Flask's debug server
+    # waitress is used if it is installed, otherwise werkzeug's threaded server
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
 
-@app.route("/")
-def home():
-    return 'Hello World!'
-
-@app.route("/test")
-def test():
-    # Searches for file= and signature= in URL
-    # Checks signature = hmac(file)
-    # File is in text format while signature will be in hex
-    from SHA_1 import hmac
-
-    # Obtain values
-    file = request.args.get('file')  # text
-    signature = request.args.get('signature')  # hex
-
-    # Calculate file's expected hmac
-    # Key was initiated on app creation
-    expected_hmac = hmac(key, str.encode(file), 'hex')
-
-    # Character-at-a-time comparison with delay and early exit
-    return insecure_compare_sig(signature, expected_hmac)
+    if waitress_serve:
+        waitress_serve(app, host='127.0.0.1', port=port, threads=threads)
+    else:
+        warnings.warn(f'waitress is not installed: serving with werkzeug, which starts a thread per request '
+                      f'rather than a pool of {threads}')
+        from werkzeug.serving import run_simple
+        run_simple('127.0.0.1', port, app, threaded=True)
 
 
 if __name__ == '__main__':
-    app.run(port=5001, debug=True)
+    import argparse
+
+    parser = argparse.ArgumentParser(description='HMAC verification server with a timing leak')
+    parser.add_argument('--serve', action='store_true', help='multi-threaded server instead of debug server')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--delay', type=float, default=50e-3, help='pause per matching character (s)')
+    parser.add_argument('--cache-size', type=int, default=1024)
+    args = parser.parse_args()
+
+    app = create_app(rand_bytes(64), args.delay, args.cache_size)
+    if args.serve:
+        serve(app, args.port, args.threads)
+    else:
+        app.run(port=args.port, debug=True)
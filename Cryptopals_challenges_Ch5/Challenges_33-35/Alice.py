@@ -2,7 +2,8 @@
 
 import socket
 from DH import DHSender
-from Group import ModP
+from Group import ModP, CycGroup
+from Framing import Channel
 
 # Initiate Alice, argument is message we wish to send
 our_p = int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024'
@@ -14,7 +15,8 @@ our_p = int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024'
             'bb9ed529077096966d670c354e4abc9804f1746c08ca237327fff'
             'fffffffffffff', 16)
 our_g = 2
-our_group = ModP(our_p, our_g)
+our_q = (our_p - 1) // 2  # Order of g
+our_group = CycGroup.from_generator(ModP(our_p), our_g, our_q)
 
 alice = DHSender(b'Hello', our_group)
 
@@ -31,14 +33,13 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     # Communicate
     with conn:
         print(f"Connected by {addr}")
+        channel = Channel(conn)
 
         # Alice sends A
-        to_send = str(alice.A).encode()
-        conn.sendall(to_send)
+        channel.send_element(alice.A)
 
         # Alice receives B
-        data = conn.recv(1024)
-        alice.B = int(data.decode())
+        alice.B = channel.recv_element()
 
         # Alice calculates key
         alice.s = alice.gen_s()
@@ -47,25 +48,15 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         # Create cipher
         alice.key = alice.gen_key()
         print(f'Key is {alice.key}')
-        alice.encode = alice.gen_code(alice.msg_to_send)  # Holds message and cipher
 
-        # Send iv
-        alice.iv = alice.encode.iv
-        to_send = alice.iv
-        conn.sendall(to_send)
-        print(f'iv:\n{to_send}')
-
-        # Send encrypted message
-        to_send = alice.encode.cbc_encrypt().easybyte.b
-        conn.sendall(to_send)
+        # Send iv and encrypted message together
+        to_send = alice.send_encrypted(channel, alice.msg_to_send, send_iv=True)
+        print(f'iv:\n{alice.iv}')
         print(f'Sent encrypted message:\n{to_send}')
 
-        # Receive ciphertext
-        alice.rec_msg = conn.recv(1024)
+        # Receive ciphertext, ready for decoding
+        alice.decode = alice.recv_encrypted(channel)
         print(f'Received encrypted message:\n{alice.rec_msg}')
 
-        # Prepare message for decoding
-        alice.decode = alice.gen_code(alice.rec_msg)
-
         # Decode
         print(alice.decode.cbc_solve())
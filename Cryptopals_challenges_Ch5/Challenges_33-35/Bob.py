@@ -2,7 +2,8 @@
 
 import socket
 from DH import DHReceiver
-from Group import ModP
+from Group import ModP, CycGroup
+from Framing import Channel
 
 # Initiate Bob
 our_p = int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024'
@@ -14,7 +15,8 @@ our_p = int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024'
             'bb9ed529077096966d670c354e4abc9804f1746c08ca237327fff'
             'fffffffffffff', 16)
 our_g = 2
-our_group = ModP(our_p, our_g)
+our_q = (our_p - 1) // 2  # Order of g
+our_group = CycGroup.from_generator(ModP(our_p), our_g, our_q)
 
 bob = DHReceiver(our_group)
 
@@ -25,42 +27,36 @@ PORT = 65433  # The port used by the server
 # Establish connection
 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     s.connect((HOST, PORT))
+    channel = Channel(s)
 
     # Communicate
     # Bob receives A
-    data_A = s.recv(1024)
-    bob.A = int(data_A.decode())
+    bob.A = channel.recv_element()
 
     # Bob sends B
-    to_send = str(bob.B).encode()
-    s.sendall(to_send)
+    channel.send_element(bob.B)
 
     # Bob calculates key
     bob.s = bob.gen_s()
     print(f'Integer for key is {bob.s}')
 
     # Receive iv
-    bob.iv = s.recv(1024)
+    bob.iv = channel.recv()
     print(f'iv:\n{bob.iv}')
 
-    # Receive ciphertext
-    bob.rec_msg = s.recv(1024)
-    print(f'Received encrypted message:\n{bob.rec_msg}')
-
     # Create cipher
     bob.key = bob.gen_key()
     print(f'Key is {bob.key}')
-    bob.decode = bob.gen_code(bob.rec_msg)
+
+    # Receive ciphertext
+    bob.decode = bob.recv_encrypted(channel)
+    print(f'Received encrypted message:\n{bob.rec_msg}')
 
     # Decode and request answer
     print(bob.decode.cbc_solve())
     print('What is your reply ?')
     bob.reply = input().encode()
 
-    # Prepare message and cipher for reply
-    bob.encode = bob.gen_code(bob.reply)
-
-    # Send encrypted message
-    to_send = bob.encode.cbc_encrypt().easybyte.b
-    s.sendall(to_send)
+    # Send encrypted reply
+    to_send = bob.send_encrypted(channel, bob.reply)
     print(f'Sent encrypted message:\n{to_send}')
@@ -3,7 +3,8 @@
 import socket
 from Cryptopals_main import AESCode
 from DH import DHMITM
-from Group import ModP
+from Group import ModP, CycGroup
+from Framing import Channel
 
 # Initiate Cecily
 our_p = int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024'
@@ -15,7 +16,8 @@ our_p = int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024'
             'bb9ed529077096966d670c354e4abc9804f1746c08ca237327fff'
             'fffffffffffff', 16)
 our_g = 2
-our_group = ModP(our_p, our_g)
+our_q = (our_p - 1) // 2  # Order of g
+our_group = CycGroup.from_generator(ModP(our_p), our_g, our_q)
 
 cecily = DHMITM(our_group)
 
@@ -38,48 +40,40 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
 
         with conn:
             # MITM attack
+            alice_channel = Channel(s)
+            bob_channel = Channel(conn)
 
             # Cecily receives A from Alice
-            data_A = s.recv(1024)
-            cecily.A = int(data_A.decode())
+            cecily.A = alice_channel.recv_element()
 
             # Cecily sends p instead of A to Bob
-            to_send = str(our_p).encode()
-            conn.sendall(to_send)
+            bob_channel.send_element(our_p)
 
             # Cecily receives B from Bob
-            data = conn.recv(1024)
-            cecily.B = int(data.decode())
+            cecily.B = bob_channel.recv_element()
 
-            # Cecily sends p instead of A to Alice
-            to_send = str(our_p).encode()
-            s.sendall(to_send)
+            # Cecily sends p instead of B to Alice
+            alice_channel.send_element(our_p)
 
             # Receive iv and ciphertext from A
-            # Receive iv
-            cecily.iv = s.recv(1024)
+            cecily.iv = alice_channel.recv()
             print(f'iv:\n{cecily.iv}')
 
-            # Receive ciphertext
-            cecily.A_msg = s.recv(1024)
+            cecily.A_msg = alice_channel.recv()
             print(f'Received encrypted message:\n{cecily.A_msg}')
 
-            # Pass iv and ciphertext on to B
-            # Send iv
-            conn.sendall(cecily.iv)
-
-            # Send ciphertext
-            conn.sendall(cecily.A_msg)
+            # Pass iv and ciphertext on to B, together
+            bob_channel.send(cecily.iv, cecily.A_msg)
 
             # Receive ciphertext from Bob
-            cecily.B_msg = conn.recv(1024)
+            cecily.B_msg = bob_channel.recv()
             print(f'Received encrypted message:\n{cecily.B_msg}')
 
             # Pass it on to A
-            s.sendall(cecily.B_msg)
+            alice_channel.send(cecily.B_msg)
 
             # Decode Alice's and Bob's messages TODO: below could go in class
-            A_decoded = AESCode(cecily.A_msg, key=cecily.key, iv=cecily.iv).cbc_solve().decode()
-            B_decoded = AESCode(cecily.B_msg, key=cecily.key, iv=cecily.iv).cbc_solve().decode()
+            A_decoded = AESCode.from_bytes(cecily.A_msg, key=cecily.key, iv=cecily.iv).cbc_solve().decode()
+            B_decoded = AESCode.from_bytes(cecily.B_msg, key=cecily.key, iv=cecily.iv).cbc_solve().decode()
             print(f'Alice said {A_decoded}')
             print(f'Bob said {B_decoded}')
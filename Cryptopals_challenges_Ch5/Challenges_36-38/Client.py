@@ -2,6 +2,7 @@ import socket
 from DH import Client
 from hashlib import sha256
 import hmac
+from Framing import Channel
 
 # Initiate client, arguments are agreed upon email and password
 client = Client(b'foo@bar', b'bazquxquux')
@@ -18,17 +19,16 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
 
     # Communicate
     with conn:
-        # Send email
-        conn.sendall(client.E)
+        channel = Channel(conn)
 
-        # Send A (convert first to bytes)
-        conn.sendall(str(client.A).encode())
+        # Send email and A together
+        channel.send(client.E, str(client.A).encode())
 
         # Receive salt
-        client.salt = conn.recv(1024)
+        client.salt = channel.recv()
 
-        # Receive B (int sent as bytes)
-        client.B = int(conn.recv(1024).decode())
+        # Receive B
+        client.B = channel.recv_element()
 
         # Calculate u
         client.u = client.gen_u()
@@ -37,7 +37,7 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         client.K = client.gen_K()
 
         # Send HMAC-SHA256(K, salt)
-        conn.sendall(hmac.new(client.K, client.salt, sha256).digest())
+        channel.send(hmac.new(client.K, client.salt, sha256).digest())
 
         # Receive 'OK' or 'error'
-        print(conn.recv(1024).decode())
+        print(channel.recv().decode())
@@ -2,6 +2,7 @@ import socket
 from DH import Client
 from hashlib import sha256
 import hmac
+from Framing import Channel
 
 # Initiate client, wishes to login without password
 client = Client(b'foo@bar', b'')
@@ -18,24 +19,23 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
 
     # Communicate
     with conn:
-        # Send email
-        conn.sendall(client.E)
+        channel = Channel(conn)
 
-        # Send A (convert first to bytes), make A zero here
+        # Send email and A together, make A zero here
         client.A = 0
-        conn.sendall(str(client.A).encode())
+        channel.send(client.E, str(client.A).encode())
 
         # Receive salt
-        client.salt = conn.recv(1024)
+        client.salt = channel.recv()
 
-        # Receive B (int sent as bytes)
-        client.B = int(conn.recv(1024).decode())
+        # Receive B
+        client.B = channel.recv_element()
 
         # Since we sent A = 0, K = SHA256(0)
         client.K = sha256(str(0).encode()).digest()
 
         # Send HMAC-SHA256(K, salt)
-        conn.sendall(hmac.new(client.K, client.salt, sha256).digest())
+        channel.send(hmac.new(client.K, client.salt, sha256).digest())
 
         # Receive 'OK' or 'error'
-        print(conn.recv(1024).decode())
+        print(channel.recv().decode())
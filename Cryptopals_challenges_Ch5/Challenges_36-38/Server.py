@@ -1,5 +1,6 @@
 import socket
 from DH import Server
+from Framing import Channel
 
 # Initiate server, arguments are agreed upon email and password
 server = Server(b'foo@bar', b'bazquxquux')
@@ -11,19 +12,17 @@ PORT = 65435  # The port used by the server
 # Establish connection
 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     s.connect((HOST, PORT))
+    channel = Channel(s)
 
     # Communicate
     # Receive email
-    email = s.recv(1024)
+    email = channel.recv()
 
-    # Receive A (int sent as bytes)
-    server.A = int(s.recv(1024).decode())
+    # Receive A
+    server.A = channel.recv_element()
 
-    # Send salt
-    s.sendall(server.salt)
-
-    # Send B (must first be converted to bytes)
-    s.sendall(str(server.B).encode())
+    # Send salt and B together
+    channel.send(server.salt, str(server.B).encode())
 
     # Calculate u
     server.u = server.gen_u()
@@ -35,12 +34,12 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     server.h = server.gen_h()
 
     # Receive HMAC-SHA256(K, salt)
-    client_h = s.recv(1024)
+    client_h = channel.recv()
 
     # Authenticate
     try:
         assert server.h == client_h
-        s.sendall(b'OK')
+        channel.send(b'OK')
 
     except AssertionError:
-        s.sendall(b'Error')
+        channel.send(b'Error')
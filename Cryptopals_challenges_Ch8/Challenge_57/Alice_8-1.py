@@ -1,9 +1,11 @@
 # Alice is the sender in a standard Diffie-Hellman key exchange protocol
 # Cryptopals chapter 8
 
+import os
 import socket
 from DH import DHSender
-from Group import ModP
+from Group import ModP, CycGroup
+from Framing import Channel, STOP
 
 our_p = int('8977C3217DA1F838B8D24B4A790DE8FC8E35AD5483E463028EF9BBF9AF23A9BD1231EBA9A'
             'C7E44363D8311D610B09AA224A023268EE8A60AC484FD9381962563', 16)
@@ -13,7 +15,9 @@ our_g = int('572AFF4A93EC6214C1036C62E1818FE5E4E1D6DB635C1B12D9572203C47D241A0E5
 
 our_q = 236234353446506858198510045061214171961
 
-our_group = ModP(our_p, our_g, our_q)
+# Powers of g are kept next to this script between runs
+table_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'g_57.table')
+our_group = CycGroup.from_generator(ModP(our_p), our_g, our_q, table_path)
 
 # Initiate Alice, argument is message we wish to send
 alice = DHSender(b'Hello', our_group)
@@ -31,14 +35,13 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     # Communicate
     with conn:
         print(f"Connected by {addr}")
+        channel = Channel(conn)
 
         # Alice sends group element A
-        to_send = str(alice.A).encode()
-        conn.sendall(to_send)
+        channel.send_element(alice.A)
 
         # Alice receives group element B
-        data = conn.recv(1024)
-        alice.B = int(data.decode())
+        alice.B = channel.recv_element()
 
         # Alice calculates key
         alice.s = alice.gen_s()
@@ -47,23 +50,17 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         # Create cipher
         alice.key = alice.gen_key()
         print(f'Key is {alice.key}')
-        alice.encode = alice.gen_code(alice.msg_to_send)  # Holds message and cipher
 
         # Send iv
-        alice.iv = alice.encode.iv
-        to_send = alice.iv
-        conn.sendall(to_send)
-        print(f'iv:\n{to_send}')
+        channel.send(alice.iv)
+        print(f'iv:\n{alice.iv}')
 
-        # Receive ciphertext
-        alice.rec_msg = conn.recv(1024)
+        # Receive ciphertext, authenticate and prepare for decoding
+        alice.decode = alice.recv_encrypted(channel, mac=True)
         print(f'Received encrypted message:\n{alice.rec_msg}')
 
-        # Prepare message for decoding
-        alice.decode = alice.gen_decode_hmac(alice.rec_msg)
-
         # Decode
         print(alice.decode.cbc_solve())
 
         # End connection
-        conn.sendall(b'STOP')
+        channel.send(STOP)
@@ -1,9 +1,11 @@
 # Bob is the receiver in a standard Diffie-Hellman key exchange protocol
 # Cryptopals chapter 8
 
+import os
 import socket
 from DH import DHReceiver
 from Group import ModP, CycGroup
+from Framing import Channel, STOP, decode_element
 
 # Initiate Bob
 our_q = 335062023296420808191071248367701059461
@@ -13,7 +15,9 @@ our_g = int('BE4ED76592B0FC7A8F2A160840C664BD8A4E0DFF8DED0B2ED0843714C3B7BD12EE5
             '14A520BA0C080E7A5866309E4BBCCE1F897EAFB77D', 16)
 
 our_group = ModP(p=our_p)
-our_cyclic_group = CycGroup.from_generator(our_group, our_g, our_q)
+# Powers of g are kept next to this script between runs
+table_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'g_58.table')
+our_cyclic_group = CycGroup.from_generator(our_group, our_g, our_q, table_path)
 
 bob = DHReceiver(our_cyclic_group)
 
@@ -26,28 +30,28 @@ PORT = 65432  # The port used by the server
 # Establish connection
 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     s.connect((HOST, PORT))
+    channel = Channel(s)
 
     while True:
         # Communicate
         # Bob receives A
-        data_A = s.recv(1024)
+        data_A = channel.recv()
 
         # If no transmission, close connection
-        if data_A == b'STOP':
+        if data_A == STOP:
             break
 
-        bob.A = int(data_A.decode())
+        bob.A = decode_element(data_A)
 
         # Bob sends B
-        to_send = str(bob.B).encode()
-        s.sendall(to_send)
+        channel.send_element(bob.B)
 
         # Bob calculates key
         bob.s = bob.gen_s()
         print(f'Integer for key is {bob.s}')
 
         # Receive iv
-        bob.iv = s.recv(1024)
+        bob.iv = channel.recv()
         print(f'iv:\n{bob.iv}')
 
         # Create cipher
@@ -57,11 +61,6 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         # Send message
         bob.reply = b'Crazy flamboyant for the rap enjoyment'
 
-        # Prepare message and cipher for reply
-        bob.encode = bob.gen_code(bob.reply)
-
-        # Send encrypted message
-        ciphertext = bob.encode.cbc_encrypt().easybyte.b  # ciphertext
-        macced_ciphertext = bob.add_hmac(ciphertext)
-        s.sendall(macced_ciphertext)  # Add HMAC to ciphertext
+        # Send encrypted message, with HMAC appended
+        bob.send_encrypted(channel, bob.reply, mac=True)
         print(f'Sent encrypted message')
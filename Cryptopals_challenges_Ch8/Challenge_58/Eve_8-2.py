@@ -2,10 +2,12 @@
 # in a standard Diffie-Hellman key exchange protocol
 # Cryptopals chapter 8
 
+import os
 import socket
 from DH import *
-from Cryptopals_main import crt
 from Group import ModP, CycGroup
+from Framing import Channel, STOP
+from SubgroupAttack import SmallSubgroupAttack
 
 # Parameters
 our_q = 335062023296420808191071248367701059461
@@ -14,71 +16,55 @@ our_p = int('DB020645333C52A8D8BD194950CBD48DDF752BAE8F346150C6410DBA6BEFDBC6CF9
 our_g = int('BE4ED76592B0FC7A8F2A160840C664BD8A4E0DFF8DED0B2ED0843714C3B7BD12EE50CB56A829A999CA957'
             '14A520BA0C080E7A5866309E4BBCCE1F897EAFB77D', 16)
 
-our_group = ModP(p=our_p)
-our_cyclic_group = CycGroup.from_generator(our_group, our_g, our_q)
-
-# Initiate Eve
-eve = DHAttacker(our_cyclic_group)
-
 # Some small factors of (p-1) / q
 factors = [2, 12457, 14741, 18061, 31193, 33941, 63803]
 fact_prod = 2 * 12457 * 14741 * 18061 * 31193 * 33941 * 63803
-powers = [None] * len(factors)  # Store remainders later on
+
+# Powers of g are kept next to this script between runs
+table_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'g_58.table')
 
 # Address
 HOST = "127.0.0.1"  # Standard loopback interface address (localhost)
 PORT = 65432  # Port to listen on (non-privileged ports are > 1023)
 
-# Initiate connection
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-    s.bind((HOST, PORT))
-    s.listen()
-    conn, addr = s.accept()
-
-    # Communicate
-    with conn:
-        print(f"Connected by {addr}")
-
-        # Obtain secret key mod factor for each factor
-        for j in range(len(factors)):
-            factor = factors[j]
-            assert (our_p - 1) % factor == 0  # Check factor divides order of group
-
-            # Generate h, an element of order factor
-            h = our_cyclic_group.gen_order(factor)
 
-            print('boop')
-            print(pow(h, factor, our_p))
+def main():
+    our_group = ModP(p=our_p)
+    our_cyclic_group = CycGroup.from_generator(our_group, our_g, our_q, table_path)
 
-            # Eve sends h
-            to_send = str(h).encode()  # Convert to bytes
-            conn.sendall(to_send)
+    # Initiate Eve
+    eve = DHAttacker(our_cyclic_group)
+    attack = SmallSubgroupAttack(eve, our_p - 1, factors)
 
-            # Save Bob's public key
-            eve.pub_key = int(conn.recv(1024).decode())
+    # Initiate connection
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((HOST, PORT))
+        s.listen()
+        conn, addr = s.accept()
 
-            # Send whatever as iv
-            conn.sendall(rand_bytes(16))
+        # Communicate
+        with conn:
+            print(f"Connected by {addr}")
+            channel = Channel(conn)
 
-            # Receive ciphertext
-            eve.rec_msg = conn.recv(1024)
-            print(f'Received encrypted message:\n{eve.rec_msg}')
+            # Send an element of order factor for each factor at once,
+            # brute force the mac of each reply as it comes in.
+            # Secret key mod the product of factors is given by the Chinese remainder theorem
+            attack.run(channel, verbose=True)
 
-            # Brute force the key mod factor by repeatedly testing the mac.
-            # Only 'factor' possibilities
-            powers[j] = eve.key_mod(h, factor)
+            # End connection
+            channel.send(STOP)
 
-        # End connection
-        conn.sendall(b'STOP')
+    assert eve.part_key_mod == fact_prod
 
-print(powers)
+    print(f"Bob's secret key modulo {eve.part_key_mod} is: {eve.part_key}\n"
+          f"Bob's public key is {eve.pub_key}")
 
-# Secret key is given by the Chinese remainder theorem
-eve.part_key, eve.part_key_mod = (crt(factors, powers), fact_prod)
+    ans = eve.kangaroo()
 
-print(f"Bob's secret key modulo {eve.part_key_mod} is: {eve.part_key}\n"
-      f"Bob's public key is {eve.pub_key}")
+    print(f"Bob's secret key is {ans}")
 
-ans = eve.kangaroo()
 
-print(f"Bob's secret key is {ans}")
+# Guarded, as the attack's worker processes import this script under spawn and forkserver
+if __name__ == '__main__':
+    main()
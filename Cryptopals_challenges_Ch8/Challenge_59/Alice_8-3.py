@@ -1,10 +1,11 @@
 # Alice is the sender in a standard Diffie-Hellman key exchange protocol
 # Cryptopals chapter 8
 
+import os
 import socket
 from DH import DHSender
-from Group import EGroup
-from Cryptopals_main import parser
+from Group import EGroup, CycGroup
+from Framing import Channel, STOP
 
 # Curve parameters
 our_p = 233970423115425145524320034830162017933
@@ -16,7 +17,9 @@ our_g = (182, 85518893674295321206118380980485522083)
 our_q = 29246302889428143187362802287225875743
 
 # Declare elliptic curve, pass generator and its order
-our_curve = EGroup(our_p, our_a, our_b, our_g, our_q)
+# Powers of g are kept next to this script between runs
+table_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'g_59.table')
+our_curve = CycGroup.from_generator(EGroup(our_p, our_a, our_b), our_g, our_q, table_path)
 
 # Initiate Alice, argument is message we wish to send
 alice = DHSender(b'Hello', our_curve)
@@ -34,15 +37,13 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     # Communicate
     with conn:
         print(f"Connected by {addr}")
+        channel = Channel(conn)
 
         # Alice sends group element A
-        to_send = f'x={alice.A[0]}&y={alice.A[1]}'.encode()
-        conn.sendall(to_send)
+        channel.send_element(alice.A)
 
         # Alice receives group element B
-        to_parse = conn.recv(1024).decode()
-        dic = parser(to_parse)
-        alice.B = (int(dic['x']), int(dic['y']))
+        alice.B = channel.recv_element()
 
         # Alice calculates key
         alice.s = alice.gen_s()
@@ -51,23 +52,17 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         # Create cipher
         alice.key = alice.gen_key()
         print(f'Key is {alice.key}')
-        alice.encode = alice.gen_code(alice.msg_to_send)  # Holds message and cipher
 
         # Send iv
-        alice.iv = alice.encode.iv
-        to_send = alice.iv
-        conn.sendall(to_send)
-        print(f'iv:\n{to_send}')
+        channel.send(alice.iv)
+        print(f'iv:\n{alice.iv}')
 
-        # Receive ciphertext
-        alice.rec_msg = conn.recv(1024)
+        # Receive ciphertext, authenticate and prepare for decoding
+        alice.decode = alice.recv_encrypted(channel, mac=True)
         print(f'Received encrypted message:\n{alice.rec_msg}')
 
-        # Prepare message for decoding
-        alice.decode = alice.gen_decode_hmac(alice.rec_msg)
-
         # Decode
         print(alice.decode.cbc_solve())
 
         # End connection
-        conn.sendall(b'STOP')
+        channel.send(STOP)
@@ -1,10 +1,11 @@
 # Bob is the receiver in a standard Diffie-Hellman key exchange protocol
 # Cryptopals chapter 8
 
+import os
 import socket
 from DH import DHReceiver
-from Group import EGroup
-from Cryptopals_main import parser
+from Group import EGroup, CycGroup
+from Framing import Channel, STOP, decode_element
 
 # Curve parameters
 our_p = 233970423115425145524320034830162017933
@@ -16,7 +17,9 @@ our_g = (182, 85518893674295321206118380980485522083)
 our_q = 29246302889428143187362802287225875743
 
 # Declare elliptic curve, pass generator and its order
-our_curve = EGroup(our_p, our_a, our_b, our_g, our_q)
+# Powers of g are kept next to this script between runs
+table_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'g_59.table')
+our_curve = CycGroup.from_generator(EGroup(our_p, our_a, our_b), our_g, our_q, table_path)
 
 # Initiate Bob
 bob = DHReceiver(our_curve)
@@ -30,32 +33,29 @@ PORT = 65432  # The port used by the server
 # Establish connection
 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     s.connect((HOST, PORT))
+    channel = Channel(s)
 
     while True:
         # Communicate
         # Bob receives A
-        data_A = s.recv(1024)
+        data_A = channel.recv()
 
         # If no transmission, close connection
-        if data_A == b'STOP':
+        if data_A == STOP:
             break
 
-        # A is a group element
-        to_parse = data_A.decode()
-        print(f'to parse:{to_parse}')
-        dic = parser(to_parse)
-        bob.A = (int(dic['x']), int(dic['y']))
+        # A is a group element, a point on the curve
+        bob.A = decode_element(data_A)
 
         # Bob sends group element B
-        to_send = f'x={bob.B[0]}&y={bob.B[1]}'.encode()
-        s.sendall(to_send)
+        channel.send_element(bob.B)
 
         # Bob calculates key (a group element)
         bob.s = bob.gen_s()
         print(f'Element for key is {bob.s}')
 
         # Receive iv
-        bob.iv = s.recv(1024)
+        bob.iv = channel.recv()
         print(f'iv:\n{bob.iv}')
 
         # Create cipher
@@ -65,11 +65,6 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         # Send message
         bob.reply = b'Crazy flamboyant for the rap enjoyment'
 
-        # Prepare message and cipher for reply
-        bob.encode = bob.gen_code(bob.reply)
-
-        # Send encrypted message
-        ciphertext = bob.encode.cbc_encrypt().easybyte.b  # ciphertext
-        macced_ciphertext = bob.add_hmac(ciphertext)
-        s.sendall(macced_ciphertext)  # Add HMAC to ciphertext
+        # Send encrypted message, with HMAC appended
+        bob.send_encrypted(channel, bob.reply, mac=True)
         print(f'Sent encrypted message')
@@ -3,27 +3,88 @@ Classes related to Diffie-Hellman key exchange
 Now with subclasses.
 """
 
-from random import randint
-from Cryptopals_main import AESCode
-from Cryptopals_main import rand_bytes
+import os
+import threading
+from functools import lru_cache
+from Randomness import randint  # Secret exponents
+from AESModes import AESCode
+from ByteUtils import rand_bytes
 from hashlib import sha256
 import hmac
 from Group import CycGroup
+from PohligHellman import search_residue, residues_from_tests
 
 # Large number operations
-def power_mod(b, e, m):
+class FixedBase:
+    """Table of powers of a fixed base b mod m, for fast exponentiation of b
+    Row i holds b**(d * 2**(w*i)) % m for every w-bit digit d, so that b**e % m
+    needs one multiplication per nonzero w-bit digit of e, and no squarings.
+    Rows are built lazily, as exponents requiring them come up.
+
+    Parameters
+    ----------
+    b: int
+        Fixed base
+    m: int
+        Modulus
+    w: int
+        Window: number of bits of the exponent dealt with per multiplication.
+        A table has 2**w - 1 powers per row: for a 1536-bit exponent, about 4 MB with w=6
+        and 11 MB with w=8
+    """
+    def __init__(self, b: int, m: int, w=6):
+        self.b = b % m
+        self.m = m
+        self.w = w
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def _extend(self, n_rows: int):
+        # Builds rows up to n_rows
+        with self._lock:
+            while len(self.rows) < n_rows:
+                # First entry of the next row is b**(2**(w*i))
+                base = self.rows[-1][-1] * self.rows[-1][1] % self.m if self.rows else self.b
+
+                row = [1, base]
+                for _ in range(2, 1 << self.w):
+                    row.append(row[-1] * base % self.m)
+
+                self.rows.append(row)
+
+    def power(self, e: int):
+        # Returns b**e % m
+        n_rows = -(-e.bit_length() // self.w)  # Ceiling division
+        if n_rows > len(self.rows):
+            self._extend(n_rows)
+
+        x = 1
+        mask = (1 << self.w) - 1
+        rows = self.rows
+        i = 0
+        while e:
+            digit = e & mask
+            if digit:
+                x = x * rows[i][digit] % self.m
+            e >>= self.w
+            i += 1
+
+        return x
+
+@lru_cache(maxsize=4)
+def fixed_base(b: int, m: int):
+    # Returns the (cached) table of powers of b mod m
+    # Few tables are kept, each up to a few MB for 1536-bit moduli
+    return FixedBase(b, m)
+
+def power_mod(b, e, m, fixed=False):
     # Calculates b**e % m, useful for large numbers
-    x = 1
-    while e > 0:
-        # Calculate b to the power of powers of two
-        # Simulatneously decompose e into powers of two
-        b, e, x = (
-            b * b % m,
-            e // 2,
-            b * x % m if e % 2 else x
-        )
-
-    return x
+    # Set fixed=True when b is used as a base again and again with the same m:
+    # a table of powers of b is then kept and reused
+    if fixed and e > 0:
+        return fixed_base(b, m).power(e)
+
+    return pow(b, e, m)
 
 # Check SHA-256 HMAC
 def check_hmac(c_text: bytes, key: bytes):
@@ -38,6 +99,36 @@ def check_hmac(c_text: bytes, key: bytes):
     # Perform check: return True or False for pass or fail
     return mac == hmac.new(key, msg, sha256).digest()
 
+def element_to_key(s):
+    # From the group element s agreed upon, generates a key to be used for encryption
+    key_bytes = str(s).encode()  # Transform element to bytes
+
+    return sha256(key_bytes).digest()[0:16]  # Hash and return 16-byte key
+
+def gen_keypair(group: CycGroup):
+    # Returns a secret exponent b and the public key g**b
+    b = randint(0, group.q - 1)
+
+    return b, group.scale(group.g, b)
+
+class MacTest:
+    """Checks whether a ciphertext carries a SHA-256 HMAC under the key derived from a group element
+    The ciphertext is split into message and mac once, and each candidate element is then
+    checked with a one-shot HMAC. Instances can be sent to other processes (see PohligHellman)
+
+    Parameters
+    ----------
+    c_text: bytes
+        Ciphertext with SHA-256 HMAC appended
+    """
+    def __init__(self, c_text: bytes):
+        self.msg = c_text[:-32]
+        self.mac = c_text[-32:]  # SHA256 -> 32 bytes
+
+    def __call__(self, s):
+        # Returns True if the mac is valid under the key derived from group element s
+        return hmac.compare_digest(hmac.digest(element_to_key(s), self.msg, 'sha256'), self.mac)
+
 class DH:
     """General class for a standard Diffie-Hellman key exchange protocol
     Instances to be created with subclasses DHSender, DHReceiver, DHMITM, DHAttacker
@@ -87,16 +178,14 @@ class DH:
 
     def gen_key(self):
         # From the element self.s, generates a key to be used for encryption
-        assert type(self.s) == int
+        assert type(self.s) in (int, tuple)  # Integer, or point on a curve
 
-        key_bytes = str(self.s).encode()  # Transform integer to bytes
-
-        return sha256(key_bytes).digest()[0:16]  # Hash and return 16-byte key
+        return element_to_key(self.s)
 
     def gen_code(self, msg):
         # Generates AESCode instance holding message to be encrypted/decrypted along with cipher
         # AESCode method self.cbc_encrypt()/self.cbc_solve() will be used
-        code = AESCode(msg, key=self.key, iv=self.iv)
+        code = AESCode.from_bytes(msg, key=self.key, iv=self.iv)
 
         return code
 
@@ -112,7 +201,7 @@ class DH:
         except AssertionError:
             print('Authentication Error')
 
-        code = AESCode(msg, key=self.key, iv=self.iv)
+        code = AESCode.from_bytes(msg, key=self.key, iv=self.iv)
 
         return code
 
@@ -122,6 +211,29 @@ class DH:
 
         return ciphertext + our_hmac
 
+    # Protocol helpers, messages go through a Framing.Channel
+    def send_encrypted(self, channel, msg: bytes, mac=False, send_iv=False):
+        # Encrypts msg under self.key and self.iv and sends the ciphertext, with an hmac appended if mac
+        # If send_iv, self.iv is sent first, in the same batch as the ciphertext
+        # Returns the ciphertext sent
+        ciphertext = self.gen_code(msg).cbc_encrypt().easybyte.b
+        if mac:
+            ciphertext = self.add_hmac(ciphertext)
+
+        if send_iv:
+            channel.send(self.iv, ciphertext)
+        else:
+            channel.send(ciphertext)
+
+        return ciphertext
+
+    def recv_encrypted(self, channel, mac=False):
+        # Receives a ciphertext, with an hmac appended if mac, and keeps it in self.rec_msg
+        # Returns an AESCode instance holding it, ready to be decoded
+        self.rec_msg = channel.recv()
+
+        return self.gen_decode_hmac(self.rec_msg) if mac else self.gen_code(self.rec_msg)
+
 class DHSender(DH):
     """The sender for a standard Diffie-Hellman key exchange protocol
 
@@ -181,11 +293,12 @@ class DHReceiver(DH):
 
     Parameters
     ----------
+    keys: tuple, optional
+        Precomputed key pair (b, B), with B = g**b. Generated if not given
     """
-    def __init__(self, group: CycGroup):
+    def __init__(self, group: CycGroup, keys=None):
         super().__init__(group)
-        self.b = randint(0, group.q - 1)
-        self.B = group.scale(group.g, self.b)
+        self.b, self.B = keys if keys else gen_keypair(group)
         self.encode = None
         self.rec_msg = None
         self.decode = None
@@ -231,6 +344,8 @@ class DHAttacker(DH):
     ----------
     rec_msg: bytes
         Message sent by DHReceiver
+    last_search: ResidueSearch
+        Candidates tested and time taken by the last call to key_mod
 
     Parameters
     ----------
@@ -241,19 +356,27 @@ class DHAttacker(DH):
         self.pub_key = None
         self.part_key = None
         self.part_key_mod = None
+        self.last_search = None
 
-    def key_mod(self, h, m):
+    def key_mod(self, h, m, workers=1):
         # rec_msg has mac generated with key h**i for some i, with h**m = id
-        # This program finds i through brute force
-        i = 0
-        while i < m:
-            self.s = self.group.scale(h, i)
-            potential_key = self.gen_key()
-            if check_hmac(self.rec_msg, potential_key):
-                return i  # We have cracked secret key mod factor
-            i += 1
+        # This program finds i through brute force, stepping through powers of h
+        # Candidates are spread across workers processes, the search is kept in last_search
+        self.last_search = search_residue(self.group, h, m, MacTest(self.rec_msg), workers)
+        if self.last_search.residue is None:
+            raise Exception('Error: no value found')
+
+        return self.last_search.residue  # We have cracked secret key mod factor
 
-        raise Exception('Error: no value found')
+    def keys_mod(self, jobs, workers=None):
+        # Runs key_mod for each (h, m, rec_msg) in jobs, in a pool of workers processes
+        # Returns the secret key mod each m
+        tests = [(h, m, MacTest(rec_msg)) for h, m, rec_msg in jobs]
+        residues = residues_from_tests(self.group, tests, workers or os.cpu_count())
+        if None in residues:
+            raise Exception('Error: no value found')
+
+        return residues
 
     def _prep_kangaroo(self):
         # Prepares variables for method kangaroo
@@ -274,10 +397,10 @@ class DHAttacker(DH):
 
         return new_g, new_y, end
 
-    def kangaroo(self):
+    def kangaroo(self, workers=None):
         # Given our knowledge of defender's private key, (i.e. its modulus modulo some integer <p),
         # and the public key, calculates the private key using:
-        # Pollard's Method for Catching Kangaroos
+        # Pollard's Method for Catching Kangaroos, with herds of kangaroos spread across workers processes
 
         # Transform variables, obtaining the continuous interval required for the method
         new_g, new_y, end = self._prep_kangaroo()
@@ -287,7 +410,10 @@ class DHAttacker(DH):
         new_group = CycGroup.from_generator(self.group, new_g, None)
 
         # Call kangaroo method
-        new_index = new_group.disc_log(0, end, new_g, new_y)
+        result = new_group.disc_log(0, end, new_g, new_y, workers=workers or os.cpu_count())
+        if result.x is None:
+            raise Exception('Error: kangaroo has not been caught')
+        new_index = result.x
 
         # Transform back to get the private key
         ans = (self.part_key + new_index * self.part_key_mod) % self.group.q
@@ -296,38 +422,65 @@ class DHAttacker(DH):
 
         return ans
 
+# SRP, challenges 36 to 38
+# NIST prime, agreed upon by client and server
+SRP_N = int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024e088a67cc'
+            '74020bbea63b139b22514a08798e3404ddef9519b3cd3a431b302b0a6df25f'
+            '14374fe1356d6d51c245e485b576625e7ec6f44c42e9a637ed6b0bff5cb6f4'
+            '06b7edee386bfb5a899fa5ae9f24117c4b1fe649286651ece45b3dc2007cb8'
+            'a163bf0598da48361c55d39a69163fa8fd24cf5f83655d23dca3ad961c62f3'
+            '56208552bb9ed529077096966d670c354e4abc9804f1746c08ca237327ffff'
+            'ffffffffffff', 16)
+
+def gen_verifier(salt: bytes, password: bytes, g=2, N=SRP_N):
+    # Password verifier v = g**x, with x = SHA256(salt|password)
+    x = int(sha256(salt + password).hexdigest(), 16)
+
+    return power_mod(g, x, N, fixed=True)
+
+def gen_ephemeral(g=2, N=SRP_N):
+    # Returns a secret exponent b and g**b, the password independent part of B
+    b = randint(0, N)
+
+    return b, power_mod(g, b, N, fixed=True)
+
 # noinspection PyPep8Naming
 class Server:
+    """Server side of SRP
+
+    Parameters
+    ----------
+    email: bytes
+    password: bytes
+        Agreed upon email and password, password is not needed if v is given
+    salt: bytes, optional
+    v: int, optional
+        Salt and password verifier, if already stored (see SRPServer). Generated if not given
+    keys: tuple, optional
+        Precomputed pair (b, g**b). Generated if not given
+    """
     def __init__(self, email: bytes, password: bytes,
-                 p=int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024e088a67cc'
-                       '74020bbea63b139b22514a08798e3404ddef9519b3cd3a431b302b0a6df25f'
-                       '14374fe1356d6d51c245e485b576625e7ec6f44c42e9a637ed6b0bff5cb6f4'
-                       '06b7edee386bfb5a899fa5ae9f24117c4b1fe649286651ece45b3dc2007cb8'
-                       'a163bf0598da48361c55d39a69163fa8fd24cf5f83655d23dca3ad961c62f3'
-                       '56208552bb9ed529077096966d670c354e4abc9804f1746c08ca237327ffff'
-                       'ffffffffffff', 16),
-                 g=2, k=3):
+                 p=SRP_N, g=2, k=3, salt=None, v=None, keys=None):
         self.N = p
         self.g = g
         self.k = k
         self.E = email
-        self.salt = rand_bytes(8)  # Generate a 64-bit salt
-        self.v = self.gen_v(password)  # Password verifier
+        self.salt = rand_bytes(8) if salt is None else salt  # Generate a 64-bit salt
+        self.v = self.gen_v(password) if v is None else v  # Password verifier
         self.A = None
-        self.b = randint(0, p)
-        self.B = (k * self.v + power_mod(g, self.b, p)) % p
+        self.b, g_b = keys if keys else gen_ephemeral(g, p)
+        self.B = self.gen_B(g_b)
         self.u = None  # Random scrambling parameter
         self.K = None
         self.h = None
 
     def gen_v(self, password):
         # Password verifier
+        return gen_verifier(self.salt, password, self.g, self.N)
 
-        # Create private key
-        xH = sha256(self.salt + password)  # Hash salt|password
-        x = int(xH.hexdigest(), 16)  # Convert hash to integer
-
-        return power_mod(self.g, x, self.N)
+    def gen_B(self, g_b: int):
+        # B = k*v + g**b, sent to the client along with the salt
+        return (self.k * self.v + g_b) % self.N
 
     def gen_u(self):
         # Random scrambling parameter
@@ -350,14 +503,7 @@ class Server:
 # noinspection PyPep8Naming
 class Client:
     def __init__(self, email: bytes, password: bytes,
-                 p=int('ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd129024e088a67cc'
-                       '74020bbea63b139b22514a08798e3404ddef9519b3cd3a431b302b0a6df25f'
-                       '14374fe1356d6d51c245e485b576625e7ec6f44c42e9a637ed6b0bff5cb6f4'
-                       '06b7edee386bfb5a899fa5ae9f24117c4b1fe649286651ece45b3dc2007cb8'
-                       'a163bf0598da48361c55d39a69163fa8fd24cf5f83655d23dca3ad961c62f3'
-                       '56208552bb9ed529077096966d670c354e4abc9804f1746c08ca237327ffff'
-                       'ffffffffffff', 16),
-                 g=2, k=3):
+                 p=SRP_N, g=2, k=3):
         self.N = p
         self.g = g
         self.k = k
@@ -365,7 +511,7 @@ class Client:
         self.P = password
         self.salt = None
         self.a = randint(0, p)
-        self.A = power_mod(g, self.a, p)
+        self.A = power_mod(g, self.a, p, fixed=True)
         self.B = None
         self.u = None  # Random scrambling parameter
         self.K = None
@@ -380,8 +526,58 @@ class Client:
     def gen_K(self):
         xH = sha256(self.salt + self.P)  # Hash salt|password
         x = int(xH.hexdigest(), 16)  # Convert hash to integer
-        S = power_mod((self.B - self.k * power_mod(self.g, x, self.N)),
+        S = power_mod((self.B - self.k * power_mod(self.g, x, self.N, fixed=True)),
                       self.a + self.u * x, self.N)
         K = sha256(str(S).encode()).digest()  # Convert int S to bytes and hash
 
         return K
+
+    def gen_h(self):
+        # HMAC-SHA256(K, salt), sent to the server
+        return hmac.new(self.K, self.salt, sha256).digest()
+
+# Simplified SRP, challenge 38
+class SimpleServer(Server):
+    """Server for simplified SRP: B = g**b does not depend on the password verifier,
+    and u is a random 128-bit number rather than a hash of A and B
+
+    Parameters
+    ----------
+    email: bytes
+    password: bytes
+        Agreed upon email and password
+    """
+    def __init__(self, email: bytes, password: bytes, **kwargs):
+        super().__init__(email, password, **kwargs)
+        self.u = self.gen_u()
+
+    def gen_B(self, g_b: int):
+        # B = g**b, as computed by Server.__init__
+        return g_b
+
+    def gen_u(self):
+        # Random scrambling parameter, sent to the client along with salt and B
+        return randint(0, 2 ** 128 - 1)
+
+    def gen_K(self):
+        # S = (A * v**u)**b
+        S = power_mod(self.A * power_mod(self.v, self.u, self.N) % self.N, self.b, self.N)
+
+        return sha256(str(S).encode()).digest()
+
+class SimpleClient(Client):
+    """Client for simplified SRP, u is received from the server
+
+    Parameters
+    ----------
+    email: bytes
+    password: bytes
+        Agreed upon email and password
+    """
+    def gen_K(self):
+        # S = B**(a + u*x)
+        xH = sha256(self.salt + self.P)  # Hash salt|password
+        x = int(xH.hexdigest(), 16)  # Convert hash to integer
+        S = power_mod(self.B, self.a + self.u * x, self.N)
+
+        return sha256(str(S).encode()).digest()
@@ -0,0 +1,217 @@
+"""
+Asyncio Diffie-Hellman server: Bob, for many clients at once
+Each connection is a session with its own DHReceiver, speaking the protocol of Bob_8-1.py
+over framed messages (see Framing):
+    client sends A, server answers B
+    client sends iv, server answers with its reply, encrypted and with an HMAC appended
+repeated until the client sends STOP or disconnects.
+Group exponentiations are run in a pool of processes, so that the event loop keeps serving.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from DH import DHReceiver, DHSender, gen_keypair
+from Framing import STOP, read_frame, write_frames, encode_element, decode_element
+from Metrics import LatencyRecorder
+
+# Worker processes are sent the group once, when they start
+_group = None
+
+def _init_worker(group):
+    global _group
+    _group = group
+
+def _keypair():
+    return gen_keypair(_group)
+
+def _shared(el, k: int):
+    return _group.scale(el, k)
+
+
+class DHServer:
+    """Accepts any number of concurrent Diffie-Hellman sessions
+
+    Attributes
+    ----------
+    metrics: LatencyRecorder
+        Latency of each handshake, from receiving A to sending the encrypted reply
+    sessions: int
+        Number of sessions served to completion
+
+    Parameters
+    ----------
+    group: CycGroup
+        Group agreed upon with the clients
+    reply: bytes
+        Message sent back at the end of each handshake
+    workers: int, optional
+        Number of processes for group exponentiations, by default one per CPU.
+        With 0, exponentiations are run in the event loop
+    """
+    def __init__(self, group, reply=b'Crazy flamboyant for the rap enjoyment', workers=None):
+        self.group = group
+        self.reply = reply
+        self.workers = os.cpu_count() if workers is None else workers
+        self.metrics = LatencyRecorder()
+        self.sessions = 0
+        self.pool = None
+        self.server = None
+        self._started = None
+
+    async def _run(self, fun, *args):
+        # Runs fun in the process pool if there is one
+        if self.pool is None:
+            return fun(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fun, *args)
+
+    async def handle(self, reader, writer):
+        # Serves a single connection, with its own secret key
+        shared = None
+        try:
+            bob = DHReceiver(self.group, keys=await self._run(_keypair))
+            bob.reply = self.reply
+
+            while True:
+                try:
+                    data_A = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break  # Client disconnected
+
+                if data_A == STOP:
+                    break
+
+                start = time.perf_counter()
+                bob.A = decode_element(data_A)
+
+                # Send B straight away, then work out the shared element while the client sends its iv
+                write_frames(writer, encode_element(bob.B))
+                shared = asyncio.ensure_future(self._run(_shared, bob.A, bob.b))
+                bob.iv = await read_frame(reader)
+                bob.s = await shared
+                bob.key = bob.gen_key()
+
+                ciphertext = bob.gen_code(bob.reply).cbc_encrypt().easybyte.b
+                write_frames(writer, bob.add_hmac(ciphertext))
+                await writer.drain()
+
+                self.metrics.record('handshake', time.perf_counter() - start)
+
+            self.sessions += 1
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client dropped in the middle of a handshake
+
+        except ValueError:
+            pass  # Malformed public key (decode_element), the connection is dropped
+
+        finally:
+            if shared is not None and not shared.done():
+                shared.cancel()  # Client gone before its iv, the shared element is not needed
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=65432):
+        # Starts listening, returns the port (useful with port=0)
+        if self.workers:
+            # Spawned rather than forked, so that workers do not inherit the sockets of open connections
+            # (a connection closed by the server would otherwise stay open in its workers)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_init_worker, initargs=(self.group,))
+        else:
+            _init_worker(self.group)
+        self.server = await asyncio.start_server(self.handle, host, port)
+        self._started = time.perf_counter()
+
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
+
+    def report(self):
+        # Returns sessions served, sessions per second since start and handshake latency percentiles
+        seconds = time.perf_counter() - self._started if self._started else 0.0
+
+        return {
+            'sessions': self.sessions,
+            'sessions_per_sec': self.sessions / seconds if seconds else 0.0,
+            **self.metrics.snapshot(),
+        }
+
+
+async def run_client(group, host: str, port: int, n_handshakes=1, msg=b'Hello'):
+    # Alice: runs n_handshakes key exchanges over one connection, returns the replies decrypted
+    reader, writer = await asyncio.open_connection(host, port)
+    alice = DHSender(msg, group)
+    replies = []
+
+    try:
+        for _ in range(n_handshakes):
+            # A and iv are sent together, without waiting for B
+            write_frames(writer, encode_element(alice.A), alice.iv)
+            await writer.drain()
+
+            alice.B = decode_element(await read_frame(reader))
+            alice.s = alice.gen_s()
+            alice.key = alice.gen_key()
+
+            alice.rec_msg = await read_frame(reader)
+            replies.append(alice.gen_decode_hmac(alice.rec_msg).cbc_solve())
+
+        write_frames(writer, STOP)
+        await writer.drain()
+        await reader.read()  # Server closes the connection once the session is over
+
+    finally:
+        writer.close()
+
+    return replies
+
+async def load_test(group, host: str, port: int, n_clients=20, n_handshakes=5):
+    # Runs n_clients concurrent clients, returns the number of replies received and the time taken
+    start = time.perf_counter()
+    results = await asyncio.gather(*[run_client(group, host, port, n_handshakes) for _ in range(n_clients)])
+
+    return sum(len(replies) for replies in results), time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    import argparse
+    from Group import ModP, CycGroup
+
+    # Challenge 57 parameters
+    our_p = int('8977C3217DA1F838B8D24B4A790DE8FC8E35AD5483E463028EF9BBF9AF23A9BD1231EBA9A'
+                'C7E44363D8311D610B09AA224A023268EE8A60AC484FD9381962563', 16)
+    our_g = int('572AFF4A93EC6214C1036C62E1818FE5E4E1D6DB635C1B12D9572203C47D241A0E543A89B'
+                '0B12BA61062411FCF3D29C6AB8C3CE6DAC7D2C9F7F0EBD3B7878AAF', 16)
+    our_q = 236234353446506858198510045061214171961
+    our_group = CycGroup.from_generator(ModP(our_p), our_g, our_q)
+
+    parser = argparse.ArgumentParser(description='Multi-session Diffie-Hellman server')
+    parser.add_argument('--port', type=int, default=65432)
+    parser.add_argument('--workers', type=int, default=None, help='processes for exponentiations')
+    parser.add_argument('--load', action='store_true', help='run a load test against the server and exit')
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--handshakes', type=int, default=5, help='handshakes per client')
+    args = parser.parse_args()
+
+    async def main():
+        server = DHServer(our_group, workers=args.workers)
+        port = await server.start(port=args.port)
+        print(f'Listening on port {port}')
+
+        if args.load:
+            n_replies, seconds = await load_test(our_group, '127.0.0.1', port, args.clients, args.handshakes)
+            print(f'{n_replies} handshakes in {seconds:.2f}s')
+            print(server.report())
+            await server.stop()
+        else:
+            await server.server.serve_forever()
+
+    asyncio.run(main())
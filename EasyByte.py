@@ -105,6 +105,14 @@ class EasyByte:
     def __init__(self, code, base=None):
         self.b = EasyByte.make_byte(self, code, base)
 
+    @classmethod
+    def from_bytes(cls, b: bytes):
+        # EasyByte holding b as is, skipping the file check and format conversion of __init__
+        easybyte = cls.__new__(cls)
+        easybyte.b = b
+
+        return easybyte
+
     def make_byte(self, code, base=None):
         # Translate string in multiple formats to byte string
         # If a file is given, the file is first converted to a single line string
@@ -148,7 +156,7 @@ class EasyByte:
         # XORs the byte according to 'key' in 'base' format.
         key = EasyByte.make_byte(self, key, base)
 
-        return EasyByte(xorb(self.b, key))
+        return EasyByte.from_bytes(xorb(self.b, key))
 
     def hamming(self, b2, base=None):
         # Returns the Hamming distance between the byte and a second byte 'b2',
@@ -0,0 +1,134 @@
+"""
+Length-prefixed framing for the socket scripts
+Each message is sent as a 4-byte big-endian length followed by the message itself,
+so that messages of any size can be sent back to back and read one at a time,
+whatever way the bytes are split or coalesced by the network.
+Frames longer than MAX_FRAME are refused, so that a single header cannot make a reader
+allocate gigabytes.
+"""
+
+import struct
+
+HEADER = struct.Struct('>I')  # Length of the frame that follows
+STOP = b'STOP'  # Sent to end a session
+MAX_FRAME = 1 << 24  # Greatest frame length accepted, 16 MiB
+
+
+class FrameTooLarge(ConnectionError):
+    # A header announced more than MAX_FRAME bytes. The stream cannot be trusted past it, so the
+    # connection is to be dropped, as for any other ConnectionError
+    pass
+
+
+def frame(payload: bytes) -> bytes:
+    # Returns payload preceded by its length
+    return HEADER.pack(len(payload)) + payload
+
+def frame_length(header: bytes) -> int:
+    # Returns the length announced by a header, raises FrameTooLarge if it is over MAX_FRAME
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise FrameTooLarge(f'Frame of {length} bytes announced, over the limit of {MAX_FRAME}')
+
+    return length
+
+def send_frame(sock, payload: bytes):
+    # Sends payload as a single frame
+    sock.sendall(frame(payload))
+
+def send_many(sock, payloads):
+    # Sends each payload as its own frame, with a single call to sendall
+    sock.sendall(b''.join(frame(payload) for payload in payloads))
+
+def encode_element(el) -> bytes:
+    # Group element to bytes: integers in decimal, curve points as x,y
+    if isinstance(el, tuple):
+        return ','.join(str(coord) for coord in el).encode()
+
+    return str(el).encode()
+
+def decode_element(data: bytes):
+    # Inverse of encode_element
+    text = data.decode()
+    if ',' in text:
+        return tuple(int(coord) for coord in text.split(','))
+
+    return int(text)
+
+
+class FrameReader:
+    """Reads length-prefixed frames from a socket
+    Bytes received beyond the current frame are kept for the following frames
+
+    Parameters
+    ----------
+    sock: socket.socket
+        Connected socket to read from
+    bufsize: int
+        Greatest number of bytes asked for per call to recv
+    """
+    def __init__(self, sock, bufsize=65536):
+        self.sock = sock
+        self.bufsize = bufsize
+        self.buffer = bytearray()
+
+    def _fill(self, n: int):
+        # Receives until at least n bytes are buffered
+        while len(self.buffer) < n:
+            data = self.sock.recv(self.bufsize)
+            if not data:
+                raise ConnectionError('Connection closed in the middle of a frame')
+            self.buffer += data
+
+    def recv(self) -> bytes:
+        # Returns the next frame
+        self._fill(HEADER.size)
+        length = frame_length(self.buffer[:HEADER.size])
+
+        self._fill(HEADER.size + length)
+        payload = bytes(self.buffer[HEADER.size:HEADER.size + length])
+        del self.buffer[:HEADER.size + length]
+
+        return payload
+
+
+class Channel:
+    """Framed connection: messages sent with send are received whole by recv on the other end
+
+    Parameters
+    ----------
+    sock: socket.socket
+        Connected socket
+    """
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = FrameReader(sock)
+
+    def send(self, *payloads: bytes):
+        # Sends payloads as consecutive frames, in one go
+        send_many(self.sock, payloads)
+
+    def recv(self) -> bytes:
+        # Returns the next message
+        return self.reader.recv()
+
+    def send_element(self, el):
+        # Sends a group element
+        self.send(encode_element(el))
+
+    def recv_element(self):
+        # Returns the next message as a group element
+        return decode_element(self.recv())
+
+
+# asyncio versions, for use with asyncio.StreamReader and asyncio.StreamWriter
+async def read_frame(reader) -> bytes:
+    # Returns the next frame from reader
+    # Raises asyncio.IncompleteReadError if the connection closes first, FrameTooLarge past MAX_FRAME
+    length = frame_length(await reader.readexactly(HEADER.size))
+
+    return await reader.readexactly(length)
+
+def write_frames(writer, *payloads: bytes):
+    # Buffers payloads as consecutive frames on writer, await writer.drain() to send them
+    writer.write(b''.join(frame(payload) for payload in payloads))
@@ -1,14 +1,269 @@
 # Class for group operations
 
-import copy
-from math import isqrt
-from random import randint
+import functools
+import os
+import struct
+import time
+import warnings
+from functools import partial
+from math import gcd, isqrt
+from random import randint, Random
+import Metrics
 
 
-def g_el_to_scalar(y, k):
-    # Pseudorandom function used in disc_log
-    p_rand = pow(2, y, k)
-    return p_rand if p_rand != 0 else 1
+def mod_mult(g1, g2, p):
+    # Multiplication mod p
+    return (g1 * g2) % p
+
+
+def _el_key(el):
+    # Integer derived from a group element, the same in every process
+    # Used to choose kangaroo jumps and distinguished points
+    if isinstance(el, int):
+        return el
+    if isinstance(el, tuple):
+        return el[0]
+    return 0
+
+
+def _walk_herd(add: callable, jump_els, jump_sizes, herd, n_steps: int, dp_mask: int):
+    # Each kangaroo in herd makes n_steps jumps
+    # A kangaroo is a list [index, kind, element, exponent]:
+    # tame ('T') kangaroos sit at g**exponent, wild ('W') ones at y * g**exponent
+    # Returns the herd after jumping and the distinguished points landed on
+    n_jumps = len(jump_els)
+    dps = []
+
+    for kangaroo in herd:
+        index, kind, el, e = kangaroo
+        for _ in range(n_steps):
+            j = _el_key(el) % n_jumps  # Jump size depends only on where the kangaroo is
+            el = add(el, jump_els[j])
+            e += jump_sizes[j]
+
+            if not (_el_key(el) >> 20) & dp_mask:
+                dps.append((index, kind, el, e))
+
+        kangaroo[2], kangaroo[3] = el, e
+
+    return herd, dps
+
+
+class DLogResult:
+    """Outcome of a discrete logarithm search
+
+    Attributes
+    ----------
+    x: int, optional
+        x such that g**x = y, None if no solution was found
+    steps: int
+        Number of group operations made during the search
+    method: str
+        Algorithm used
+    seconds: float
+        Time taken by the search
+    """
+    def __init__(self, x, steps: int, method: str, seconds: float = 0.0):
+        self.x = x
+        self.steps = steps
+        self.method = method
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f'DLogResult(x={self.x}, steps={self.steps}, method={self.method!r}, seconds={self.seconds:.3f})'
+
+
+def _recorded(dlog_method):
+    # Records the time and number of steps of each search made by dlog_method, see Metrics
+    @functools.wraps(dlog_method)
+    def wrapper(*args, **kwargs):
+        result = dlog_method(*args, **kwargs)
+        if Metrics.REGISTRY.enabled:
+            Metrics.record(f'dlog.{result.method}', result.seconds)
+            Metrics.mark(f'dlog.{result.method}.steps', result.steps, result.seconds)
+            Metrics.event(f'dlog.{result.method}', found=result.x is not None, steps=result.steps,
+                          seconds=result.seconds)
+
+        return result
+
+    return wrapper
+
+
+class PowerTable:
+    """Table of powers of a fixed base g, for fast scaling of g
+    Row i holds g**(d * 2**(w*i)) for every w-bit digit d, so that g**k
+    needs one group operation per nonzero w-bit digit of k, and no doublings.
+    Rows are built lazily, as scalars requiring them come up.
+
+    Parameters
+    ----------
+    add: callable
+        Group operation
+    identity
+        Identity element
+    g
+        Fixed base
+    w: int
+        Window: number of bits of the scalar dealt with per group operation
+    """
+    def __init__(self, add: callable, identity, g, w=6):
+        self.add = add
+        self.id = identity
+        self.g = g
+        self.w = w
+        self.rows = []
+
+    def _extend(self, n_rows: int):
+        # Builds rows up to n_rows
+        # The new list is only swapped in once complete, so concurrent readers see whole rows
+        rows = list(self.rows)
+        while len(rows) < n_rows:
+            # First entry of the next row is g**(2**(w*i))
+            base = self.add(rows[-1][-1], rows[-1][1]) if rows else self.g
+
+            row = [self.id, base]
+            for _ in range(2, 1 << self.w):
+                row.append(self.add(row[-1], base))
+
+            rows.append(row)
+
+        self.rows = rows
+
+    def scale(self, k: int):
+        # Returns g ** k
+        n_rows = -(-k.bit_length() // self.w)  # Ceiling division
+        if n_rows > len(self.rows):
+            self._extend(n_rows)
+
+        result = None  # Stands for the identity until the first nonzero digit
+        mask = (1 << self.w) - 1
+        rows = self.rows
+        i = 0
+        while k:
+            digit = k & mask
+            if digit:
+                result = rows[i][digit] if result is None else self.add(result, rows[i][digit])
+            k >>= self.w
+            i += 1
+
+        return self.id if result is None else result
+
+    # Tables on disk: a header, then rows one after the other, without their first entry (the identity)
+    # Entries are integers, or points (x, y) with the point at infinity written as x = y = 2**(8*width) - 1
+    HEADER = struct.Struct('>4sBBHH')  # Magic, entries are points, w, number of rows, bytes per integer
+    MAGIC = b'PTAB'
+
+    def save(self, path: str):
+        # Writes the rows built so far to path
+        points = isinstance(self.g, tuple)
+        entries = [el for row in self.rows for el in row[1:]]
+        values = [c for el in entries if isinstance(el, tuple) for c in el] if points else entries
+        width = max(1, -(-max(values, default=0).bit_length() // 8))
+        infinity = (1 << (8 * width)) - 1
+
+        # Written aside then moved, so that a process loading the table never sees it half written
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, points, self.w, len(self.rows), width))
+            for el in entries:
+                if points:
+                    x, y = el if isinstance(el, tuple) else (infinity, infinity)
+                    f.write(x.to_bytes(width, 'big') + y.to_bytes(width, 'big'))
+                else:
+                    f.write(el.to_bytes(width, 'big'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, add: callable, identity):
+        # Returns the table written to path by save, for the group with operation add and identity
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        magic, points, w, n_rows, width = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError(f'{path} is not a table of powers')
+
+        n_values = ((1 << w) - 1) * n_rows * (2 if points else 1)
+        body = memoryview(data)[cls.HEADER.size:]
+        if len(body) != n_values * width:
+            raise ValueError(f'{path} is truncated')
+
+        values = [int.from_bytes(body[i:i + width], 'big') for i in range(0, len(body), width)]
+        if points:
+            infinity = (1 << (8 * width)) - 1
+            values = [identity if x == infinity else (x, y) for x, y in zip(values[::2], values[1::2])]
+
+        per_row = (1 << w) - 1
+        rows = [[identity] + values[i:i + per_row] for i in range(0, len(values), per_row)]
+
+        table = cls(add, identity, rows[0][1] if rows else None, w)
+        table.rows = rows
+
+        return table
+
+
+class JacobianPowerTable(PowerTable):
+    """PowerTable of a point of an EGroup, built and read in Jacobian coordinates
+    Rows are kept as affine points (as on disk), each batch of new rows costing a single
+    modular inversion. scale adds entries up in Jacobian coordinates and inverts once at the end.
+
+    Parameters
+    ----------
+    group: EGroup
+        Curve the fixed base lies on
+    g
+        Fixed base
+    w: int
+        Window: number of bits of the scalar dealt with per group operation
+    """
+    def __init__(self, group, g, w=6):
+        super().__init__(group.add, group.id, g, w)
+        self.group = group
+
+    def _extend(self, n_rows: int):
+        # Builds rows up to n_rows
+        group = self.group
+        rows = list(self.rows)
+
+        # First entry of the next row is g**(2**(w*i))
+        if rows:
+            base = group._j_add(group._to_jacobian(rows[-1][-1]), group._to_jacobian(rows[-1][1]))
+        else:
+            base = group._to_jacobian(self.g)
+
+        j_rows = []
+        while len(rows) + len(j_rows) < n_rows:
+            row = [base]
+            for _ in range(2, 1 << self.w):
+                row.append(group._j_add(row[-1], base))
+            j_rows.append(row)
+            base = group._j_add(row[-1], base)
+
+        pts = group._from_jacobian_many([j_pt for row in j_rows for j_pt in row])
+        per_row = (1 << self.w) - 1
+        rows += [[self.id] + pts[i:i + per_row] for i in range(0, len(pts), per_row)]
+
+        self.rows = rows
+
+    def scale(self, k: int):
+        # Returns g ** k
+        n_rows = -(-k.bit_length() // self.w)  # Ceiling division
+        if n_rows > len(self.rows):
+            self._extend(n_rows)
+
+        group = self.group
+        result = group._J_ID
+        mask = (1 << self.w) - 1
+        rows = self.rows
+        i = 0
+        while k:
+            digit = k & mask
+            if digit:
+                result = group._j_add(result, group._to_jacobian(rows[i][digit]))
+            k >>= self.w
+            i += 1
+
+        return group._from_jacobian(result)
 
 
 class Group:
@@ -18,6 +273,9 @@ class Group:
     ----------
     id: int = 1
         Identity element
+    modulus: int, optional
+        If the group operation is multiplication mod some integer, that integer.
+        Scaling is then left to the built-in pow.
 
     Parameters
     ----------
@@ -26,22 +284,72 @@ class Group:
         self.add = self._trivial_add
         self.id = 1
         self.q = None
+        self.modulus = None
 
     @staticmethod
     def _trivial_add(g1, g2):
         # Trivial group operation
         return g1 * g2
 
+    @staticmethod
+    def _window_size(bits: int):
+        # Window size for sliding-window scaling of a scalar with this many bits
+        if bits < 8:
+            return 1
+        if bits < 64:
+            return 3
+        if bits < 256:
+            return 4
+        return 5
+
     def scale(self, g, k):
-        # Returns self.g ** k
-        result = copy.deepcopy(self.id)
-        x = g
+        # Returns g ** k
+        if k <= 0:
+            return self.id
+
+        if self.modulus is not None:
+            return pow(g, k, self.modulus)
+
+        return self._window_scale(g, k)
+
+    def power_table(self, g, w=6):
+        # Empty table of powers of the fixed base g, filled as scalars come up
+        return PowerTable(self.add, self.id, g, w)
+
+    def _window_scale(self, g, k):
+        # Left-to-right sliding-window scaling, returns g ** k for k > 0
+        bits = k.bit_length()
+        w = self._window_size(bits)
+
+        # Odd powers g, g**3, ..., g**(2**w - 1)
+        odd = [g]
+        if w > 1:
+            g_2 = self.add(g, g)
+            for _ in range((1 << (w - 1)) - 1):
+                odd.append(self.add(odd[-1], g_2))
 
-        while k > 0:
-            if k % 2 == 1:
-                result = self.add(result, x)
-            x = self.add(x, x)
-            k = k >> 1
+        result = None  # Stands for the identity until the first window
+        i = bits - 1
+        while i >= 0:
+            if not (k >> i) & 1:
+                result = self.add(result, result)
+                i -= 1
+                continue
+
+            # Longest window k[i..j] of at most w bits ending in a 1
+            j = max(i - w + 1, 0)
+            while not (k >> j) & 1:
+                j += 1
+            window = (k >> j) & ((1 << (i - j + 1)) - 1)
+
+            if result is None:
+                result = odd[window >> 1]
+            else:
+                for _ in range(i - j + 1):
+                    result = self.add(result, result)
+                result = self.add(result, odd[window >> 1])
+
+            i = j - 1
 
         return result
 
@@ -59,13 +367,19 @@ class Group:
 
         return h
 
-    # noinspection PyPep8Naming
-    def disc_log(self, start: int, end: int, g, y, f: callable = g_el_to_scalar):
+    @_recorded
+    def disc_log(self, start: int, end: int, g, y, workers: int = 1, herd_size: int = None,
+                 max_steps: int = None, seed=None):
         """
-        Pollard's Method for Catching Kangaroos
+        Parallel version of Pollard's Method for Catching Kangaroos (van Oorschot and Wiener)
         Find x such that g**x = y, with the knowledge that x is between start and end.
         Context: Cyclic groups, ex: multiplication of integers mod m
 
+        A herd of tame kangaroos starts from known powers of g, a herd of wild ones from y times known
+        powers of g. Jumps are picked from a precomputed table according to where the kangaroo stands,
+        so two kangaroos landing on the same element follow the same path from then on.
+        Only distinguished elements are stored, and a tame and a wild kangaroo meeting on one gives x.
+
         Parameters
         ----------
         start : int
@@ -76,65 +390,301 @@ class Group:
             Group element we took a power of
         y
             Group element we are trying to invert
-        f: callable
-            Pseudorandom function f:G->S taking group elements to scalars
+        workers: int
+            Number of processes the herds are spread across
+        herd_size: int, optional
+            Number of kangaroos in each of the tame and wild herds
+        max_steps: int, optional
+            Number of jumps after which the search is abandoned
+        seed: optional
+            Seed for the starting points of the kangaroos
 
         Returns
         -------
-        int, optional
-            If x is found such that g**x = y, returns said x
+        DLogResult
+            Holds x such that g**x = y if it was found, and the number of jumps made
         """
+        t_start = time.perf_counter()
         n = end - start  # Length of interval in which the index lies
-        k = isqrt(n) // 2 + 3
-        print(f'k is {k}')
-        big_n = 2 * k
-
-        def f2(x):
-            return f(x, k)
-
-        # Tame kangaroo
-        xT = 0
-        yT = self.scale(g, end)
-
-        # Wild kangaroo
-        xW = 0
-        yW = y
-
-        counter = 0  # Follow progress
-
-        # Tame kangaroo jumps
-        for _ in range(big_n):
-            jump = f2(yT)  # Function gives us pseudorandom jumpsize
-            yT = self.add(yT, self.scale(g, jump))  # Kangaroo jumps
-            xT += jump  # Keep track how far kangaro has jumped (yT *= xT so far)
-
-            # Show progress every so many jumps
-            counter += 1
-            if counter % 10000 == 0:
-                print(f'{counter}/{big_n}')
-
-        # Wild kangaroo catches up to tame kangaroo
-        # Distance to cover is between xT and n + xT
-        while xW < n + xT:
-            jump = f2(yW)  # Function gives us pseudorandom jumpsize
-            yW = self.add(yW, self.scale(g, jump))  # Kangaroo jumps
-            xW += jump  # Keep track how far kangaro has jumped (yW *= xW so far)
-
-            # Check whether paths have coincided
-            # yW will either land on yT or skip past
-            if yW == yT:
-                ans = end + xT - xW
-                assert self.scale(g, ans) == y  # Check our answer
-                print(ans)
-                return ans
-
-            # Show progress every so often
-            counter += 1
-            if counter % 100000 == 0:
-                print(f'{xW}/{xT + n}')
+        rand = Random(seed)
+
+        # Small intervals are searched exhaustively
+        if n < 64:
+            el = self.scale(g, start)
+            for i in range(n + 1):
+                if el == y:
+                    return DLogResult(start + i, i, 'kangaroo', time.perf_counter() - t_start)
+                el = self.add(el, g)
+
+            return DLogResult(None, n + 1, 'kangaroo', time.perf_counter() - t_start)
+
+        herd_size = herd_size or 2 * workers
+        m = 2 * herd_size  # Number of kangaroos
+        root_n = isqrt(n)
+
+        # Jump sizes are powers of two with mean about m * sqrt(n) / 4
+        beta = max(1, m * root_n // 4)
+        n_jumps = 1
+        while ((1 << n_jumps) - 1) // n_jumps < beta:
+            n_jumps += 1
+        jump_sizes = [1 << i for i in range(n_jumps)]
+        jump_els = [self.scale(g, size) for size in jump_sizes]
+
+        # Roughly one in sqrt(n) / (16m) elements is distinguished
+        dp_mask = (1 << max(0, (root_n // (16 * m)).bit_length() - 1)) - 1
+        n_steps = max(4 * (dp_mask + 1), min(1 << 14, root_n // (4 * m) + 1))
+        max_steps = max_steps or 16 * root_n + 64 * m * (dp_mask + 1)
+
+        def new_kangaroo(index, kind):
+            # Tame kangaroos start around the middle of the interval, wild ones around y
+            offset = rand.randrange(beta)
+            if kind == 'T':
+                e = start + n // 2 + offset
+                return [index, kind, self.scale(g, e), e]
+
+            return [index, kind, self.add(y, self.scale(g, offset)), offset]
+
+        herd = [new_kangaroo(i, 'T' if i < herd_size else 'W') for i in range(m)]
+        Metrics.record('dlog.kangaroo.setup', time.perf_counter() - t_start)
+        dps = {}  # Distinguished element -> (kind, exponent)
+        steps = 0
+        pool = None
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+
+        try:
+            while steps < max_steps:
+                # Each worker walks its share of the herd
+                t_batch = time.perf_counter()
+                if pool:
+                    shares = [herd[i::workers] for i in range(workers)]
+                    walked = list(pool.map(_walk_herd, [self.add] * workers, [jump_els] * workers,
+                                           [jump_sizes] * workers, shares, [n_steps] * workers,
+                                           [dp_mask] * workers))
+                else:
+                    walked = [_walk_herd(self.add, jump_els, jump_sizes, herd, n_steps, dp_mask)]
+                Metrics.record('dlog.kangaroo.batch', time.perf_counter() - t_batch)
+
+                herd = sorted([kangaroo for share, _ in walked for kangaroo in share])
+                steps += m * n_steps
+
+                for _, new_dps in walked:
+                    for index, kind, el, e in new_dps:
+                        if el not in dps:
+                            dps[el] = (kind, e)
+                            continue
+
+                        other_kind, other_e = dps[el]
+                        if other_kind != kind:
+                            # Tame and wild kangaroos met: g**e_tame = y * g**e_wild
+                            x = e - other_e if kind == 'T' else other_e - e
+                            if self.scale(g, x) == y:
+                                return DLogResult(x, steps, 'kangaroo', time.perf_counter() - t_start)
+
+                            # In a small group kangaroos can meet a lap of the group apart, x is then off by
+                            # a multiple of the order of g: keep the latest visit instead
+                            dps[el] = (kind, e)
+
+                        elif other_e != e:
+                            # Two kangaroos of the same herd are on the same path, move one elsewhere
+                            herd[index] = new_kangaroo(index, kind)
+
+        finally:
+            if pool:
+                pool.shutdown()
 
         # If we get this far, the algorithm has not found a solution
-        print('Kangaroo has not been caught')
+        return DLogResult(None, steps, 'kangaroo', time.perf_counter() - t_start)
+
+    @_recorded
+    def bsgs(self, start: int, end: int, g, y, max_table: int = None):
+        """
+        Baby-step giant-step
+        Find x such that g**x = y, with the knowledge that x is between start and end.
+        Baby steps y * g**j are stored in a table, giant steps g**(start + i*m) are looked up in it,
+        and a match gives x = start + i*m - j. No inverse of g is required.
+
+        Parameters
+        ----------
+        start : int
+            Lowest suspected integer such that g**x = y
+        end : int
+            Greatest suspected integer such that g**x = y
+        g
+            Group element we took a power of
+        y
+            Group element we are trying to invert
+        max_table: int, optional
+            Greatest number of baby steps stored. With a smaller table, more giant steps are taken.
+
+        Returns
+        -------
+        DLogResult
+            Holds x such that g**x = y if it was found, and the number of group operations made
+        """
+        t_start = time.perf_counter()
+        n = end - start + 1
+        m = isqrt(n - 1) + 1 if n > 1 else 1
+        if max_table:
+            m = min(m, max_table)
+
+        # Baby steps: the table maps an integer key of y * g**j to the list of such j
+        # Keys are compact and shared by several elements (P and -P on a curve), so every j
+        # under a key is kept, and checked before being accepted
+        table = {}
+        el = y
+        for j in range(m):
+            table.setdefault(_el_key(el), []).append(j)
+            el = self.add(el, g)
+
+        # Giant steps
+        giant = self.scale(g, m)
+        el = self.scale(g, start)
+        steps = m
+        for i in range(-(-n // m) + 1):
+            for j in table.get(_el_key(el), ()):
+                x = start + i * m - j
+                if self.scale(g, x) == y:
+                    return DLogResult(x, steps, 'bsgs', time.perf_counter() - t_start)
+
+            el = self.add(el, giant)
+            steps += 1
+
+        return DLogResult(None, steps, 'bsgs', time.perf_counter() - t_start)
+
+    @_recorded
+    def rho(self, g, y, order: int, max_steps: int = None, seed=None):
+        """
+        Pollard's rho with Brent's cycle detection
+        Find x such that g**x = y, where g has order 'order' (ideally prime).
+        Walks through elements g**a * y**b, which are split into three sets
+        according to which the walk multiplies by g, by y or squares. Two
+        walks meeting give a linear equation for x mod order. Memory use is constant.
+
+        Parameters
+        ----------
+        g
+            Group element we took a power of
+        y
+            Group element we are trying to invert
+        order: int
+            Order of g
+        max_steps: int, optional
+            Number of steps after which the search is abandoned
+        seed: optional
+            Seed for the starting points of the walks
+
+        Returns
+        -------
+        DLogResult
+            Holds x such that g**x = y if it was found, and the number of steps made
+        """
+        t_start = time.perf_counter()
+        rand = Random(seed)
+        max_steps = max_steps or 64 * isqrt(order) + 1024
+        steps = 0
+
+        def step(el, a, b):
+            # One step of the walk, keeping track of el = g**a * y**b
+            branch = _el_key(el) % 3
+            if branch == 0:
+                return self.add(el, y), a, (b + 1) % order
+            if branch == 1:
+                return self.add(el, el), 2 * a % order, 2 * b % order
+            return self.add(el, g), (a + 1) % order, b
+
+        while steps < max_steps:
+            # New walk from a random starting point
+            a, b = rand.randrange(order), rand.randrange(order)
+            hare = (self.add(self.scale(g, a), self.scale(y, b)), a, b)
+
+            # Brent: the tortoise teleports to the hare at every power of two
+            tortoise = hare
+            hare = step(*hare)
+            power = lam = 1
+            while tortoise[0] != hare[0] and steps < max_steps:
+                if power == lam:
+                    tortoise = hare
+                    power *= 2
+                    lam = 0
+                hare = step(*hare)
+                lam += 1
+                steps += 1
+
+            # g**a1 * y**b1 = g**a2 * y**b2, so x * (b1 - b2) = a2 - a1 mod order
+            (_, a1, b1), (_, a2, b2) = tortoise, hare
+            db, da = (b1 - b2) % order, (a2 - a1) % order
+            d = gcd(db, order)
+            if db == 0 or da % d:
+                continue
+
+            # d solutions mod order, try each of them
+            base = da // d * pow(db // d, -1, order // d) % (order // d)
+            for k in range(min(d, 1 << 16)):
+                x = base + k * (order // d)
+                if self.scale(g, x) == y:
+                    return DLogResult(x, steps, 'rho', time.perf_counter() - t_start)
+
+        return DLogResult(None, steps, 'rho', time.perf_counter() - t_start)
+
+
+def _table_budget(bytes_per_entry=200):
+    # Number of baby steps that fit in a quarter of the available memory
+    try:
+        available = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        available = 1 << 30
+
+    return max(1 << 10, available // 4 // bytes_per_entry)
+
+
+def solve_dlog(group: Group, g, y, bounds=None, order: int = None, max_table: int = None, workers: int = 1):
+    """
+    Find x such that g**x = y, choosing the algorithm from what is known about x
+    - Baby-step giant-step when the table for the interval fits in memory
+    - Kangaroo when bounds are known but the interval is too large
+    - Pollard's rho when only the order of g is known
+
+    Parameters
+    ----------
+    group: Group
+        Group g and y belong to
+    g
+        Group element we took a power of
+    y
+        Group element we are trying to invert
+    bounds: tuple of int, optional
+        (start, end) such that start <= x <= end
+    order: int, optional
+        Order of g
+    max_table: int, optional
+        Greatest number of entries for a baby-step giant-step table,
+        by default as many as fit in a quarter of the available memory
+    workers: int
+        Number of processes for the kangaroo method
+
+    Returns
+    -------
+    DLogResult
+        Holds x such that g**x = y if it was found, the algorithm used and the number of steps made
+    """
+    if bounds is None and order is None:
+        raise Exception('Requires bounds or order')
+
+    start, end = bounds if bounds is not None else (0, order - 1)
+    if order is not None and end - start >= order:
+        start, end = 0, order - 1  # x is only defined mod order
+
+    max_table = max_table or _table_budget()
+
+    if isqrt(end - start) + 1 <= max_table:
+        return group.bsgs(start, end, g, y)
+
+    if bounds is not None or order is None:
+        return group.disc_log(start, end, g, y, workers=workers)
+
+    return group.rho(g, y, order)
 
 
 class ModP(Group):
@@ -157,16 +707,13 @@ class ModP(Group):
         self.p = p
         self.add = self._create_mod_mult(p)
         self.id = 1
+        self.modulus = p
 
     @staticmethod
     def _create_mod_mult(p):
         # Returns multiplication mod p
-
-        def mod_mult(g1, g2):
-            # Multiplication mod p
-            return (g1 * g2) % p
-
-        return mod_mult
+        # A partial rather than a closure, so that the group can be sent to other processes
+        return partial(mod_mult, p=p)
 
 
 class EGroup(Group):
@@ -227,7 +774,7 @@ class EGroup(Group):
         # Inverts group element pt
         x, y = pt
 
-        return x, self.p - y
+        return x, -y % self.p
 
     def e_add(self, pt, other_pt):
         # Add two group elements pt and other_pt together
@@ -244,16 +791,198 @@ class EGroup(Group):
         x2, y2 = other_pt
 
         if pt == other_pt:
-            m = ((3 * x1 ** 2 + self.a) * self._mod_inv(2 * y1))
+            m = (3 * x1 * x1 + self.a) * self._mod_inv(2 * y1) % self.p
 
         else:
-            m = (y2 - y1) * self._mod_inv(x2 - x1)
+            m = (y2 - y1) * self._mod_inv(x2 - x1) % self.p
 
-        x3 = (m ** 2 - x1 - x2) % self.p
+        x3 = (m * m - x1 - x2) % self.p
         y3 = (m * (x1 - x3) - y1) % self.p
 
         return x3, y3
 
+    def _batch_inv(self, values):
+        # Inverts every (nonzero) value in values mod self.p with a single modular inversion
+        # Montgomery's trick: invert the product of all values, then peel off one value at a time
+        p = self.p
+        prefix = [1] * (len(values) + 1)  # prefix[i] is the product of the first i values
+        for i, value in enumerate(values):
+            prefix[i + 1] = prefix[i] * value % p
+
+        inv = self._mod_inv(prefix[-1])  # Inverse of the product of all values
+
+        inverses = [0] * len(values)
+        for i in reversed(range(len(values))):
+            inverses[i] = inv * prefix[i] % p  # Inverse of values[i]
+            inv = inv * values[i] % p  # Inverse of the product of the first i values
+
+        return inverses
+
+    def add_many(self, pts1, pts2):
+        # Returns the list of sums pt1 + pt2 for pt1, pt2 in zip(pts1, pts2)
+        # All slopes share a single modular inversion
+        p = self.p
+        sums = [None] * len(pts1)
+        pending = []  # (index, numerator, denominator) of slopes to compute
+
+        for i, (pt, other_pt) in enumerate(zip(pts1, pts2)):
+            if pt == 'O':
+                sums[i] = other_pt
+            elif other_pt == 'O':
+                sums[i] = pt
+            elif pt[0] == other_pt[0] and (pt[1] + other_pt[1]) % p == 0:
+                sums[i] = 'O'  # Inverse points, or doubling a point with y = 0
+            elif pt == other_pt:
+                pending.append((i, 3 * pt[0] * pt[0] + self.a, 2 * pt[1]))
+            else:
+                pending.append((i, other_pt[1] - pt[1], other_pt[0] - pt[0]))
+
+        inverses = self._batch_inv([den for _, _, den in pending])
+
+        for (i, num, _), den_inv in zip(pending, inverses):
+            x1, y1 = pts1[i]
+            x2 = pts2[i][0]
+            m = num * den_inv % p
+
+            x3 = (m * m - x1 - x2) % p
+            sums[i] = x3, (m * (x1 - x3) - y1) % p
+
+        return sums
+
+    def scale_many(self, pts, ks):
+        # Returns the list of pt ** k for pt, k in zip(pts, ks)
+        # Left-to-right double-and-add run on all points at once,
+        # each doubling and addition step sharing a single modular inversion
+        results = ['O'] * len(pts)
+
+        for i in reversed(range(max(ks, default=0).bit_length())):
+            results = self.add_many(results, results)
+
+            # Add pt wherever the bit of k is set
+            to_add = [j for j, k in enumerate(ks) if k > 0 and (k >> i) & 1]
+            added = self.add_many([results[j] for j in to_add], [pts[j] for j in to_add])
+            for j, pt in zip(to_add, added):
+                results[j] = pt
+
+        return results
+
+    # Jacobian coordinates
+    # (X, Y, Z) stands for the point (X/Z^2, Y/Z^3), and Z = 0 for the identity
+    # Additions and doublings need no modular inversion,
+    # a single one is made when converting back to affine coordinates
+    _J_ID = (1, 1, 0)
+
+    def _to_jacobian(self, pt):
+        # Affine point to Jacobian coordinates
+        if pt == 'O':
+            return self._J_ID
+
+        x, y = pt
+        return x, y, 1
+
+    def _from_jacobian(self, j_pt):
+        # Jacobian coordinates to affine point
+        x, y, z = j_pt
+        if z == 0:
+            return 'O'
+
+        p = self.p
+        z_inv = self._mod_inv(z)
+        z_inv_2 = z_inv * z_inv % p
+
+        return x * z_inv_2 % p, y * z_inv_2 * z_inv % p
+
+    def _from_jacobian_many(self, j_pts):
+        # Jacobian coordinates to affine points, with a single modular inversion
+        p = self.p
+        z_invs = iter(self._batch_inv([z for _, _, z in j_pts if z != 0]))
+
+        pts = []
+        for x, y, z in j_pts:
+            if z == 0:
+                pts.append('O')
+                continue
+
+            z_inv = next(z_invs)
+            z_inv_2 = z_inv * z_inv % p
+            pts.append((x * z_inv_2 % p, y * z_inv_2 * z_inv % p))
+
+        return pts
+
+    def _j_double(self, j_pt):
+        # Doubles a point in Jacobian coordinates
+        x, y, z = j_pt
+        if z == 0 or y == 0:
+            return self._J_ID
+
+        p = self.p
+        y_2 = y * y % p
+        z_2 = z * z % p
+        s = 4 * x * y_2 % p
+        m = (3 * x * x + self.a * z_2 * z_2) % p
+
+        x3 = (m * m - 2 * s) % p
+        y3 = (m * (s - x3) - 8 * y_2 * y_2) % p
+        z3 = 2 * y * z % p
+
+        return x3, y3, z3
+
+    def _j_add(self, j_pt, other_j_pt):
+        # Adds two points in Jacobian coordinates
+        x1, y1, z1 = j_pt
+        x2, y2, z2 = other_j_pt
+        if z1 == 0:
+            return other_j_pt
+        if z2 == 0:
+            return j_pt
+
+        p = self.p
+        z1_2 = z1 * z1 % p
+        z2_2 = z2 * z2 % p
+        u1 = x1 * z2_2 % p
+        u2 = x2 * z1_2 % p
+        s1 = y1 * z2_2 * z2 % p
+        s2 = y2 * z1_2 * z1 % p
+
+        if u1 == u2:
+            # Same x coordinate: either the same point or inverse points
+            return self._j_double(j_pt) if s1 == s2 else self._J_ID
+
+        h = u2 - u1
+        r = s2 - s1
+        h_2 = h * h % p
+        h_3 = h_2 * h % p
+        u1_h_2 = u1 * h_2 % p
+
+        x3 = (r * r - h_3 - 2 * u1_h_2) % p
+        y3 = (r * (u1_h_2 - x3) - s1 * h_3) % p
+        z3 = h * z1 * z2 % p
+
+        return x3, y3, z3
+
+    def scale(self, pt, k):
+        # Returns pt ** k (pt added to itself k times)
+        # Montgomery ladder in Jacobian coordinates: one addition and one doubling per bit of k
+        if k <= 0 or pt == 'O':
+            return 'O'
+
+        r0 = self._J_ID
+        r1 = self._to_jacobian(pt)
+
+        for i in reversed(range(k.bit_length())):
+            if (k >> i) & 1:
+                r0 = self._j_add(r0, r1)
+                r1 = self._j_double(r1)
+            else:
+                r1 = self._j_add(r0, r1)
+                r0 = self._j_double(r0)
+
+        return self._from_jacobian(r0)
+
+    def power_table(self, pt, w=6):
+        # Empty table of powers of pt, built and read in Jacobian coordinates
+        return JacobianPowerTable(self, pt, w)
+
 
 class CycGroup(Group):
     """Cyclic group
@@ -277,19 +1006,96 @@ class CycGroup(Group):
         Generator of the group
     add_fun: callable
         Function defining how to add two group elements
+    modulus: int, optional
+        If add_fun is multiplication mod some integer, that integer
+    table_path: str, optional
+        File the table of powers of g is kept in between runs.
+        Loaded on first use if it exists, otherwise built in full and written there
+    parent: Group, optional
+        Group g was taken from. Scaling and tables of powers are left to it,
+        so that a curve's cyclic subgroup scales in Jacobian coordinates
     """
-    def __init__(self, order, identity, g, add_fun: callable):
+    TABLE_W = 8  # Window of tables kept on disk, wider as they are only built once
+
+    def __init__(self, order, identity, g, add_fun: callable, modulus=None, table_path=None, parent=None):
         super().__init__()
         self.add = add_fun
         self.q = order
         self.id = identity
         self.g = g
+        self.modulus = modulus
+        self.table_path = table_path
+        self.parent = parent
+        self._g_table = None
 
     @classmethod
-    def from_generator(cls, group: Group, element, order: int):
+    def from_generator(cls, group: Group, element, order: int, table_path=None):
         # Cyclic group is generated from an element of another group
         # This group will have order the order of the element
-        return cls(order, group.id, element, group.add)
+        return cls(order, group.id, element, group.add, group.modulus, table_path, parent=group)
+
+    def g_table(self):
+        # Table of powers of the generator, built on first use
+        # A file on table_path that cannot be read, or not for this generator and order, is built again
+        # A table that cannot be written is kept in memory only
+        if self._g_table is None:
+            if self.table_path and os.path.exists(self.table_path):
+                try:
+                    self.load_g_table(self.table_path)
+                except (OSError, ValueError, struct.error):
+                    pass  # Stale, damaged or unreadable, treated as missing
+
+            if self._g_table is None and self.table_path and self.q:
+                self._g_table = self.power_table(self.g, self.TABLE_W)
+                try:
+                    self.save_g_table(self.table_path)
+                except OSError as e:
+                    warnings.warn(f'Table of powers of g not saved: {e}')
+            elif self._g_table is None:
+                self._g_table = self.power_table(self.g)
+
+        return self._g_table
+
+    def save_g_table(self, path=None):
+        # Writes the table of powers of g to path (by default table_path), with every row needed
+        # to scale g by scalars less than the order of the group
+        table = self.g_table()
+        if self.q:
+            table.scale(1 << (self.q.bit_length() - 1))  # Builds the rows
+        table.save(path or self.table_path)
+
+    def load_g_table(self, path=None):
+        # Loads the table of powers of g from path (by default table_path)
+        # Raises ValueError if the table is not that of g, or has too few rows for the order
+        path = path or self.table_path
+        table = PowerTable.load(path, self.add, self.id)
+        if table.g != self.g or (table.w > 1 and table.rows[0][2] != self.add(self.g, self.g)):
+            raise ValueError(f'{path} holds powers of another element')
+        if self.q and len(table.rows) * table.w < self.q.bit_length():
+            raise ValueError(f'{path} is too short for the order of the group')
+        self._g_table = self.power_table(self.g, table.w)
+        self._g_table.rows = table.rows
+
+    def scale(self, g, k):
+        # Returns g ** k
+        # Powers of the generator are looked up in its table of powers
+        if g == self.g and k > 0:
+            if self.q:
+                k %= self.q  # g ** q is the identity
+
+            return self.g_table().scale(k)
+
+        if self.parent is not None:
+            return self.parent.scale(g, k)
+
+        return super().scale(g, k)
+
+    def power_table(self, g, w=6):
+        # Empty table of powers of g, in the parent group's coordinates
+        if self.parent is not None:
+            return self.parent.power_table(g, w)
+
+        return super().power_table(g, w)
 
     def gen_order(self, desired_order):
         # Returns an element of order desired_order
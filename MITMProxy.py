@@ -0,0 +1,290 @@
+"""
+Asyncio man in the middle between Diffie-Hellman clients (Alice) and a server (Bob), see Cecily.py
+Each client connection is relayed to its own connection to the server, with the public keys
+exchanged rewritten by a strategy so that the shared element takes a known value.
+Bob's encrypted replies are decrypted as they flow through.
+
+The protocol is that of DHServer:
+    Alice sends A, then iv
+    Bob answers B, then his reply encrypted under the shared element, with an HMAC appended
+repeated until Alice sends STOP.
+The group is not negotiated, so strategies based on g are carried out by sending the public key
+that g would produce: with g = 1 every public key is 1, with g = p it is 0, with g = p - 1 it is 1 or p - 1.
+"""
+
+import asyncio
+import hmac
+import itertools
+import time
+from collections import Counter, deque
+from hashlib import sha256
+from AESModes import AESCode
+from DH import DHMITM, MacTest, element_to_key
+from Framing import HEADER, STOP, encode_element, decode_element, frame_length, write_frames
+from Metrics import LatencyRecorder
+
+
+class Strategy:
+    """Rewrites public keys so that the shared element is one of a few known values
+
+    Parameters
+    ----------
+    name: str
+        Name of the strategy
+    forge: callable
+        Takes the modulus p, returns the public key sent to both sides
+    shared: callable
+        Takes the modulus p, returns the list of possible shared elements
+    forge_client: callable, optional
+        Takes the modulus p, returns the public key sent to Alice, if it differs
+    shared_client: callable, optional
+        Takes the modulus p, returns Alice's shared element when forge_client is given.
+        Bob's replies are then encrypted again under Alice's key when his differs
+    """
+    def __init__(self, name: str, forge: callable, shared: callable, forge_client: callable = None,
+                 shared_client: callable = None):
+        self.name = name
+        self.forge = forge
+        self.shared = shared
+        self.forge_client = forge_client or forge
+        self.shared_client = shared_client
+
+    def __repr__(self):
+        return f'Strategy({self.name!r})'
+
+
+STRATEGIES = {
+    'A->p': Strategy('A->p', lambda p: p, lambda p: [0]),  # Challenge 34: p**x mod p = 0
+    'g=1': Strategy('g=1', lambda p: 1, lambda p: [1]),
+    'g=p': Strategy('g=p', lambda p: 0, lambda p: [0]),
+    # Bob's shared element depends on the parity of his exponent, so Alice is sent 1 to know hers
+    'g=p-1': Strategy('g=p-1', lambda p: p - 1, lambda p: [1, p - 1], lambda p: 1, lambda p: 1),
+}
+
+
+async def read_raw_frame(reader):
+    # Returns the header and the payload of the next frame, so that it can be passed on as it is
+    # Raises Framing.FrameTooLarge past Framing.MAX_FRAME
+    header = await reader.readexactly(HEADER.size)
+
+    return header, await reader.readexactly(frame_length(header))
+
+def write_raw_frame(writer, header: bytes, payload: bytes):
+    # Passes a frame on without joining header and payload
+    writer.writelines((header, payload))
+
+def write_element(writer, el):
+    payload = encode_element(el)
+    writer.writelines((HEADER.pack(len(payload)), payload))
+
+
+class MITMProxy:
+    """Relays any number of concurrent Alice/Bob sessions, rewriting their public keys
+
+    Attributes
+    ----------
+    intercepted: deque
+        Most recent (session number, plaintext) pairs decrypted from Bob's replies
+    metrics: LatencyRecorder
+        Duration ('session') and throughput ('bytes_per_sec') of each session
+    sessions: int
+        Number of sessions relayed to completion
+    bytes_relayed: int
+        Number of bytes passed on, in both directions
+    failed: int
+        Number of replies which could not be decrypted
+
+    Parameters
+    ----------
+    group: CycGroup
+        Group agreed upon by Alice and Bob, integers mod group.modulus
+    upstream: tuple
+        (host, port) of the server
+    strategy: Strategy or str
+        How public keys are rewritten, see STRATEGIES
+    keep: int
+        Number of plaintexts kept in intercepted
+    """
+    def __init__(self, group, upstream, strategy='A->p', keep=1000):
+        self.group = group
+        self.upstream = upstream
+        self.strategy = STRATEGIES[strategy] if isinstance(strategy, str) else strategy
+        self.intercepted = deque(maxlen=keep)
+        self.metrics = LatencyRecorder()
+        self.sessions = 0
+        self.bytes_relayed = 0
+        self.failed = 0
+        self.server = None
+        self._session_numbers = itertools.count()
+
+        p = group.modulus
+        self.forged = self.strategy.forge(p)
+        self.forged_client = self.strategy.forge_client(p)
+        # Possible keys, and the matching shared elements, worked out once for all sessions
+        self.candidates = [(s, element_to_key(s)) for s in self.strategy.shared(p)]
+        self.client_key = element_to_key(self.strategy.shared_client(p)) if self.strategy.shared_client else None
+
+    def decrypt(self, cecily: DHMITM, reply: bytes):
+        # Finds which possible shared element Bob used from the HMAC of his reply, returns the plaintext
+        test = MacTest(reply)
+        for s, key in self.candidates:
+            if test(s):
+                cecily.s, cecily.key = s, key
+                return cecily.gen_code(test.msg).cbc_solve()
+
+        return None
+
+    def encrypt_for_client(self, cecily: DHMITM, plaintext: bytes):
+        # Encrypts plaintext under Alice's key, with an HMAC appended
+        ciphertext = AESCode.from_bytes(plaintext, key=self.client_key, iv=cecily.iv).cbc_encrypt().easybyte.b
+
+        return ciphertext + hmac.new(self.client_key, ciphertext, sha256).digest()
+
+    async def _client_to_server(self, cecily, client, server, relayed: Counter):
+        # Alice's side: public keys are rewritten, ivs passed on
+        # Bytes relayed are counted in relayed['to_server'] as they go
+        while True:
+            header, payload = await read_raw_frame(client)
+            if payload == STOP:
+                write_raw_frame(server, header, payload)
+                await server.drain()
+                return
+
+            cecily.A = decode_element(payload)
+            write_element(server, self.forged)
+
+            header, cecily.iv = await read_raw_frame(client)
+            write_raw_frame(server, header, cecily.iv)
+            await server.drain()
+            relayed['to_server'] += 2 * HEADER.size + len(payload) + len(cecily.iv)
+
+    async def _server_to_client(self, session: int, cecily, server, client, relayed: Counter):
+        # Bob's side: public key is rewritten, replies decrypted and passed on
+        # Bytes relayed are counted in relayed['to_client'] as they go
+        while True:
+            try:
+                header, payload = await read_raw_frame(server)
+            except asyncio.IncompleteReadError:
+                return  # Bob closed the session
+
+            cecily.B = decode_element(payload)
+            write_element(client, self.forged_client)
+
+            header, cecily.B_msg = await read_raw_frame(server)
+            plaintext = self.decrypt(cecily, cecily.B_msg)
+
+            # Recorded before passing the reply on: once Alice has it she may end the session,
+            # which cancels this relay
+            if plaintext is None:
+                self.failed += 1
+            else:
+                self.intercepted.append((session, plaintext))
+            relayed['to_client'] += 2 * HEADER.size + len(payload) + len(cecily.B_msg)
+
+            if plaintext is not None and self.client_key not in (None, cecily.key):
+                # Alice's key differs from Bob's, encrypt the reply again for her
+                write_frames(client, self.encrypt_for_client(cecily, plaintext))
+            else:
+                write_raw_frame(client, header, cecily.B_msg)
+            await client.drain()
+
+    async def handle(self, client_reader, client_writer):
+        # Relays one of Alice's connections to a new connection to Bob
+        start = time.perf_counter()
+        session = next(self._session_numbers)
+        cecily = DHMITM(self.group)
+        server_writer = None
+        relays = []
+        relayed = Counter()
+
+        try:
+            server_reader, server_writer = await asyncio.open_connection(*self.upstream)
+            relays = [asyncio.ensure_future(self._client_to_server(cecily, client_reader, server_writer, relayed)),
+                      asyncio.ensure_future(self._server_to_client(session, cecily, server_reader, client_writer,
+                                                                   relayed))]
+
+            # The session is over as soon as either side is: Alice sent STOP, Bob closed, or one dropped
+            done, _ = await asyncio.wait(relays, return_when=asyncio.FIRST_COMPLETED)
+            for relay in done:
+                relay.result()  # Raises if the relay failed
+            seconds = time.perf_counter() - start
+            self.sessions += 1
+            self.bytes_relayed += sum(relayed.values())
+            self.metrics.record('session', seconds)
+            self.metrics.record('bytes_per_sec', sum(relayed.values()) / seconds)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Bob unreachable, or one side dropped in the middle of a handshake
+
+        except ValueError:
+            pass  # Malformed public key from either side (decode_element), the session is dropped
+
+        finally:
+            # The other relay would otherwise keep waiting on its side
+            for relay in relays:
+                relay.cancel()
+            await asyncio.gather(*relays, return_exceptions=True)
+            if server_writer is not None:
+                server_writer.close()
+            client_writer.close()
+
+    async def start(self, host='127.0.0.1', port=65433):
+        # Starts listening for Alice, returns the port (useful with port=0)
+        self.server = await asyncio.start_server(self.handle, host, port)
+
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def report(self):
+        # Returns sessions and bytes relayed, replies decrypted,
+        # and percentiles of session duration and throughput
+        return {
+            'strategy': self.strategy.name,
+            'sessions': self.sessions,
+            'bytes_relayed': self.bytes_relayed,
+            'decrypted': len(self.intercepted),
+            'failed': self.failed,
+            **self.metrics.snapshot(),
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+    from DHServer import DHServer, load_test
+    from Group import ModP, CycGroup
+
+    # Challenge 57 parameters
+    our_p = int('8977C3217DA1F838B8D24B4A790DE8FC8E35AD5483E463028EF9BBF9AF23A9BD1231EBA9A'
+                'C7E44363D8311D610B09AA224A023268EE8A60AC484FD9381962563', 16)
+    our_g = int('572AFF4A93EC6214C1036C62E1818FE5E4E1D6DB635C1B12D9572203C47D241A0E543A89B'
+                '0B12BA61062411FCF3D29C6AB8C3CE6DAC7D2C9F7F0EBD3B7878AAF', 16)
+    our_q = 236234353446506858198510045061214171961
+    our_group = CycGroup.from_generator(ModP(our_p), our_g, our_q)
+
+    parser = argparse.ArgumentParser(description='Man in the middle for Diffie-Hellman sessions')
+    parser.add_argument('--strategy', default='A->p', choices=list(STRATEGIES))
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--handshakes', type=int, default=5, help='handshakes per client')
+    args = parser.parse_args()
+
+    async def main():
+        # Local Bob, Cecily in the middle, and a load of Alices
+        bob = DHServer(our_group, workers=0)
+        bob_port = await bob.start(port=0)
+        cecily = MITMProxy(our_group, ('127.0.0.1', bob_port), args.strategy)
+        cecily_port = await cecily.start(port=0)
+
+        n_replies, seconds = await load_test(our_group, '127.0.0.1', cecily_port, args.clients, args.handshakes)
+        report = cecily.report()
+        print(f'{n_replies} handshakes relayed in {seconds:.2f}s, '
+              f'{report["bytes_relayed"] / seconds:.0f} bytes/s')
+        print(report)
+        print(f'Last reply intercepted: {cecily.intercepted[-1] if cecily.intercepted else None}')
+
+        await cecily.stop()
+        await bob.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,411 @@
+"""
+Request counts and latency percentiles for the servers used in the challenges,
+and a registry of counters, timers and rate meters for the attacks' hot loops.
+
+The registry is off by default, and then costs one attribute check per call. Turn it on with
+Metrics.enable(LoggingSink()) (or JSONLinesSink, PrometheusSink), or by setting the
+CRYPTOPALS_METRICS environment variable, in which case events go to the 'cryptopals' logger:
+    Metrics.count('oracle.calls', n)
+    Metrics.mark('kangaroo.steps', steps, seconds)  # Rate meter
+    with Metrics.timing('det_oracle.block_size'):
+        ...
+    @Metrics.timed('crt')
+    def crt(...):
+"""
+
+import functools
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+
+def percentile(samples, p):
+    # Returns the p-th percentile of samples (nearest rank: the ceil(p/100 * n)-th smallest)
+    if not samples:
+        return None
+
+    ranked = sorted(samples)
+    index = max(0, min(len(ranked) - 1, math.ceil(p / 100 * len(ranked)) - 1))
+
+    return ranked[index]
+
+class LatencyRecorder:
+    """Thread-safe record of how many requests each endpoint served and how long they took
+
+    Attributes
+    ----------
+    counts: dict
+        Number of requests recorded for each endpoint
+    latencies: dict
+        Most recent latencies (in seconds) for each endpoint
+
+    Parameters
+    ----------
+    window: int
+        Number of most recent latencies kept for each endpoint
+    percentiles: tuple of int
+        Percentiles reported by snapshot
+    """
+    def __init__(self, window=10000, percentiles=(50, 90, 99)):
+        self.window = window
+        self.percentiles = percentiles
+        self.counts = {}
+        self.latencies = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float):
+        # Records a request to endpoint which took seconds to serve
+        with self._lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            self.latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def snapshot(self):
+        # Returns counts and latency percentiles for each endpoint as a dict
+        with self._lock:
+            latencies = {endpoint: list(samples) for endpoint, samples in self.latencies.items()}
+            counts = dict(self.counts)
+
+        return {
+            endpoint: {
+                'count': counts[endpoint],
+                **{f'p{p}': percentile(latencies[endpoint], p) for p in self.percentiles}
+            }
+            for endpoint in counts
+        }
+
+
+# Registry of counters, timers and rate meters
+class Timer:
+    """Durations of a phase: count, total, extremes and most recent samples for percentiles"""
+    def __init__(self, window=10000):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def snapshot(self, percentiles=(50, 90, 99)):
+        samples = list(self.samples)
+
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            **{f'p{p}': percentile(samples, p) for p in percentiles},
+        }
+
+class Meter:
+    """Rate of operations
+    When marks come with the time they took, the rate is over that time,
+    otherwise over the time elapsed since the first mark.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.first = None
+
+    def mark(self, n=1, seconds=None):
+        if self.first is None:
+            self.first = time.perf_counter()
+        self.count += n
+        if seconds is not None:
+            self.seconds += seconds
+
+    def rate(self):
+        seconds = self.seconds or (time.perf_counter() - self.first if self.first is not None else 0.0)
+
+        return self.count / seconds if seconds else None
+
+    def snapshot(self):
+        return {'count': self.count, 'seconds': self.seconds, 'per_sec': self.rate()}
+
+class _Timing:
+    # Context manager recording the time spent in its block under name
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry, name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        self.registry.record(self.name, seconds)
+        self.registry.event(self.name, seconds=seconds)
+
+class _NoTiming:
+    # Stands in for _Timing while the registry is off
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NO_TIMING = _NoTiming()
+
+class Registry:
+    """Counters, timers and rate meters by name, and the sinks events and snapshots go to
+    Every recording method returns straight away while the registry is off.
+
+    Attributes
+    ----------
+    enabled: bool
+        Whether anything is recorded
+    sinks: list
+        Objects with emit(record) for events and flush(snapshot) for snapshots, see LoggingSink
+
+    Parameters
+    ----------
+    enabled: bool
+    sinks: iterable
+    window: int
+        Number of most recent durations kept by each timer
+    percentiles: tuple of int
+        Percentiles of durations reported by snapshot
+    """
+    def __init__(self, enabled=False, sinks=(), window=10000, percentiles=(50, 90, 99)):
+        self.enabled = enabled
+        self.sinks = list(sinks)
+        self.window = window
+        self.percentiles = percentiles
+        self.counters = {}
+        self.timers = {}
+        self.meters = {}
+        self._lock = threading.Lock()
+
+    def enable(self, *sinks):
+        # Turns recording on, events go to sinks in addition to those already there
+        self.sinks.extend(sinks)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.counters, self.timers, self.meters = {}, {}, {}
+
+    def count(self, name: str, n=1):
+        # Adds n to counter name
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name: str, seconds: float):
+        # Records a duration of phase name
+        if self.enabled:
+            with self._lock:
+                if name not in self.timers:
+                    self.timers[name] = Timer(self.window)
+                self.timers[name].record(seconds)
+
+    def mark(self, name: str, n=1, seconds=None):
+        # Records n operations, which took seconds if given, in meter name
+        if self.enabled:
+            with self._lock:
+                if name not in self.meters:
+                    self.meters[name] = Meter()
+                self.meters[name].mark(n, seconds)
+
+    def timing(self, name: str):
+        # Context manager recording the time spent in its block
+        return _Timing(self, name) if self.enabled else _NO_TIMING
+
+    def timed(self, name=None):
+        # Decorator recording the time spent in each call, under name or the function's name
+        def decorate(fun):
+            label = name or f'{fun.__module__}.{fun.__qualname__}'
+
+            @functools.wraps(fun)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fun(*args, **kwargs)
+
+                start = time.perf_counter()
+                try:
+                    return fun(*args, **kwargs)
+                finally:
+                    self.record(label, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorate
+
+    def event(self, name: str, **fields):
+        # Sends a record of something that happened (a phase is over, a value was found...) to the sinks
+        if self.enabled and self.sinks:
+            record = {'time': time.time(), 'event': name, **fields}
+            for sink in self.sinks:
+                sink.emit(record)
+
+    def snapshot(self):
+        # Returns every counter, timer and meter as a dict
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'timers': {name: timer.snapshot(self.percentiles) for name, timer in self.timers.items()},
+                'meters': {name: meter.snapshot() for name, meter in self.meters.items()},
+            }
+
+    def flush(self):
+        # Sends a snapshot to the sinks
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.flush(snapshot)
+
+        return snapshot
+
+
+# Sinks
+class LoggingSink:
+    """Events and snapshots as log messages
+
+    Parameters
+    ----------
+    logger: str or logging.Logger
+    level: int, optional
+        Defaults to logging.INFO
+    """
+    def __init__(self, logger='cryptopals', level=None):
+        import logging  # Only paid for by those logging
+        self.logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+        self.level = logging.INFO if level is None else level
+
+    @classmethod
+    def to_stderr(cls, logger='cryptopals'):
+        # LoggingSink whose messages reach stderr whatever the logging configuration,
+        # as with CRYPTOPALS_METRICS: the logger gets a handler of its own if it has none
+        import logging
+        sink = cls(logger)
+        if not sink.logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+            sink.logger.addHandler(handler)
+            sink.logger.propagate = False  # Printed once, not again by root handlers
+        if sink.logger.getEffectiveLevel() > sink.level:
+            sink.logger.setLevel(sink.level)
+
+        return sink
+
+    def emit(self, record: dict):
+        fields = ' '.join(f'{key}={value}' for key, value in record.items() if key not in ('time', 'event'))
+        self.logger.log(self.level, '%s %s', record['event'], fields)
+
+    def flush(self, snapshot: dict):
+        self.logger.log(self.level, 'metrics %s', json.dumps(snapshot))
+
+class JSONLinesSink:
+    """Events and snapshots as JSON objects, one per line
+
+    Parameters
+    ----------
+    file: str or file object
+        Path of the file lines are appended to, opened on the first line, or an open text file
+    """
+    def __init__(self, file):
+        self.path = file if isinstance(file, str) else None
+        self.file = None if self.path else file
+
+    def _write(self, obj: dict):
+        if self.file is None:
+            self.file = open(self.path, 'a')
+        self.file.write(json.dumps(obj, default=repr) + '\n')
+
+    def emit(self, record: dict):
+        self._write(record)
+
+    def flush(self, snapshot: dict):
+        self._write({'time': time.time(), 'event': 'snapshot', **snapshot})
+        self.file.flush()
+
+    def close(self):
+        if self.path and self.file:
+            self.file.close()
+            self.file = None
+
+def prometheus_text(snapshot: dict, prefix='cryptopals_'):
+    # Returns a snapshot in the Prometheus text exposition format
+    # Counters become <name>_total, timers summaries <name>_seconds, meters gauges <name>_per_second
+    def metric(name):
+        return prefix + re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+    lines = []
+    for name, value in snapshot['counters'].items():
+        lines += [f'# TYPE {metric(name)}_total counter', f'{metric(name)}_total {value}']
+
+    for name, timer in snapshot['timers'].items():
+        base = f'{metric(name)}_seconds'
+        lines.append(f'# TYPE {base} summary')
+        lines += [f'{base}{{quantile="{int(key[1:]) / 100}"}} {value}'
+                  for key, value in timer.items() if re.fullmatch(r'p\d+', key) and value is not None]
+        lines += [f'{base}_sum {timer["total"]}', f'{base}_count {timer["count"]}']
+
+    for name, meter in snapshot['meters'].items():
+        if meter['per_sec'] is not None:
+            lines += [f'# TYPE {metric(name)}_per_second gauge', f'{metric(name)}_per_second {meter["per_sec"]}']
+
+    return '\n'.join(lines) + '\n'
+
+class PrometheusSink:
+    """Snapshots in the Prometheus text format, events are left out
+
+    Attributes
+    ----------
+    text: str
+        Latest snapshot
+
+    Parameters
+    ----------
+    path: str, optional
+        File the latest snapshot is written to (as for the node exporter's textfile collector)
+    prefix: str
+        Prefix of every metric name
+    """
+    def __init__(self, path=None, prefix='cryptopals_'):
+        self.path = path
+        self.prefix = prefix
+        self.text = ''
+
+    def emit(self, record: dict):
+        pass
+
+    def flush(self, snapshot: dict):
+        self.text = prometheus_text(snapshot, self.prefix)
+        if self.path:
+            # Written aside then moved, so that a scrape never reads half a file
+            with open(self.path + '.tmp', 'w') as f:
+                f.write(self.text)
+            os.replace(self.path + '.tmp', self.path)
+
+
+# Registry used throughout the project
+REGISTRY = Registry(enabled=bool(os.environ.get('CRYPTOPALS_METRICS')),
+                    sinks=[LoggingSink.to_stderr()] if os.environ.get('CRYPTOPALS_METRICS') else [])
+
+enable = REGISTRY.enable
+disable = REGISTRY.disable
+count = REGISTRY.count
+record = REGISTRY.record
+mark = REGISTRY.mark
+timing = REGISTRY.timing
+timed = REGISTRY.timed
+event = REGISTRY.event
+snapshot = REGISTRY.snapshot
+flush = REGISTRY.flush
@@ -0,0 +1,130 @@
+"""
+Chinese remainder theorem and discrete logarithms mod m
+@author: Lawrence Arscott
+"""
+
+##
+import math
+from math import gcd
+
+# My files
+import Metrics
+
+def product(lst):
+    # Returns the product of integers in lst
+    return math.prod(lst)
+
+class CRTAccumulator:
+    """Chinese remainder theorem, combining congruences x = rem mod modulus one at a time
+
+    Residues can be added as they become available, for instance as they are recovered
+    from the network one factor at a time. Moduli need not be coprime: a congruence whose
+    modulus shares a factor with the current modulus is checked for consistency instead.
+
+    Attributes
+    ----------
+    x: int
+        Smallest non-negative solution to the congruences added so far
+    modulus: int
+        x is unique modulo modulus, the lcm of the moduli added so far
+
+    Parameters
+    ----------
+    rems: iterable of int, optional
+        Remainders of the initial congruences
+    moduli: iterable of int, optional
+        Moduli of the initial congruences
+    """
+    def __init__(self, rems=(), moduli=()):
+        self.x = 0
+        self.modulus = 1
+
+        for rem, modulus in zip(rems, moduli):
+            self.add(rem, modulus)
+
+    def add(self, rem: int, modulus: int):
+        # Merges x = rem mod modulus into the solution, returns self
+        # Raises ValueError if the congruence contradicts those already added
+        d = gcd(self.modulus, modulus)
+
+        # Solutions to both congruences agree mod d
+        if (rem - self.x) % d:
+            raise ValueError(f'Inconsistent congruence: x = {rem} mod {modulus}')
+
+        # x + modulus_so_far * t = rem mod modulus, solved mod modulus // d
+        m = modulus // d
+        t = (rem - self.x) // d * pow(self.modulus // d, -1, m) % m
+
+        self.x += self.modulus * t
+        self.modulus *= m
+        self.x %= self.modulus
+        Metrics.count('crt.merges')
+
+        return self
+
+@Metrics.timed('crt')
+def crt(p_factors, rems):
+    # Makes use of the Chinese remainder theorem to compute a solution to the equations:
+    # x = rem mod p_factor
+    # The solution is unique mod lcm(p_factors), raises ValueError if there is none
+    return CRTAccumulator(rems, p_factors).x
+
+@Metrics.timed('garner')
+def garner(p_factors, rems):
+    # Garner's algorithm for the Chinese remainder theorem, p_factors must be pairwise coprime
+    # Builds the solution in mixed radix x = v_0 + v_1 * p_0 + v_2 * p_0 * p_1 + ...
+    # so that all intermediate values are reduced modulo a single factor
+    n_factors = len(p_factors)
+
+    # inverses[i][j] is the inverse of p_factors[j] mod p_factors[i], for j < i
+    inverses = [[pow(p_factors[j], -1, p_factors[i]) for j in range(i)] for i in range(n_factors)]
+
+    # Mixed radix digits
+    digits = []
+    for i in range(n_factors):
+        p_factor = p_factors[i]
+        v = rems[i] % p_factor
+
+        for j in range(i):
+            v = (v - digits[j]) * inverses[i][j] % p_factor
+
+        digits.append(v)
+
+    # Recombine, most significant digit first
+    x = 0
+    for v, p_factor in zip(reversed(digits), reversed(p_factors)):
+        x = x * p_factor + v
+
+    return x
+
+@Metrics.timed('disc_log.modp')
+def disc_log(g: int, start: int, end: int, m: int, y: int, workers: int = 1):
+    """
+    Pollard's Method for Catching Kangaroos
+    Find x such that g**x mod m = y, with the knowledge that x is between start and end.
+    Context: Cyclic groups, ex: multiplication of integers mod m
+    See Group.disc_log, which this calls for the group of integers mod m
+
+    Parameters
+    ----------
+    g : int
+        Group element we are taking powers of, usually a generator of the group
+    start : int
+        Lowest suspected integer such that g**x = y
+    end : int
+        Greatest suspected integer such that g**x = y
+    m: int
+        Modulo parameter: tells us we are dealing with the cyclic group of intgers mod m
+    y: int
+        Group element we are trying to invert
+    workers: int
+        Number of processes to spread the kangaroos across
+
+    Returns
+    -------
+    int, optional
+        If x is found such that g**x = y, returns said x
+    """
+    from Group import ModP
+
+    return ModP(m).disc_log(start, end, g, y, workers=workers).x
@@ -0,0 +1,204 @@
+"""
+Profile and byte at a time decryption of deterministic encryption oracles
+@author: Lawrence Arscott
+"""
+
+##
+import time
+from random import randint
+
+# My files
+from ByteUtils import b_remove
+import Metrics
+
+class Profile:
+    """Class for profile creation
+
+    Attributes
+    ----------
+    p : str
+        Profile encoded as single string
+        Example: email=foo@bar&uid=10&role='user'
+
+    Parameters
+    ----------
+    email : str
+        Profile's email
+    role : str
+        Profile's role, may be user or admin.
+    """
+    def __init__(self, email: bytes, role='user'):
+        assert role == 'user' or role == 'admin'
+        email = b_remove(email, b'&=')
+        s = f'email={email}&uid={str(randint(0, 9999))}&role={role}'
+
+        self.p = s
+
+class DetOracle:
+    """Class for oracle functions of deterministic encryption
+
+    Attributes
+    ----------
+    fun : callable
+        Oracle function
+        Takes a string, modifies it according to a predetermined function,
+        returns result encrypted according to a deterministic cypher
+
+    Parameters
+    ----------
+    fun : callable
+        Oracle function to be worked on
+    """
+    def __init__(self, fun: callable):
+        self.fun = fun
+        self.b_size = None
+        self.l_full_prep_blocks = None
+        self.prep_fill = None
+        self.og_fun = None
+        self.clean_fun = None
+
+    def max_unchanged(self):
+        # Returns the number of leading characters unaffected when passing any byte to the oracle
+        # Warning: 1/256 chance of error
+        b1 = self.fun(b'A')
+        b2 = self.fun(b'B')
+
+        for i in reversed(range(len(b1))):
+            if b1[i] != b2[i]:
+                return i + 1
+
+    def block_size(self, max_n=64):
+        # Takes an oracle function
+        # Returns its block size, and the length of prepended text occupying full blocks
+        b_size = 0
+        max_unchanged = self.max_unchanged()
+
+        # Obtain a function that "forgets" the initial bytes that don't change
+        snipped_fun = self.mod_oracle(l_snip=max_unchanged)
+
+        # Pass bytes of growing length to the "cleaned up" oracle until we observe repeats
+        for i in range(1, max_n + 1):
+            indent = b'A' * i
+            if snipped_fun(b'') == snipped_fun(indent)[i:]:
+                b_size = i
+                break
+
+        # Check we found a solution
+        if b_size == 0:
+            raise Exception(f'No blocksize less than {max_n} found')
+
+        # The leading unchanged bytes should have length a multiple of the block size
+        assert max_unchanged % b_size == 0
+
+        # The number of leading unchanging blocks is the largest multiple of
+        # the block size contained in the number of unchanging bytes
+        l_full_prep_blocks = (max_unchanged//b_size - 1) * b_size
+
+        return b_size, l_full_prep_blocks
+
+    def fill_prepended(self):
+        # returns a byte string to fill any unfull blocks containing prepended random text
+        l_fill_prepended = (self.b_size - self.l_prepended()) % 16
+        return b'' + l_fill_prepended * b'A'
+
+    def l_prepended(self):
+        # Returns the length of prepended text (not counting that contained in full blocks)
+
+        # Use oracle function without full blocks
+        snipped_fun = self.mod_oracle(l_snip=self.l_full_prep_blocks)
+
+        # Find out the length a byte passed to the oracle needs to be to start affecting the second block
+        # instead of the first.
+        # NOTE: Should probably flip this around to consider the case 0 first
+        for i in range(1, self.b_size):
+            if snipped_fun(b'A' * (i + 1))[0:self.b_size] == snipped_fun(b'A' * i + b'B')[0:self.b_size]:
+                return (-i) % self.b_size
+
+        return 0
+
+    def mod_oracle(self, l_snip=0, prep=b''):
+        # Returns a modified oracle function for lighter code
+        def modified(bstring: bytes):
+            return self.fun(prep + bstring)[l_snip:]
+
+        return modified
+
+    def clean_oracle(self):
+        # 'Cleans up' oracle function to obtain a simpler case to crack a solution for
+
+        # Obtain total length of prepended text
+        to_chop = self.l_full_prep_blocks
+        if len(self.prep_fill):
+            to_chop += self.b_size
+
+        # Obtain an oracle function without prepended text
+        # This is done by passing a byte filling any block partially filled with prepended text.
+        # We can then chop off unwanted text in units of block size
+        return self.mod_oracle(to_chop, self.prep_fill)
+
+    def solve(self):
+        # With access to an oracle function,
+        # prints the encrypted message, discarding any prepended random blocks
+
+        # Prepare
+        with Metrics.timing('det_oracle.block_size'):
+            self.b_size, self.l_full_prep_blocks = self.block_size()
+        with Metrics.timing('det_oracle.prepended'):
+            self.prep_fill = self.fill_prepended()
+            self.og_fun = self.fun
+            self.clean_fun = self.clean_oracle()
+
+        Metrics.event('det_oracle.prepared', block_size=self.b_size, prepended_blocks=self.l_full_prep_blocks)
+
+        with Metrics.timing('det_oracle.solve_clean'):
+            return self.solve_clean()
+
+    # TODO: Break down
+    # Would be best to modify the oracle each time
+    def solve_clean(self):
+        # With access to an oracle function, prints the encrypted message
+        oracle = self.clean_fun  # Operate on simple oracle without prepended random text
+        n_blocks = len(oracle(b'')) // self.b_size  # Number of blocks
+        sol = b''
+        n_calls = 1  # Oracle calls, recorded once at the end
+        start = time.perf_counter()
+
+        # Iterate over blocks
+        for k in range(n_blocks):
+            indent = k * self.b_size  # Indent to work on different blocks
+
+            # Iterate over bytes in block
+            for i in range(self.b_size):
+                dummy = b'A' * (self.b_size - 1 - i)
+
+                find = oracle(dummy)[indent:self.b_size + indent]
+                new_byte = None
+                for j in range(256):
+                    byt = dummy + sol + j.to_bytes(1, 'big')
+                    if oracle(byt)[indent:self.b_size + indent] == find:
+                        new_byte = j.to_bytes(1, 'big')
+                        break
+                n_calls += j + 2
+
+                # When we each the end of the message, the oracle will start padding
+                if new_byte == b'\x01' and k == n_blocks - 1:
+                    break
+
+                # Add new byte to solution
+                sol += new_byte
+
+        Metrics.mark('det_oracle.oracle_calls', n_calls, time.perf_counter() - start)
+        Metrics.count('det_oracle.bytes_recovered', len(sol))
+
+        return sol
+
+    def challenge2_5(self):
+        # Function specific to challenge 2.5
+        from Crypto.Util.Padding import pad
+        email1 = b'YELLOWBIRD' + pad(b'admin', 16)
+        admin_block = self.fun(email1)[16:32]
+
+        email2 = b'YELLOWBIRDS'
+        admin = self.fun(email2)[:32] + admin_block
+
+        return admin
@@ -0,0 +1,200 @@
+"""
+Pohlig-Hellman and small subgroup confinement
+Recover a secret exponent modulo small factors of the group order, one subgroup at a time.
+Used in challenges 57 and 58.
+"""
+
+import time
+from random import randint
+from Group import Group, solve_dlog
+from NumberTheory import CRTAccumulator
+
+def subgroup_element(group: Group, group_order: int, m: int, random_element: callable = None):
+    # Returns an element of order m, where m is a prime dividing group_order
+    # random_element returns a random group element, by default a random integer mod group.modulus
+    if group_order % m:
+        raise Exception(f'{m} does not divide the order of the group')
+
+    if random_element is None:
+        def random_element():
+            return randint(2, group.modulus - 1)
+
+    h = group.id
+    while h == group.id:
+        h = group.scale(random_element(), group_order // m)
+
+    return h
+
+class ResidueSearch:
+    """Outcome of a search for the residue i such that test(h**i) passes
+
+    Attributes
+    ----------
+    residue: int, optional
+        The residue found, None if no candidate passed
+    candidates: int
+        Number of candidates tested
+    seconds: float
+        Time taken by the search
+    """
+    def __init__(self, residue, candidates: int, seconds: float):
+        self.residue = residue
+        self.candidates = candidates
+        self.seconds = seconds
+
+    @property
+    def rate(self):
+        # Candidates tested per second
+        return self.candidates / self.seconds if self.seconds else float('inf')
+
+    def __repr__(self):
+        return f'ResidueSearch(residue={self.residue}, candidates={self.candidates}, ' \
+               f'seconds={self.seconds:.3f}, rate={self.rate:.0f}/s)'
+
+
+# Per process state of the worker pools, set once by _init_worker rather than sent with every task
+_state = {}
+
+def _init_worker(group: Group, found=None, shared=()):
+    # group and the arguments shared by every task
+    # found is the event set once a residue search has its answer
+    _state.update(group=group, found=found, shared=shared)
+
+def _residue_in_range(group: Group, h, start: int, stop: int, test: callable, found=None):
+    # Returns the smallest start <= i < stop such that test(h**i) is True, or None,
+    # along with the number of candidates tested
+    # Candidates h**i are stepped through with one group operation each,
+    # rather than computing each power from scratch
+    # The range is given up, returning None, once found is set by another process
+    el = group.scale(h, start) if start else group.id
+    for i in range(start, stop):
+        if test(el):
+            return i, i - start + 1
+        if found is not None and not (i - start + 1) % 256 and found.is_set():
+            return None, i - start + 1
+        el = group.add(el, h)
+
+    return None, stop - start
+
+def _residue_in_chunk(h, start: int, stop: int, test: callable):
+    # _residue_in_range in a pool worker, skipped once another chunk found the residue
+    found = _state['found']
+    if found.is_set():
+        return None, 0
+
+    i, n_tested = _residue_in_range(_state['group'], h, start, stop, test, found)
+    if i is not None:
+        found.set()
+
+    return i, n_tested
+
+def residue_from_test(group: Group, h, m: int, test: callable):
+    # Returns the smallest i < m such that test(h**i) is True, or None
+    return _residue_in_range(group, h, 0, m, test)[0]
+
+def search_residue(group: Group, h, m: int, test: callable, workers: int = 1, chunk_size: int = 4096):
+    # Finds i < m such that test(h**i) is True, returns a ResidueSearch
+    # Candidates are split into chunks of chunk_size, spread across a pool of workers processes,
+    # so test must be picklable. The group is sent once to each worker. The search stops as soon
+    # as a chunk finds the residue: chunks not started are dropped and running ones give up
+    start_time = time.perf_counter()
+    chunks = [(start, min(start + chunk_size, m)) for start in range(0, m, chunk_size)]
+    residue, candidates = None, 0
+
+    if workers <= 1:
+        for start, stop in chunks:
+            residue, n_tested = _residue_in_range(group, h, start, stop, test)
+            candidates += n_tested
+            if residue is not None:
+                break
+
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        found = multiprocessing.Event()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(group, found))
+        try:
+            futures = [pool.submit(_residue_in_chunk, h, start, stop, test) for start, stop in chunks]
+
+            for future in as_completed(futures):
+                i, n_tested = future.result()
+                candidates += n_tested
+                if i is not None:
+                    residue = i
+                    break
+
+        finally:
+            # Chunks not yet started are dropped, running ones stop within 256 candidates
+            found.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return ResidueSearch(residue, candidates, time.perf_counter() - start_time)
+
+def _residue_from_job(job, group: Group = None):
+    # Unpacks a job (h, m, test) for residue_from_test, in a pool worker if group is None
+    h, m, test = job
+    return residue_from_test(group or _state['group'], h, m, test)
+
+def residues_from_tests(group: Group, jobs, workers: int = 1):
+    # Runs residue_from_test for each job (h, m, test) in jobs
+    # Jobs are spread across a pool of workers processes, so test must be picklable
+    # (a module-level function, or a functools.partial of one)
+    if workers <= 1:
+        return [_residue_from_job(job, group) for job in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(group,)) as pool:
+        return list(pool.map(_residue_from_job, jobs))
+
+def _subgroup_log(group: Group, g, y, order: int, factor: int):
+    # Returns x mod factor, where g**x = y and g has order 'order'
+    # Both g and y are sent to the subgroup of order factor, where the logarithm is small
+    g_f = group.scale(g, order // factor)
+    y_f = group.scale(y, order // factor)
+
+    return solve_dlog(group, g_f, y_f, bounds=(0, factor - 1)).x
+
+def _subgroup_log_worker(factor: int):
+    # _subgroup_log in a pool worker, with the group, g, y and order set by _init_worker
+    return _subgroup_log(_state['group'], *_state['shared'], factor)
+
+def pohlig_hellman(group: Group, g, y, order: int, factors, workers: int = 1):
+    """
+    Pohlig-Hellman algorithm
+    Find x mod the product of factors such that g**x = y.
+    For each factor, g**(order/factor) and y**(order/factor) generate a subgroup of order factor,
+    where the logarithm is found by baby-step giant-step in about sqrt(factor) group operations.
+
+    Parameters
+    ----------
+    group: Group
+        Group g and y belong to
+    g
+        Group element we took a power of
+    y
+        Group element we are trying to invert
+    order: int
+        Order of g
+    factors: list of int
+        Pairwise coprime factors of order (ex: prime powers)
+    workers: int
+        Number of processes the factors are spread across
+
+    Returns
+    -------
+    tuple of int
+        x mod the product of factors, and the product of factors
+    """
+    if workers <= 1:
+        residues = [_subgroup_log(group, g, y, order, factor) for factor in factors]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(group, None, (g, y, order))) as pool:
+            residues = list(pool.map(_subgroup_log_worker, factors))
+
+    if None in residues:
+        raise Exception('Error: no logarithm found in a subgroup')
+
+    combined = CRTAccumulator(residues, factors)
+    return combined.x, combined.modulus
@@ -0,0 +1,114 @@
+"""
+Random bytes and integers for keys, IVs, nonces, salts and secret exponents.
+
+Bytes are read from os.urandom a buffer at a time and handed out in slices, so that a
+16 byte key costs a slice rather than a system call. Integers are drawn from the same bytes.
+Seeding switches to a deterministic stream (random.Random) for reproducible runs and
+benchmarks, as does setting the CRYPTOPALS_SEED environment variable:
+    Randomness.rand_bytes(16)
+    Randomness.randint(0, q - 1)
+    Randomness.seed(0)  # Deterministic from here on
+    Randomness.seed()   # Back to os.urandom
+"""
+
+import os
+import threading
+from random import Random
+
+
+class EntropyPool:
+    """Buffer of random bytes, refilled in bulk
+
+    Attributes
+    ----------
+    seeded: bool
+        True if bytes come from a seeded random.Random, False if they come from os.urandom
+    refills: int
+        Number of times the buffer was refilled
+
+    Parameters
+    ----------
+    size: int
+        Number of bytes read per refill. Requests of at least size bytes bypass the buffer
+    seed: int, optional
+        Seed of a deterministic stream. Not secure, for reproducible runs only
+    """
+    def __init__(self, size: int = 1 << 16, seed: int = None):
+        self.size = size
+        self.refills = 0
+        self._lock = threading.Lock()
+        self.seed(seed)
+
+    def seed(self, seed: int = None):
+        # Deterministic stream from seed, or os.urandom if seed is None
+        with self._lock:
+            self._random = None if seed is None else Random(seed)
+            self.seeded = seed is not None
+            self.clear()
+
+    def clear(self):
+        # Drops the buffered bytes
+        self._buffer = b''
+        self._pos = 0
+
+    def _after_fork(self):
+        # Another thread may have held the lock when the process forked
+        self._lock = threading.Lock()
+        self.clear()
+
+    def _read(self, n: int) -> bytes:
+        # n bytes from the source
+        return self._random.randbytes(n) if self._random else os.urandom(n)
+
+    def refill(self):
+        # Replaces the buffer with size fresh bytes
+        with self._lock:
+            self._refill()
+
+    def _refill(self):
+        self._buffer = self._read(self.size)
+        self._pos = 0
+        self.refills += 1
+
+    def bytes(self, n: int) -> bytes:
+        # Returns n random bytes
+        with self._lock:
+            if n >= self.size:
+                return self._read(n)
+
+            if self._pos + n > len(self._buffer):
+                self._refill()
+            self._pos += n
+
+            return self._buffer[self._pos - n:self._pos]
+
+    def randbelow(self, n: int) -> int:
+        # Returns a uniform integer in [0, n), by rejection of the draws that are too large
+        if n <= 0:
+            raise ValueError('n must be positive')
+
+        bits = (n - 1).bit_length()
+        n_bytes = (bits + 7) // 8
+        while True:
+            x = int.from_bytes(self.bytes(n_bytes), 'big') >> (8 * n_bytes - bits)
+            if x < n:
+                return x
+
+    def randint(self, a: int, b: int) -> int:
+        # Returns a uniform integer in [a, b], as random.randint
+        return a + self.randbelow(b - a + 1)
+
+
+# Pool used throughout the project
+_SEED = os.environ.get('CRYPTOPALS_SEED')
+POOL = EntropyPool(seed=int(_SEED) if _SEED else None)
+
+# A forked child would otherwise hand out the same bytes as its parent
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=POOL._after_fork)
+
+seed = POOL.seed
+refill = POOL.refill
+rand_bytes = POOL.bytes
+randbelow = POOL.randbelow
+randint = POOL.randint
@@ -7,6 +7,8 @@ SHA-1 is a 20-byte hash function
 @author: Lawrence Arscott
 """
 
+import struct
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from IntAsWord import IntAsWord
 
 # Operations
@@ -36,15 +38,15 @@ def pad(msg: bytes, extending: int = 0):
     return msg
 
 # Main
-def sha_1(msg: bytes,
-          h0=0x67452301,
-          h1=0xEFCDAB89,
-          h2=0x98BADCFE,
-          h3=0x10325476,
-          h4=0xC3D2E1F0,
-          extending=0):
-
-    msg = pad(msg, extending)
+def process_chunks(msg: bytes,
+                   h0=0x67452301,
+                   h1=0xEFCDAB89,
+                   h2=0x98BADCFE,
+                   h3=0x10325476,
+                   h4=0xC3D2E1F0):
+    # Runs the SHA-1 compression function over msg, whose length must be a multiple of 64 bytes
+    # Returns the registers h0, h1, h2, h3, h4 once every chunk has been processed
+    assert len(msg) % 64 == 0
 
     # Process the message in successive 512-bit chunks:
     # Break message into 512-bit chunks
@@ -101,6 +103,20 @@ def sha_1(msg: bytes,
         h3 = (h3 + d) % 2 ** 32
         h4 = (h4 + e) % 2 ** 32
 
+    return h0, h1, h2, h3, h4
+
+def sha_1(msg: bytes,
+          h0=0x67452301,
+          h1=0xEFCDAB89,
+          h2=0x98BADCFE,
+          h3=0x10325476,
+          h4=0xC3D2E1F0,
+          extending=0):
+
+    msg = pad(msg, extending)
+
+    h0, h1, h2, h3, h4 = process_chunks(msg, h0, h1, h2, h3, h4)
+
     # Produce the final hash value (big-endian) as a 160-bit number
     # (simply append the 5 32-bit SHA-1 registers):
     hh = ((h0 << 128) | (h1 << 96) | (h2 << 64) | (h3 << 32) | h4)
@@ -123,6 +139,10 @@ def check_mac(c_text: bytes, key: bytes):
     # Perform check
     assert sha_1(key + msg) == mac
 
+def digest_to_state(shaed: bytes):
+    # Returns the registers h0, h1, h2, h3, h4 SHA-1 left off with when producing shaed
+    return struct.unpack('>5I', shaed)
+
 def extend(shaed: bytes, extension: bytes, len_og_msg: int):
     # Extend a SHA-ed message with 'extension'
     # Length of original message is required
@@ -130,17 +150,52 @@ def extend(shaed: bytes, extension: bytes, len_og_msg: int):
     # SHA1(pad(pad(original) + extension))
 
     # Obtain parameters a, b, c, d, e where SHA-1 would have left off
-    bin_rep = IntAsWord(int.from_bytes(shaed, 'big'), 160)
-
-    a = int(bin_rep.bin_str(None, 32), 2)
-    b = int(bin_rep.bin_str(32, 64), 2)
-    c = int(bin_rep.bin_str(64, 96), 2)
-    d = int(bin_rep.bin_str(96, 128), 2)
-    e = int(bin_rep.bin_str(128, None), 2)
+    a, b, c, d, e = digest_to_state(shaed)
 
     # Restart SHA with those parameters and further bytes to SHA
     return sha_1(extension, a, b, c, d, e, len_og_msg)
 
+def forge_extensions(mac: bytes, msg: bytes, extension: bytes, key_len_range):
+    # Length extension attack for unknown key lengths
+    # mac is SHA1(key|msg), returns a list of (forged_msg, forged_mac) candidates,
+    # one for each key length in key_len_range, where forged_mac = SHA1(key|forged_msg)
+    # when the key has the corresponding length
+
+    # SHA-1 state is the same whatever the key length, so only decode it once
+    state = digest_to_state(mac)
+
+    candidates = []
+    for key_len in key_len_range:
+        # Padded (key|msg), the key is unknown but only its length matters for the glue padding
+        padded = pad(b'\x00' * key_len + msg)
+
+        # Result is (msg|glue padding|extension)
+        forged_msg = padded[key_len:] + extension
+
+        # Pick up SHA-1 where it left off, after len(padded) bytes
+        forged_mac = sha_1(extension, *state, extending=len(padded))
+
+        candidates.append((forged_msg, forged_mac))
+
+    return candidates
+
+def find_forgery(candidates, oracle: callable, workers: int = 8):
+    # Checks (forged_msg, forged_mac) candidates concurrently against oracle,
+    # a function taking (msg, mac) and returning True if the mac is accepted
+    # Returns the first candidate found to be accepted, or None
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(oracle, *candidate): candidate for candidate in candidates}
+        for future in as_completed(futures):
+            if future.result():
+                return futures[future]
+
+    finally:
+        # Calls not yet started are dropped, those running are not waited for
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return None
+
 # HMAC
 # Using pseudocode from https://en.wikipedia.org/wiki/HMAC
 def blocksize_key(key: bytes, hash_f: callable, b_size: int):
@@ -168,6 +223,23 @@ def hmac(key: bytes, msg: bytes, base=None):
 
     return EasyByte(sha_1(o_key + sha_1(i_key + msg))).convert(base)
 
+def gen_hmac(key: bytes, base=None) -> callable:
+    # Returns a function msg -> hmac(key, msg)
+    # The keyed inner and outer blocks are processed once, and their SHA-1 states reused for each message
+    from EasyByte import EasyByte
+
+    key = EasyByte(blocksize_key(key, sha_1, 64))
+
+    o_state = process_chunks(key.xor(b'\x5c' * 64).b)
+    i_state = process_chunks(key.xor(b'\x36' * 64).b)
+
+    def keyed_hmac(msg: bytes):
+        # Pick up SHA-1 after the 64-byte keyed block
+        inner = sha_1(msg, *i_state, extending=64)
+        return EasyByte(sha_1(inner, *o_state, extending=64)).convert(base)
+
+    return keyed_hmac
+
 def check_hmac(c_text: bytes, key: bytes):
     # Message authentification
     # Checks the received ciphertext is of form:
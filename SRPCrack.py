@@ -0,0 +1,216 @@
+"""
+Offline dictionary attack on simplified SRP, challenge 38
+A man in the middle posing as the server picks b, u and the salt, and receives HMAC(K, salt)
+from the client. For a candidate password with x = SHA256(salt|password), the client's
+S = B**(a + u*x) is also
+    S = (A * v**u)**b = A**b * (g**(u*b))**x
+where A**b and g**(u*b) do not depend on the password: they are computed once, and each guess
+then costs one hash, one exponentiation of the fixed base g**(u*b) and one HMAC.
+"""
+
+import hmac
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from hashlib import sha256
+from DH import FixedBase
+
+# State of each worker process, see _init_worker
+_state = {}
+
+def _init_worker(A_b: int, g_ub: int, N: int, salt: bytes, target: bytes):
+    # One table per worker for exponents of at most 384 bits, small enough for the wider window
+    _state.update(A_b=A_b, table=FixedBase(g_ub, N, w=8), N=N, salt=salt, target=target)
+
+def _check_chunk(passwords):
+    # Returns the password among passwords giving the target HMAC, or None
+    A_b, table, N = _state['A_b'], _state['table'], _state['N']
+    salt, target = _state['salt'], _state['target']
+
+    for password in passwords:
+        x = int.from_bytes(sha256(salt + password).digest(), 'big')
+        S = A_b * table.power(x) % N
+        K = sha256(str(S).encode()).digest()
+        if hmac.compare_digest(hmac.digest(K, salt, 'sha256'), target):
+            return password
+
+    return None
+
+def read_chunks(path: str, chunk_size: int):
+    # Yields lists of chunk_size passwords from the file at path, one password per line
+    with open(path, 'rb') as f:
+        chunk = []
+        for line in f:
+            password = line.rstrip(b'\r\n')
+            if password:
+                chunk.append(password)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class CrackResult:
+    """Outcome of a dictionary attack
+
+    Attributes
+    ----------
+    password: bytes, optional
+        Password found, None if it was not in the wordlist
+    guesses: int
+        Number of passwords tried
+    seconds: float
+        Time taken
+    """
+    def __init__(self, password, guesses: int, seconds: float):
+        self.password = password
+        self.guesses = guesses
+        self.seconds = seconds
+
+    @property
+    def rate(self):
+        # Guesses per second
+        return self.guesses / self.seconds if self.seconds else float('inf')
+
+    def __repr__(self):
+        return f'CrackResult(password={self.password!r}, guesses={self.guesses}, ' \
+               f'seconds={self.seconds:.3f}, rate={self.rate:.0f}/s)'
+
+
+class DictionaryAttack:
+    """Recovers the client's password from a single simplified SRP login to a fake server
+
+    Parameters
+    ----------
+    A: int
+        Client's public key
+    b: int
+        Fake server's secret key
+    u: int
+        Scrambling parameter sent to the client
+    salt: bytes
+        Salt sent to the client
+    client_hmac: bytes
+        HMAC(K, salt) received from the client
+    N: int
+    g: int
+        Group parameters
+    workers: int, optional
+        Number of processes the wordlist is shared across, by default one per CPU
+    chunk_size: int
+        Number of passwords sent to a process at a time
+    """
+    def __init__(self, A: int, b: int, u: int, salt: bytes, client_hmac: bytes, N: int, g=2,
+                 workers=None, chunk_size=256):
+        self.N = N
+        self.salt = salt
+        self.client_hmac = client_hmac
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+
+        # Independent of the password
+        self.A_b = pow(A, b, N)
+        self.g_ub = pow(g, u * b, N)
+
+    @classmethod
+    def from_server(cls, server, client_hmac: bytes, **kwargs):
+        # Attack from the state of a SimpleServer having received A and client_hmac
+        return cls(server.A, server.b, server.u, server.salt, client_hmac, server.N, server.g, **kwargs)
+
+    def _init_args(self):
+        return self.A_b, self.g_ub, self.N, self.salt, self.client_hmac
+
+    def crack(self, chunks) -> CrackResult:
+        # Tries every password in chunks (an iterable of lists of passwords), returns a CrackResult
+        # Chunks are read as they are needed, at most two per process are waiting at any time
+        start = time.perf_counter()
+        guesses = 0
+        found = None
+
+        if self.workers <= 1:
+            _init_worker(*self._init_args())
+            for chunk in chunks:
+                found = _check_chunk(chunk)
+                guesses += len(chunk) if found is None else chunk.index(found) + 1
+                if found is not None:
+                    break
+
+            return CrackResult(found, guesses, time.perf_counter() - start)
+
+        chunks = iter(chunks)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=self._init_args()) as pool:
+            pending = {}
+            for chunk in chunks:
+                pending[pool.submit(_check_chunk, chunk)] = chunk
+                if len(pending) < 2 * self.workers:
+                    continue
+
+                # Wait for a chunk to be done before reading the next one
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    guesses += len(pending.pop(future))
+                    found = found or future.result()
+                if found is not None:
+                    break
+
+            # Chunks already sent
+            for future in list(pending):
+                if found is not None:
+                    future.cancel()
+                if not future.cancelled():
+                    guesses += len(pending[future])
+                    found = found or future.result()
+
+        return CrackResult(found, guesses, time.perf_counter() - start)
+
+    def crack_file(self, path: str) -> CrackResult:
+        # Tries every password in the file at path, one per line
+        return self.crack(read_chunks(path, self.chunk_size))
+
+
+if __name__ == '__main__':
+    import argparse
+    import tempfile
+    from random import Random
+    from DH import SimpleServer, SimpleClient
+
+    parser = argparse.ArgumentParser(description='Offline dictionary attack on simplified SRP')
+    parser.add_argument('--wordlist', help='one password per line, by default a generated wordlist')
+    parser.add_argument('--password', default=None, help="client's password, by default one from the wordlist")
+    parser.add_argument('--words', type=int, default=20000, help='size of the generated wordlist')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=38)
+    args = parser.parse_args()
+
+    path = args.wordlist
+    password = args.password.encode() if args.password else None
+    if path is None:
+        # Random lowercase words, the client's password among the last ones
+        rand = Random(args.seed)
+        words = [''.join(rand.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rand.randint(5, 10))).encode()
+                 for _ in range(args.words)]
+        password = password or words[rand.randrange(len(words) * 9 // 10, len(words))]
+        with tempfile.NamedTemporaryFile('wb', suffix='.txt', delete=False) as f:
+            f.write(b'\n'.join(words))
+            path = f.name
+    elif password is None:
+        with open(path, 'rb') as f:
+            password = f.read().splitlines()[-1]
+
+    # Local stand-in for the login: the client talks to our fake server
+    client = SimpleClient(b'foo@bar', password)
+    fake_server = SimpleServer(b'foo@bar', b'')  # Fake server does not know the password
+    fake_server.A = client.A
+    client.salt, client.B, client.u = fake_server.salt, fake_server.B, fake_server.u
+    client.K = client.gen_K()
+
+    attack = DictionaryAttack.from_server(fake_server, client.gen_h(), workers=args.workers)
+    result = attack.crack_file(path)
+
+    print(result)
+    print(f"Client's password is {result.password}, {result.guesses} guesses at {result.rate:.0f} guesses/s")
+
+    if args.wordlist is None:
+        os.remove(path)
@@ -0,0 +1,386 @@
+"""
+Asyncio SRP server for many clients at once, challenge 36
+Verifiers are kept on disk in a VerifierStore rather than computed for each login, and the
+password independent part of B, g**b, is taken from a pool refilled in the background.
+The only exponentiations left while a client waits are those of the session key S.
+
+The protocol is that of Server.py and Client.py, over framed messages (see Framing):
+    client sends email, then A
+    server answers salt, then B
+    client sends HMAC-SHA256(K, salt)
+    server answers OK or Error
+An unknown email is answered with Error straight away.
+"""
+
+import asyncio
+import hmac
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ByteUtils import rand_bytes
+from DH import SRP_N, Server, Client, gen_verifier, gen_ephemeral
+from Framing import read_frame, write_frames, encode_element, decode_element
+from Metrics import LatencyRecorder
+
+OK = b'OK'
+ERROR = b'Error'
+
+
+class VerifierStore:
+    """Salts and password verifiers of the server's users, in a file keyed by email
+
+    Each record is a header (lengths of email, salt and verifier) followed by the email, the salt,
+    and the verifier as a big-endian integer. The file is memory-mapped on the first lookup, when
+    an index of the emails is built: verifiers themselves are only read when asked for.
+
+    Parameters
+    ----------
+    path: str
+        File holding the store, created by VerifierStore.build or add
+    """
+    RECORD = struct.Struct('>HBH')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._index = None
+
+    @classmethod
+    def build(cls, path: str, users, g=2, N=SRP_N):
+        # Writes a new store to path, users is an iterable of (email, password) pairs
+        # Returns the store
+        with open(path, 'wb') as f:
+            for email, password in users:
+                salt = rand_bytes(8)
+                f.write(cls._record(email, salt, gen_verifier(salt, password, g, N)))
+
+        return cls(path)
+
+    @classmethod
+    def _record(cls, email: bytes, salt: bytes, v: int):
+        v_bytes = v.to_bytes(-(-v.bit_length() // 8), 'big')
+
+        return cls.RECORD.pack(len(email), len(salt), len(v_bytes)) + email + salt + v_bytes
+
+    def _load(self):
+        # Maps the file and indexes the emails, {email: (offset of the salt, salt length, verifier length)}
+        self._index = {}
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return  # Nothing to map
+
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        offset = 0
+        while offset < len(self._map):
+            email_len, salt_len, v_len = self.RECORD.unpack_from(self._map, offset)
+            offset += self.RECORD.size
+            email = self._map[offset:offset + email_len]
+            offset += email_len
+            self._index[email] = (offset, salt_len, v_len)  # Later records replace earlier ones
+            offset += salt_len + v_len
+
+    def get(self, email: bytes):
+        # Returns the salt and verifier of email, None if it is unknown
+        if self._index is None:
+            self._load()
+
+        if email not in self._index:
+            return None
+
+        offset, salt_len, v_len = self._index[email]
+        salt = self._map[offset:offset + salt_len]
+        v = int.from_bytes(self._map[offset + salt_len:offset + salt_len + v_len], 'big')
+
+        return salt, v
+
+    def add(self, email: bytes, password: bytes, g=2, N=SRP_N):
+        # Adds a user, or changes their password, the store is mapped again on the next lookup
+        salt = rand_bytes(8)
+        with open(self.path, 'ab') as f:
+            f.write(self._record(email, salt, gen_verifier(salt, password, g, N)))
+        self.close()
+
+    def __contains__(self, email: bytes):
+        return self.get(email) is not None
+
+    def __len__(self):
+        if self._index is None:
+            self._load()
+
+        return len(self._index)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = self._map = self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Worker processes are sent the group parameters once, when they start
+_params = None
+
+def _init_worker(g: int, N: int):
+    global _params
+    _params = (g, N)
+
+def _ephemeral():
+    return gen_ephemeral(*_params)
+
+def _session_key(server: Server):
+    return server.gen_K()
+
+
+class EphemeralPool:
+    """Pairs (b, g**b) generated ahead of the logins which use them
+
+    Attributes
+    ----------
+    misses: int
+        Number of times a login had to wait for a pair to be generated
+
+    Parameters
+    ----------
+    run: coroutine function
+        Runs a function, see SRPServer._run
+    size: int
+        Number of pairs kept ready
+    fillers: int
+        Number of pairs generated at the same time
+    """
+    def __init__(self, run, size=64, fillers=1):
+        self.run = run
+        self.queue = asyncio.Queue(maxsize=size)
+        self.fillers = fillers
+        self.misses = 0
+        self._tasks = []
+
+    async def _fill(self):
+        while True:
+            await self.queue.put(await self.run(_ephemeral))
+
+    def start(self):
+        self._tasks = [asyncio.ensure_future(self._fill()) for _ in range(self.fillers)]
+
+    async def get(self):
+        # Returns a pair, waiting for one if the pool has run dry
+        if self.queue.empty():
+            self.misses += 1
+
+        return await self.queue.get()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+class SRPServer:
+    """Accepts any number of concurrent SRP logins, against the users of a VerifierStore
+
+    Attributes
+    ----------
+    metrics: LatencyRecorder
+        Latency of each login, from receiving A to sending B ('B') and to sending the verdict ('login')
+    logins: int
+        Number of successful logins
+    failed: int
+        Number of logins with a wrong password or an unknown email
+
+    Parameters
+    ----------
+    store: VerifierStore
+        Salts and verifiers of the users
+    pool_size: int
+        Number of pairs (b, g**b) kept ready
+    workers: int, optional
+        Number of processes for exponentiations, by default one per CPU.
+        With 0, exponentiations are run in the event loop
+    g: int
+    k: int
+    N: int
+        SRP parameters, agreed upon with the clients
+    """
+    def __init__(self, store: VerifierStore, pool_size=64, workers=None, g=2, k=3, N=SRP_N):
+        self.store = store
+        self.g = g
+        self.k = k
+        self.N = N
+        self.workers = os.cpu_count() if workers is None else workers
+        self.metrics = LatencyRecorder()
+        self.logins = 0
+        self.failed = 0
+        self.ephemerals = EphemeralPool(self._run, pool_size, max(1, self.workers))
+        self.pool = None
+        self.server = None
+        self._started = None
+
+    async def _run(self, fun, *args):
+        # Runs fun in the process pool if there is one
+        if self.pool is None:
+            await asyncio.sleep(0)  # Let logins through between pairs generated in the event loop
+            return fun(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fun, *args)
+
+    async def handle(self, reader, writer):
+        # Serves a single login
+        key = None
+        try:
+            email = await read_frame(reader)
+            A = decode_element(await read_frame(reader))
+            start = time.perf_counter()
+
+            record = self.store.get(email)
+            if record is None:
+                write_frames(writer, ERROR)
+                await writer.drain()
+                self.failed += 1
+                return
+
+            salt, v = record
+            server = Server(email, None, self.N, self.g, self.k, salt=salt, v=v, keys=await self.ephemerals.get())
+            server.A = A
+            write_frames(writer, server.salt, encode_element(server.B))
+            await writer.drain()
+            self.metrics.record('B', time.perf_counter() - start)
+
+            # Work out the session key while the client does the same
+            server.u = server.gen_u()
+            key = asyncio.ensure_future(self._run(_session_key, server))
+            client_h = await read_frame(reader)
+            server.K = await key
+
+            if hmac.compare_digest(server.gen_h(), client_h):  # Constant time
+                write_frames(writer, OK)
+                self.logins += 1
+            else:
+                write_frames(writer, ERROR)
+                self.failed += 1
+            await writer.drain()
+
+            self.metrics.record('login', time.perf_counter() - start)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client dropped in the middle of a login
+
+        finally:
+            if key is not None and not key.done():
+                key.cancel()  # Client gone before its HMAC, the session key is not needed
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=65435):
+        # Starts filling the pool of pairs and listening, returns the port (useful with port=0)
+        if self.workers:
+            # Spawned rather than forked, so that workers do not inherit the sockets of open connections
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_init_worker, initargs=(self.g, self.N))
+        else:
+            _init_worker(self.g, self.N)
+        self.ephemerals.start()
+        self.server = await asyncio.start_server(self.handle, host, port)
+        self._started = time.perf_counter()
+
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.ephemerals.stop()
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
+
+    def report(self):
+        # Returns logins, logins per second since start, pool misses and latency percentiles
+        seconds = time.perf_counter() - self._started if self._started else 0.0
+
+        return {
+            'logins': self.logins,
+            'failed': self.failed,
+            'logins_per_sec': self.logins / seconds if seconds else 0.0,
+            'pool_misses': self.ephemerals.misses,
+            **self.metrics.snapshot(),
+        }
+
+
+async def run_login(host: str, port: int, email: bytes, password: bytes):
+    # Client.py over asyncio: logs in, returns True if the server answered OK
+    reader, writer = await asyncio.open_connection(host, port)
+    client = Client(email, password)
+
+    try:
+        write_frames(writer, client.E, encode_element(client.A))
+        await writer.drain()
+
+        client.salt = await read_frame(reader)
+        if client.salt == ERROR:
+            return False  # Unknown email
+        client.B = decode_element(await read_frame(reader))
+        client.u = client.gen_u()
+        client.K = client.gen_K()
+
+        write_frames(writer, client.gen_h())
+        await writer.drain()
+
+        return await read_frame(reader) == OK
+
+    finally:
+        writer.close()
+
+async def load_test(host: str, port: int, users, n_logins=100):
+    # Runs n_logins concurrent logins, users is a list of (email, password) pairs taken in turn
+    # Returns the number of successful logins and the time taken
+    start = time.perf_counter()
+    results = await asyncio.gather(*[run_login(host, port, *users[i % len(users)]) for i in range(n_logins)])
+
+    return sum(results), time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description='Multi-session SRP server')
+    parser.add_argument('--store', default=None, help='verifier store, by default a new one with --users users')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--port', type=int, default=65435)
+    parser.add_argument('--workers', type=int, default=None, help='processes for exponentiations')
+    parser.add_argument('--pool', type=int, default=64, help='pairs (b, g**b) kept ready')
+    parser.add_argument('--load', type=int, default=0, help='run this many logins against the server and exit')
+    args = parser.parse_args()
+
+    our_users = [(f'user{i}@bar'.encode(), f'password{i}'.encode()) for i in range(args.users)]
+    path = args.store
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'verifiers.bin')
+        t = time.perf_counter()
+        VerifierStore.build(path, our_users)
+        print(f'Store of {args.users} users built in {time.perf_counter() - t:.2f}s at {path}')
+
+    async def main():
+        server = SRPServer(VerifierStore(path), pool_size=args.pool, workers=args.workers)
+        port = await server.start(port=args.port)
+        print(f'Listening on port {port}')
+
+        if args.load:
+            await asyncio.sleep(1)  # Give the pool time to fill
+            n_ok, seconds = await load_test('127.0.0.1', port, our_users, args.load)
+            print(f'{n_ok}/{args.load} logins in {seconds:.2f}s')
+            print(server.report())
+            await server.stop()
+        else:
+            await server.server.serve_forever()
+
+    asyncio.run(main())
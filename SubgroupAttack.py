@@ -0,0 +1,105 @@
+"""
+Small subgroup confinement attack against a Diffie-Hellman receiver, challenges 57 and 58
+Probes for every factor are sent at once, and each reply is brute forced in a pool of processes
+as soon as it arrives, while the following replies are still on their way.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ByteUtils import rand_bytes
+from NumberTheory import CRTAccumulator
+from DH import DHAttacker, MacTest
+from Framing import encode_element
+from PohligHellman import subgroup_element, search_residue
+
+
+class SmallSubgroupAttack:
+    """Recovers the receiver's secret key modulo small factors of the order of the group
+
+    The receiver keeps its secret key for the whole connection (see Bob_8-1.py and DHServer),
+    so all probes go over a single connection: the elements h of small order and the ivs are
+    pipelined in one batch, and the receiver answers them in order.
+    Wall time is then close to the longest of network and brute force, rather than their sum.
+
+    Attributes
+    ----------
+    crt: CRTAccumulator
+        Secret key modulo the factors whose residue has been found so far
+    searches: dict
+        ResidueSearch for each factor
+    network_seconds: float
+        Time until the last reply was received
+    seconds: float
+        Total time taken by the attack
+
+    Parameters
+    ----------
+    attacker: DHAttacker
+        Holds the group agreed upon, and receives the secret key found as part_key, part_key_mod
+    group_order: int
+        Order of the whole group the elements h are taken from, ex: p - 1 for integers mod p
+    factors: list of int
+        Pairwise coprime small factors of group_order
+    workers: int, optional
+        Number of processes brute forcing replies, by default one per CPU
+    """
+    def __init__(self, attacker: DHAttacker, group_order: int, factors, workers=None):
+        self.attacker = attacker
+        self.group_order = group_order
+        self.factors = factors
+        self.workers = workers or os.cpu_count()
+        self.crt = CRTAccumulator()
+        self.searches = {}
+        self.network_seconds = None
+        self.seconds = None
+
+    def _merge(self, factor: int, search):
+        # Adds a residue found to the secret key
+        if search.residue is None:
+            raise Exception(f'Error: no value found mod {factor}')
+
+        self.searches[factor] = search
+        self.crt.add(search.residue, factor)
+
+    def run(self, channel, verbose=False):
+        # Runs the attack over channel (a Framing.Channel), returns the secret key and the modulus it is known to
+        start = time.perf_counter()
+        group = self.attacker.group
+
+        # Elements of small order, all sent at once, each followed by whatever as iv
+        probes = [(factor, subgroup_element(group, self.group_order, factor)) for factor in self.factors]
+        channel.send(*[payload for _, h in probes for payload in (encode_element(h), rand_bytes(16))])
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = {}
+            for factor, h in probes:
+                # Receiver's public key, then its reply under the key derived from h**b
+                self.attacker.pub_key = channel.recv_element()
+                self.attacker.rec_msg = channel.recv()
+
+                future = pool.submit(search_residue, group, h, factor, MacTest(self.attacker.rec_msg))
+                pending[future] = factor
+
+                # Merge whichever searches are already over, without waiting for the others
+                for done in [future for future in pending if future.done()]:
+                    self._merge(pending.pop(done), done.result())
+
+            self.network_seconds = time.perf_counter() - start
+
+            for done in as_completed(pending):
+                self._merge(pending[done], done.result())
+
+        self.seconds = time.perf_counter() - start
+        self.attacker.part_key, self.attacker.part_key_mod = self.crt.x, self.crt.modulus
+
+        if verbose:
+            for factor in self.factors:
+                search = self.searches[factor]
+                print(f'Key mod {factor} is {search.residue}: {search.candidates} candidates '
+                      f'at {search.rate:.0f} candidates/s')
+            print(f'Network {self.network_seconds:.2f}s, '
+                  f'brute force {sum(s.seconds for s in self.searches.values()):.2f}s, '
+                  f'total {self.seconds:.2f}s')
+
+        return self.crt.x, self.crt.modulus
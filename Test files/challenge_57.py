@@ -0,0 +1,7 @@
+# Challenge 57 parameters, shared by the tests of the small subgroup attack, the DH server and the proxy
+# p is prime, g generates the subgroup of prime order q, and (p - 1) / q has many small factors
+p = int('8977C3217DA1F838B8D24B4A790DE8FC8E35AD5483E463028EF9BBF9AF23A9BD1231EBA9A'
+        'C7E44363D8311D610B09AA224A023268EE8A60AC484FD9381962563', 16)
+g = int('572AFF4A93EC6214C1036C62E1818FE5E4E1D6DB635C1B12D9572203C47D241A0E543A89B'
+        '0B12BA61062411FCF3D29C6AB8C3CE6DAC7D2C9F7F0EBD3B7878AAF', 16)
+q = 236234353446506858198510045061214171961
@@ -19,3 +19,92 @@ class TestAESCode(TestCase):
         assert AESCode(b"I'm sexy and I know it, oh yeah", key=b'YELLOW SUBMARINE',
                        iv=b'I LIKE BIG BUTTS').cbc_encrypt().cbc_solve() ==\
                b"I'm sexy and I know it, oh yeah"
+
+    def test_from_bytes(self):
+        from Cryptopals_main import AESCode
+        msg = b'One cappuccino please.'
+        ciphertext = AESCode(msg, key=b'YELLOW SUBMARINE', iv=b'ORANGE SUBMARINE').cbc_encrypt().easybyte.b
+        code = AESCode.from_bytes(ciphertext, key=b'YELLOW SUBMARINE', iv=b'ORANGE SUBMARINE')
+        assert code.cbc_solve() == msg
+        assert AESCode.from_bytes(msg, b'YELLOW SUBMARINE', b'ORANGE SUBMARINE').cbc_encrypt().easybyte.b == ciphertext
+
+    def test_cipher_cache(self):
+        from Cryptopals_main import AESCode
+        # Ciphers are shared under the same key, random keys are not cached
+        assert AESCode(key=b'YELLOW SUBMARINE').cipher is AESCode.from_bytes(b'', key=b'YELLOW SUBMARINE').cipher
+        assert AESCode(key=b'YELLOW SUBMARINE').cipher is not AESCode(key=b'ORANGE SUBMARINE').cipher
+        assert AESCode(key='random').cipher is not AESCode(key='random').cipher
+
+
+class TestCRT(TestCase):
+    def test_crt(self):
+        from Cryptopals_main import crt
+        moduli = [2, 5, 109, 7963, 8539]
+        x = 123456789012345
+        assert crt(moduli, [x % m for m in moduli]) == x % (2 * 5 * 109 * 7963 * 8539)
+
+    def test_crt_zero_remainder(self):
+        from Cryptopals_main import crt
+        assert crt([3, 5, 7], [0, 0, 0]) == 0
+
+    def test_crt_not_coprime(self):
+        from Cryptopals_main import crt
+        assert crt([4, 6], [3, 1]) == 7
+        with self.assertRaises(ValueError):
+            crt([4, 6], [1, 2])
+
+    def test_garner(self):
+        from Cryptopals_main import crt, garner
+        moduli = [12457, 14741, 18061, 31193, 33941, 63803]
+        rems = [11, 2222, 333, 44444, 5, 66]
+        assert garner(moduli, rems) == crt(moduli, rems)
+
+    def test_accumulator(self):
+        from Cryptopals_main import CRTAccumulator
+        acc = CRTAccumulator()
+        x = 987654321
+        for m in [7, 11, 13, 17, 19, 23, 29]:
+            acc.add(x % m, m)
+            assert acc.x == x % acc.modulus
+        assert acc.modulus == 7 * 11 * 13 * 17 * 19 * 23 * 29
+
+
+def import_times(code):
+    # Runs code in a fresh interpreter under -X importtime
+    # Returns {module: cumulative import time in microseconds} for every module it imported
+    import os
+    import subprocess
+    import sys
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root,
+                            capture_output=True, text=True, check=True).stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:'):
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():  # Not the header
+                times[name.strip()] = int(cumulative)
+
+    return times
+
+
+class TestImports(TestCase):
+    def test_facade(self):
+        import Cryptopals_main
+        import AESModes
+        assert Cryptopals_main.AESCode is AESModes.AESCode
+        assert 'DetOracle' in dir(Cryptopals_main)
+        with self.assertRaises(AttributeError):
+            Cryptopals_main.not_a_function
+
+    def test_lazy(self):
+        # Byte utilities, the CRT and AES classes come without numpy, nor PyCryptodome until a cipher is made
+        times = import_times('import Cryptopals_main; Cryptopals_main.rand_bytes; Cryptopals_main.crt; '
+                             'Cryptopals_main.AESCode; import DH')
+        heavy = [name for name in times if name.split('.')[0] in ('numpy', 'Crypto')]
+        assert heavy == []
+        assert times['Cryptopals_main'] < 50000  # Was around 150ms with numpy and PyCryptodome
+
+        times = import_times("from Cryptopals_main import AESCode; AESCode(b'', key=b'YELLOW SUBMARINE')")
+        assert 'Crypto.Cipher.AES' in times
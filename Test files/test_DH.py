@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+
+class TestPowerMod(TestCase):
+    def test_fixed_base(self):
+        from random import Random
+        from DH import power_mod
+        rand = Random(0)
+        m = 2 ** 127 - 1
+        for _ in range(20):
+            e = rand.getrandbits(rand.randint(1, 400))
+            assert power_mod(3, e, m, fixed=True) == power_mod(3, e, m) == pow(3, e, m)
+
+        assert power_mod(3, 0, m, fixed=True) == 1
+
+
+class TestSRP(TestCase):
+    def test_login(self):
+        from DH import Server, Client
+        server = Server(b'foo@bar', b'bazquxquux')
+        client = Client(b'foo@bar', b'bazquxquux')
+
+        client.salt, client.B, server.A = server.salt, server.B, client.A
+        server.u = server.gen_u()
+        client.u = client.gen_u()
+
+        assert server.gen_K() == client.gen_K()
@@ -0,0 +1,68 @@
+from unittest import TestCase
+from challenge_57 import p, g, q
+
+
+def run_load(workers, n_clients, n_handshakes):
+    # Serves n_clients concurrent clients, returns the replies received and the server's report
+    import asyncio
+    from DHServer import DHServer, run_client
+    from Group import ModP, CycGroup
+
+    group = CycGroup.from_generator(ModP(p), g, q)
+
+    async def main():
+        server = DHServer(group, reply=b'Hello back', workers=workers)
+        port = await server.start(port=0)
+        try:
+            replies = await asyncio.gather(*[run_client(group, '127.0.0.1', port, n_handshakes)
+                                             for _ in range(n_clients)])
+        finally:
+            await server.stop()
+
+        return replies, server.report()
+
+    return asyncio.run(main())
+
+
+class TestDHServer(TestCase):
+    def test_sessions(self):
+        replies, report = run_load(0, 10, 3)
+        assert all(reply == [b'Hello back'] * 3 for reply in replies)
+        assert report['sessions'] == 10
+        assert report['handshake']['count'] == 30
+        assert report['sessions_per_sec'] > 0
+
+    def test_process_pool(self):
+        replies, report = run_load(2, 4, 2)
+        assert all(reply == [b'Hello back'] * 2 for reply in replies)
+        assert report['sessions'] == 4
+
+    def test_malformed_element(self):
+        # A public key that does not decode ends that session quietly, the server keeps serving
+        import asyncio
+        from DHServer import DHServer, run_client
+        from Framing import frame
+        from Group import ModP, CycGroup
+
+        group = CycGroup.from_generator(ModP(p), g, q)
+
+        async def main():
+            errors = []
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+            server = DHServer(group, reply=b'Hello back', workers=0)
+            port = await server.start(port=0)
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(frame(b'not a number'))
+                closed = await asyncio.wait_for(reader.read(), 5)
+                writer.close()
+                reply = await run_client(group, '127.0.0.1', port, 1)
+            finally:
+                await server.stop()
+
+            return closed, reply, errors
+
+        closed, reply, errors = asyncio.run(main())
+        assert closed == b''
+        assert reply == [b'Hello back']
+        assert errors == []
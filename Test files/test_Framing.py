@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+
+class TestFraming(TestCase):
+    def test_coalesced_frames(self):
+        # Frames sent back to back are read one at a time
+        import socket
+        from Framing import Channel
+
+        a, b = socket.socketpair()
+        with a, b:
+            Channel(a).send(b'iv' * 8, b'', b'ciphertext')
+            channel = Channel(b)
+            assert channel.recv() == b'iv' * 8
+            assert channel.recv() == b''
+            assert channel.recv() == b'ciphertext'
+
+    def test_split_frame(self):
+        # A frame arriving a few bytes at a time is read whole
+        import socket
+        from Framing import FrameReader, frame
+
+        a, b = socket.socketpair()
+        with a, b:
+            payload = bytes(range(256)) * 20  # Larger than 1 KB
+            data = frame(payload)
+            reader = FrameReader(b, bufsize=7)
+            for i in range(0, len(data), 1000):
+                a.sendall(data[i:i + 1000])
+            assert reader.recv() == payload
+
+    def test_closed_mid_frame(self):
+        import socket
+        from Framing import FrameReader, frame
+
+        a, b = socket.socketpair()
+        with b:
+            a.sendall(frame(b'truncated')[:-3])
+            a.close()
+            with self.assertRaises(ConnectionError):
+                FrameReader(b).recv()
+
+    def test_elements(self):
+        from Framing import encode_element, decode_element
+
+        for el in [0, 2 ** 1024 + 7, (182, 85518893674295321206118380980485522083)]:
+            assert decode_element(encode_element(el)) == el
+
+    def test_frame_too_large(self):
+        # A header over MAX_FRAME is refused before anything is allocated for the payload
+        import asyncio
+        import socket
+        from Framing import FrameReader, FrameTooLarge, HEADER, MAX_FRAME, read_frame
+
+        a, b = socket.socketpair()
+        with a, b:
+            a.sendall(HEADER.pack(MAX_FRAME + 1))
+            with self.assertRaises(FrameTooLarge):
+                FrameReader(b).recv()
+
+        async def read_huge():
+            reader = asyncio.StreamReader()
+            reader.feed_data(HEADER.pack(2 ** 32 - 1))
+            return await read_frame(reader)
+
+        with self.assertRaises(FrameTooLarge):
+            asyncio.run(read_huge())
@@ -0,0 +1,197 @@
+from unittest import TestCase
+
+# Curve from challenge 59
+p = 233970423115425145524320034830162017933
+a = 233970423115425145524320034830162017933 - 95051
+b = 11279326
+g = (182, 85518893674295321206118380980485522083)
+q = 29246302889428143187362802287225875743
+
+
+def double_and_add(group, g, k):
+    # Reference scaling
+    result = group.id
+    while k > 0:
+        if k % 2 == 1:
+            result = group.add(result, g)
+        g = group.add(g, g)
+        k = k >> 1
+
+    return result
+
+
+class TestScale(TestCase):
+    def test_modp(self):
+        from Group import ModP
+        group = ModP(2 ** 127 - 1)
+        for k in [0, 1, 2, 3, 255, 2 ** 64 + 12345]:
+            assert group.scale(5, k) == pow(5, k, 2 ** 127 - 1)
+
+    def test_egroup(self):
+        from random import Random
+        from Group import EGroup
+        curve = EGroup(p, a, b)
+        rand = Random(0)
+        for k in [1, 2, 3, 7, 8] + [rand.getrandbits(128) for _ in range(5)]:
+            assert curve.scale(g, k) == double_and_add(curve, g, k)
+
+        assert curve.scale(g, q) == 'O'
+        assert curve.scale(g, q - 1) == curve.inverse(g)
+
+    def test_cyc_group_table(self):
+        from random import Random
+        from Group import EGroup, CycGroup
+        curve = EGroup(p, a, b)
+        cyc = CycGroup.from_generator(curve, g, q)
+        rand = Random(1)
+        for k in [1, 2, q - 1, q + 5] + [rand.getrandbits(128) for _ in range(5)]:
+            assert cyc.scale(g, k) == double_and_add(curve, g, k % q)
+
+    def test_cyc_group_jacobian(self):
+        from Group import EGroup, CycGroup, JacobianPowerTable
+        curve = EGroup(p, a, b)
+        cyc = CycGroup.from_generator(curve, g, q)
+        other = curve.scale(g, 12345)
+        cyc.scale(g, q - 1)  # Builds the table
+        assert isinstance(cyc.g_table(), JacobianPowerTable)
+
+        # Counts modular inversions: one per scaling, to get back to affine coordinates
+        inversions = []
+        mod_inv = curve._mod_inv
+        curve._mod_inv = lambda x: inversions.append(x) or mod_inv(x)
+        assert cyc.scale(g, 2 ** 100 + 7) == double_and_add(EGroup(p, a, b), g, 2 ** 100 + 7)
+        assert cyc.scale(other, 2 ** 100 + 7) == double_and_add(EGroup(p, a, b), other, 2 ** 100 + 7)
+        assert len(inversions) == 2
+
+    def test_g_table_on_disk(self):
+        import os
+        import tempfile
+        from random import Random
+        from Group import ModP, EGroup, CycGroup, PowerTable
+        rand = Random(2)
+        directory = tempfile.mkdtemp()
+
+        for group, el, order in [(EGroup(p, a, b), g, q), (ModP(2 ** 127 - 1), 3, 2 ** 127 - 2)]:
+            path = os.path.join(directory, 'g.table')
+
+            # Built in full and written on first use, loaded afterwards
+            built = CycGroup.from_generator(group, el, order, path)
+            ks = [1, order - 1] + [rand.randrange(order) for _ in range(5)]
+            expected = [built.scale(el, k) for k in ks]
+            assert os.path.exists(path)
+
+            loaded = CycGroup.from_generator(group, el, order, path)
+            assert [loaded.scale(el, k) for k in ks] == expected
+            assert loaded.g_table().rows == built.g_table().rows
+
+            # Table of another element, built again and written over the stale one
+            el_2 = group.add(el, el)
+            other = CycGroup.from_generator(group, el_2, order, path)
+            with self.assertRaises(ValueError):
+                other.load_g_table()
+            assert [other.scale(el_2, k) for k in ks] == [built.scale(x, 2) for x in expected]
+            assert PowerTable.load(path, group.add, group.id).g == el_2
+
+            # Table too short for the order
+            short = CycGroup.from_generator(group, el_2, order, path)
+            short.g_table().rows = short.g_table().rows[:1]
+            short.g_table().save(path)
+            rebuilt = CycGroup.from_generator(group, el_2, order, path)
+            assert [rebuilt.scale(el_2, k) for k in ks] == [built.scale(x, 2) for x in expected]
+            assert len(PowerTable.load(path, group.add, group.id).rows) == len(built.g_table().rows)
+
+            os.remove(path)
+
+    def test_g_table_unusable_path(self):
+        import tempfile
+        import warnings
+        from Group import ModP, CycGroup
+
+        # A directory can neither be loaded nor written, the table stays in memory
+        group = CycGroup.from_generator(ModP(2 ** 127 - 1), 3, 2 ** 127 - 2, tempfile.mkdtemp())
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            assert group.scale(3, 12345) == pow(3, 12345, 2 ** 127 - 1)
+        assert len(caught) == 1
+        assert group.scale(3, 2 ** 100) == pow(3, 2 ** 100, 2 ** 127 - 1)
+
+
+class TestBatch(TestCase):
+    def test_add_many(self):
+        from random import Random
+        from Group import EGroup
+        curve = EGroup(p, a, b)
+        rand = Random(2)
+        pts1 = [curve.scale(g, rand.randrange(1, q)) for _ in range(10)] + [g, g, 'O', g]
+        pts2 = [curve.scale(g, rand.randrange(1, q)) for _ in range(10)] + [g, curve.inverse(g), g, 'O']
+
+        assert curve.add_many(pts1, pts2) == [curve.add(pt1, pt2) for pt1, pt2 in zip(pts1, pts2)]
+
+    def test_scale_many(self):
+        from random import Random
+        from Group import EGroup
+        curve = EGroup(p, a, b)
+        rand = Random(3)
+        pts = [curve.scale(g, rand.randrange(1, q)) for _ in range(8)]
+        ks = [rand.getrandbits(64) for _ in range(6)] + [0, q]
+
+        assert curve.scale_many(pts, ks) == [curve.scale(pt, k) for pt, k in zip(pts, ks)]
+
+
+class TestDiscLog(TestCase):
+    def test_kangaroo_modp(self):
+        from Group import ModP
+        group = ModP(2 ** 61 - 1)
+        x = 123456789
+        result = group.disc_log(100000000, 100000000 + 2 ** 28, 3, pow(3, x, 2 ** 61 - 1), seed=0)
+        assert result.x == x
+        assert result.steps > 0
+
+    def test_kangaroo_parallel(self):
+        from Group import EGroup
+        curve = EGroup(p, a, b)
+        x = 2 ** 20 + 4321
+        result = curve.disc_log(0, 2 ** 24, g, curve.scale(g, x), workers=2, seed=1)
+        assert result.x == x
+
+    def test_kangaroo_small_interval(self):
+        from Cryptopals_main import disc_log
+        assert disc_log(3, 10, 40, 101, pow(3, 17, 101)) == 17
+
+    def test_bsgs(self):
+        from Group import ModP, EGroup
+        group = ModP(2 ** 61 - 1)
+        result = group.bsgs(1000, 1000 + 10 ** 6, 3, pow(3, 654321, 2 ** 61 - 1))
+        assert result.x == 654321
+        assert result.method == 'bsgs'
+
+        # Smaller table, more giant steps
+        assert group.bsgs(1000, 1000 + 10 ** 6, 3, pow(3, 654321, 2 ** 61 - 1), max_table=100).x == 654321
+
+        curve = EGroup(p, a, b)
+        assert curve.bsgs(0, 10 ** 5, g, curve.scale(g, 99999)).x == 99999
+
+    def test_bsgs_curve_negatives(self):
+        from Group import EGroup
+        # Keys are x coordinates, shared by P and -P: every exponent must still be found
+        curve = EGroup(1009, 2, 3)
+        g = (0, 860)  # Order 267
+        for x in range(267):
+            assert curve.bsgs(0, 266, g, curve.scale(g, x)).x == x
+
+    def test_rho(self):
+        from Group import ModP
+        # 2 has prime order 1019 mod 2039
+        group = ModP(2039)
+        for x in [0, 1, 500, 1018]:
+            assert group.rho(2, pow(2, x, 2039), 1019, seed=x).x == x
+
+    def test_solve_dlog(self):
+        from Group import ModP, solve_dlog
+        group = ModP(2039)
+        y = pow(2, 777, 2039)
+        assert solve_dlog(group, 2, y, order=1019).method == 'bsgs'
+        assert solve_dlog(group, 2, y, order=1019, max_table=4).x == 777
+        assert solve_dlog(group, 2, y, order=1019, max_table=4).method == 'rho'
+        result = solve_dlog(group, 2, y, bounds=(0, 1018), max_table=4)
+        assert result.method == 'kangaroo' and result.x == 777
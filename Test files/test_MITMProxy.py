@@ -0,0 +1,94 @@
+from unittest import TestCase
+from challenge_57 import p, g, q
+
+
+class TestMITMProxy(TestCase):
+    def test_strategies(self):
+        import asyncio
+        from DHServer import DHServer, run_client
+        from Group import ModP, CycGroup
+        from MITMProxy import MITMProxy, STRATEGIES
+
+        group = CycGroup.from_generator(ModP(p), g, q)
+
+        async def main(strategy):
+            bob = DHServer(group, reply=b'Secret reply', workers=0)
+            bob_port = await bob.start(port=0)
+            cecily = MITMProxy(group, ('127.0.0.1', bob_port), strategy)
+            cecily_port = await cecily.start(port=0)
+
+            try:
+                replies = await asyncio.gather(*[run_client(group, '127.0.0.1', cecily_port, 3)
+                                                 for _ in range(4)])
+            finally:
+                await cecily.stop()
+                await bob.stop()
+
+            return replies, cecily
+
+        for strategy in STRATEGIES:
+            replies, cecily = asyncio.run(main(strategy))
+
+            # Alice and Bob notice nothing, Cecily reads every reply
+            assert all(reply == [b'Secret reply'] * 3 for reply in replies)
+            assert sorted(session for session, _ in cecily.intercepted) == sorted(list(range(4)) * 3)
+            assert all(plaintext == b'Secret reply' for _, plaintext in cecily.intercepted)
+            assert cecily.report()['sessions'] == 4
+            assert cecily.failed == 0
+
+    def test_upstream_down(self):
+        # Alice's connection is closed when Bob cannot be reached
+        import asyncio
+        import socket
+        from Group import ModP, CycGroup
+        from MITMProxy import MITMProxy, STRATEGIES
+
+        group = CycGroup.from_generator(ModP(p), g, q)
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            closed_port = sock.getsockname()[1]
+
+        async def main():
+            cecily = MITMProxy(group, ('127.0.0.1', closed_port), STRATEGIES['A->p'])
+            port = await cecily.start(port=0)
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                return await asyncio.wait_for(reader.read(), 5)
+            finally:
+                writer.close()
+                await cecily.stop()
+
+        assert asyncio.run(main()) == b''
+
+    def test_upstream_closed_after_stop(self):
+        # Once Alice ends the session, the connection to Bob is closed even if Bob keeps it open
+        import asyncio
+        from Framing import STOP, frame
+        from Group import ModP, CycGroup
+        from MITMProxy import MITMProxy, STRATEGIES
+
+        group = CycGroup.from_generator(ModP(p), g, q)
+
+        async def main():
+            upstream_closed = asyncio.Event()
+
+            async def bob(reader, writer):
+                # Reads until the proxy closes the connection, never closes it himself
+                await reader.read()
+                upstream_closed.set()
+                writer.close()
+
+            server = await asyncio.start_server(bob, '127.0.0.1', 0)
+            cecily = MITMProxy(group, ('127.0.0.1', server.sockets[0].getsockname()[1]), STRATEGIES['A->p'])
+            port = await cecily.start(port=0)
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                writer.write(frame(STOP))
+                await asyncio.wait_for(upstream_closed.wait(), 5)
+                return await asyncio.wait_for(reader.read(), 5)
+            finally:
+                writer.close()
+                await cecily.stop()
+                server.close()
+
+        assert asyncio.run(main()) == b''
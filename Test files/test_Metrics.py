@@ -0,0 +1,124 @@
+from unittest import TestCase
+
+
+class ListSink:
+    # Keeps whatever it is sent
+    def __init__(self):
+        self.records = []
+        self.snapshots = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def flush(self, snapshot):
+        self.snapshots.append(snapshot)
+
+
+class TestPercentile(TestCase):
+    def test_nearest_rank(self):
+        from Metrics import percentile
+        assert percentile([], 50) is None
+        assert percentile([2, 1], 50) == 1
+        assert percentile([5, 4, 3, 2, 1], 50) == 3
+        assert percentile([5, 4, 3, 2, 1], 90) == 5
+        assert percentile(list(range(1, 101)), 99) == 99
+
+
+class TestRegistry(TestCase):
+    def test_disabled(self):
+        from Metrics import Registry
+        registry = Registry()
+        sink = ListSink()
+        registry.sinks.append(sink)
+
+        @registry.timed('fun')
+        def fun(x):
+            return 2 * x
+
+        registry.count('calls', 3)
+        registry.mark('ops', 10, 1.0)
+        with registry.timing('phase'):
+            pass
+        assert fun(2) == 4
+        registry.event('found', x=1)
+
+        assert registry.snapshot() == {'counters': {}, 'timers': {}, 'meters': {}}
+        assert sink.records == []
+
+    def test_enabled(self):
+        from Metrics import Registry
+        registry = Registry()
+        sink = ListSink()
+        registry.enable(sink)
+
+        @registry.timed('fun')
+        def fun(x):
+            return 2 * x
+
+        registry.count('calls', 3)
+        registry.count('calls')
+        registry.mark('ops', 10, 2.0)
+        with registry.timing('phase'):
+            pass
+        assert fun(2) == 4 and fun(3) == 6
+
+        snapshot = registry.flush()
+        assert snapshot['counters'] == {'calls': 4}
+        assert snapshot['meters']['ops']['per_sec'] == 5.0
+        assert snapshot['timers']['phase']['count'] == 1
+        assert snapshot['timers']['fun']['count'] == 2
+        assert [record['event'] for record in sink.records] == ['phase']
+        assert sink.snapshots == [snapshot]
+
+    def test_sinks(self):
+        import io
+        import json
+        from Metrics import Registry, JSONLinesSink, PrometheusSink
+        registry = Registry()
+        lines = io.StringIO()
+        prometheus = PrometheusSink()
+        registry.enable(JSONLinesSink(lines), prometheus)
+
+        registry.count('oracle.calls', 7)
+        registry.record('det_oracle.solve_clean', 0.5)
+        registry.mark('dlog.kangaroo.steps', 1000, 0.25)
+        registry.event('det_oracle.block_size', block_size=16)
+        registry.flush()
+
+        records = [json.loads(line) for line in lines.getvalue().splitlines()]
+        assert records[0]['event'] == 'det_oracle.block_size' and records[0]['block_size'] == 16
+        assert records[1]['event'] == 'snapshot' and records[1]['counters'] == {'oracle.calls': 7}
+
+        assert 'cryptopals_oracle_calls_total 7' in prometheus.text
+        assert 'cryptopals_det_oracle_solve_clean_seconds_count 1' in prometheus.text
+        assert 'cryptopals_dlog_kangaroo_steps_per_second 4000.0' in prometheus.text
+
+    def test_instrumented(self):
+        import Metrics
+        from Group import ModP
+
+        sink = ListSink()
+        Metrics.enable(sink)
+        try:
+            p = 2 ** 127 - 1
+            assert ModP(p).disc_log(0, 2 ** 16, 3, pow(3, 12345, p), seed=0).x == 12345
+            snapshot = Metrics.snapshot()
+        finally:
+            Metrics.disable()
+            Metrics.REGISTRY.sinks.remove(sink)
+            Metrics.REGISTRY.reset()
+
+        assert snapshot['meters']['dlog.kangaroo.steps']['count'] > 0
+        assert snapshot['timers']['dlog.kangaroo.setup']['count'] == 1
+        assert sink.records[-1]['event'] == 'dlog.kangaroo' and sink.records[-1]['found']
+
+    def test_env_switch(self):
+        # CRYPTOPALS_METRICS alone is enough for events to be printed
+        import os
+        import subprocess
+        import sys
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        stderr = subprocess.run([sys.executable, '-c', "import Metrics; Metrics.event('found', x=1)"], cwd=root,
+                                env={**os.environ, 'CRYPTOPALS_METRICS': '1'}, capture_output=True, text=True,
+                                check=True).stderr
+        assert 'found x=1' in stderr
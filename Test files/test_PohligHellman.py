@@ -0,0 +1,70 @@
+from unittest import TestCase
+from challenge_57 import p, g, q
+
+
+class TestSmallSubgroup(TestCase):
+    def test_key_mod(self):
+        from DH import DHAttacker, DHReceiver
+        from Group import ModP, CycGroup
+        from PohligHellman import subgroup_element
+
+        group = CycGroup.from_generator(ModP(p), g, q)
+        bob = DHReceiver(group)
+        eve = DHAttacker(group)
+
+        for factor in [5, 109, 7963]:
+            # Bob replies under the key derived from h**b
+            h = subgroup_element(ModP(p), p - 1, factor)
+            assert pow(h, factor, p) == 1
+
+            bob.A = h
+            bob.s = bob.gen_s()
+            bob.key = bob.gen_key()
+            eve.rec_msg = bob.add_hmac(b'Crazy flamboyant for the rap enjoyment')
+
+            assert eve.key_mod(h, factor) == bob.b % factor
+
+    def test_search_residue(self):
+        from DH import DHReceiver, MacTest
+        from Group import ModP, CycGroup
+        from PohligHellman import subgroup_element, search_residue
+
+        group = CycGroup.from_generator(ModP(p), g, q)
+        bob = DHReceiver(group)
+
+        factor = 7963
+        h = subgroup_element(ModP(p), p - 1, factor)
+        bob.A = h
+        bob.s = bob.gen_s()
+        bob.key = bob.gen_key()
+        test = MacTest(bob.add_hmac(b'Crazy flamboyant for the rap enjoyment'))
+
+        for workers in [1, 2]:
+            search = search_residue(group, h, factor, test, workers=workers, chunk_size=1000)
+            assert search.residue == bob.b % factor
+            assert search.candidates >= search.residue % 1000 + 1
+            assert search.rate > 0
+
+    def test_search_residue_early_exit(self):
+        import operator
+        import time
+        from functools import partial
+        from Group import ModP
+        from PohligHellman import search_residue
+
+        # The residue is in the first chunk, the other worker must give up its chunk of a million
+        modulus = 2 ** 127 - 1
+        start = time.perf_counter()
+        search = search_residue(ModP(modulus), 3, 4 * 10 ** 6, partial(operator.eq, pow(3, 5, modulus)),
+                                workers=2, chunk_size=10 ** 6)
+        assert search.residue == 5
+        assert time.perf_counter() - start < 1
+
+    def test_pohlig_hellman(self):
+        from Group import ModP
+        from PohligHellman import pohlig_hellman
+
+        # 6 generates the multiplicative group mod 8101, of order 8100 = 4 * 81 * 25
+        x, n = pohlig_hellman(ModP(8101), 6, pow(6, 6001, 8101), 8100, [4, 81, 25])
+        assert (x, n) == (6001, 8100)
+        assert pohlig_hellman(ModP(8101), 6, pow(6, 6001, 8101), 8100, [4, 81, 25], workers=2) == (6001, 8100)
@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+
+class TestEntropyPool(TestCase):
+    def test_bytes(self):
+        from Randomness import EntropyPool
+        pool = EntropyPool(size=64)
+        draws = [pool.bytes(n) for n in [0, 1, 16, 63, 16, 64, 1000]]
+        assert [len(draw) for draw in draws] == [0, 1, 16, 63, 16, 64, 1000]
+        assert pool.refills == 3  # For 1, 63 and 16 bytes, 64 and 1000 bytes are read directly
+        assert pool.bytes(16) != pool.bytes(16)
+
+    def test_seeded(self):
+        from Randomness import EntropyPool
+        pool1, pool2 = EntropyPool(size=64, seed=5), EntropyPool(size=64, seed=5)
+        assert [pool1.bytes(n) for n in [3, 100, 40, 40]] == [pool2.bytes(n) for n in [3, 100, 40, 40]]
+        assert pool1.seeded
+
+        pool1.seed()
+        assert not pool1.seeded
+        assert pool1.bytes(16) != pool2.bytes(16)
+
+    def test_randint(self):
+        from Randomness import EntropyPool
+        pool = EntropyPool(seed=0)
+        draws = [pool.randint(3, 8) for _ in range(600)]
+        assert set(draws) == {3, 4, 5, 6, 7, 8}
+        assert pool.randint(7, 7) == 7
+        assert 0 <= pool.randbelow(2 ** 127 - 1) < 2 ** 127 - 1
+        with self.assertRaises(ValueError):
+            pool.randbelow(0)
+
+    def test_rand_bytes(self):
+        import Randomness
+        from Cryptopals_main import rand_bytes
+        Randomness.seed(1)
+        try:
+            first = rand_bytes(16)
+            Randomness.seed(1)
+            assert rand_bytes(16) == first
+        finally:
+            Randomness.seed()
@@ -9,3 +9,48 @@ class TestSHA1(TestCase):
 
         assert sha_1(b"Fallait-il que vous m'assassinassiez ?") == \
                b'\xd2\xe6\x18\x86\xef\x6d\xe5\x9d\x58\xe1\x28\xdc\xca\x1d\x20\x18\xcb\x7a\x6a\x38'
+
+    def test_extend(self):
+        from SHA_1 import sha_1, pad, extend
+        key = b'clef anglaise'
+        msg = b'comment1=cooking%20MCs;userdata=foo'
+        padded = pad(key + msg)
+        assert extend(sha_1(key + msg), b';admin=true', len(padded)) == sha_1(padded + b';admin=true')
+
+    def test_forge_extensions(self):
+        from SHA_1 import sha_1, forge_extensions, find_forgery
+        key = b'clef anglaise'
+        msg = b'comment1=cooking%20MCs;userdata=foo'
+        candidates = forge_extensions(sha_1(key + msg), msg, b';admin=true', range(20))
+        assert len(candidates) == 20
+
+        forged_msg, forged_mac = candidates[len(key)]
+        assert forged_msg.endswith(b';admin=true')
+        assert sha_1(key + forged_msg) == forged_mac
+
+        assert find_forgery(candidates, lambda m, mac: sha_1(key + m) == mac) == candidates[len(key)]
+
+    def test_find_forgery_early_exit(self):
+        # Oracle calls queued behind an accepted candidate are never made
+        import time
+        from SHA_1 import find_forgery
+        calls = []
+
+        def oracle(msg, mac):
+            calls.append(msg)
+            time.sleep(0.02)
+            return msg == b'1'
+
+        candidates = [(str(i).encode(), b'') for i in range(200)]
+        start = time.perf_counter()
+        assert find_forgery(candidates, oracle, workers=4) == (b'1', b'')
+        assert time.perf_counter() - start < 1  # 200 calls would take at least 1s
+        time.sleep(0.1)
+        assert len(calls) < 20
+
+    def test_gen_hmac(self):
+        from SHA_1 import hmac, gen_hmac
+        key = b'clef anglaise'
+        keyed_hmac = gen_hmac(key, 'hex')
+        for msg in [b'', b'test_file', b'A' * 100]:
+            assert keyed_hmac(msg) == hmac(key, msg, 'hex')
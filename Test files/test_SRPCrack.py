@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+
+def login(password: bytes):
+    # Simplified SRP login of a client to a fake server, returns the server and the client's HMAC
+    from DH import SimpleServer, SimpleClient
+
+    client = SimpleClient(b'foo@bar', password)
+    server = SimpleServer(b'foo@bar', b'')
+    server.A = client.A
+    client.salt, client.B, client.u = server.salt, server.B, server.u
+    client.K = client.gen_K()
+
+    return server, client.gen_h()
+
+
+class TestSimpleSRP(TestCase):
+    def test_login(self):
+        from DH import SimpleServer, SimpleClient
+
+        client = SimpleClient(b'foo@bar', b'hunter2')
+        server = SimpleServer(b'foo@bar', b'hunter2')
+        server.A = client.A
+        client.salt, client.B, client.u = server.salt, server.B, server.u
+        client.K, server.K = client.gen_K(), server.gen_K()
+
+        assert client.gen_h() == server.gen_h()
+
+    def test_keys(self):
+        from DH import SimpleServer
+
+        # B is taken from the given pair (b, g**b), not computed again from b
+        server = SimpleServer(b'foo@bar', b'hunter2', keys=(5, 7), p=1009)
+        assert server.B == 7
+
+
+class TestDictionaryAttack(TestCase):
+    def test_crack(self):
+        from SRPCrack import DictionaryAttack
+
+        words = [f'word{i}'.encode() for i in range(100)]
+        server, client_hmac = login(b'word57')
+
+        attack = DictionaryAttack.from_server(server, client_hmac, workers=1, chunk_size=16)
+        result = attack.crack([words[i:i + 16] for i in range(0, 100, 16)])
+        assert result.password == b'word57'
+        assert result.guesses == 58
+
+        # Not in the wordlist
+        result = attack.crack([words[:50]])
+        assert result.password is None
+        assert result.guesses == 50
+
+    def test_crack_file(self):
+        import os
+        import tempfile
+        from SRPCrack import DictionaryAttack
+
+        server, client_hmac = login(b'word77')
+        with tempfile.NamedTemporaryFile('wb', suffix='.txt', delete=False) as f:
+            f.write(b'\r\n'.join(f'word{i}'.encode() for i in range(200)))
+
+        try:
+            attack = DictionaryAttack.from_server(server, client_hmac, workers=2, chunk_size=8)
+            result = attack.crack_file(f.name)
+            assert result.password == b'word77'
+            assert 78 <= result.guesses <= 200
+            assert result.rate > 0
+        finally:
+            os.remove(f.name)
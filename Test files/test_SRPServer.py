@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+users = [(b'foo@bar', b'bazquxquux'), (b'alice@bar', b'hunter2'), (b'bob@bar', b'correct horse')]
+
+
+class TestVerifierStore(TestCase):
+    def test_get(self):
+        import os
+        import tempfile
+        from DH import Server
+        from SRPServer import VerifierStore
+
+        path = os.path.join(tempfile.mkdtemp(), 'verifiers.bin')
+        with VerifierStore.build(path, users) as store:
+            assert store._index is None  # Nothing read until the first lookup
+            assert len(store) == 3
+            assert b'eve@bar' not in store
+
+            salt, v = store.get(b'alice@bar')
+            assert v == Server(b'alice@bar', b'hunter2', salt=salt).v
+
+            # Changed password
+            store.add(b'alice@bar', b'hunter3')
+            salt, v = store.get(b'alice@bar')
+            assert v == Server(b'alice@bar', b'hunter3', salt=salt).v
+            assert len(store) == 3
+
+        os.remove(path)
+
+
+class TestSRPServer(TestCase):
+    def test_logins(self):
+        import asyncio
+        import os
+        import tempfile
+        from DH import Client
+        from Framing import read_frame, write_frames, encode_element
+        from SRPServer import VerifierStore, SRPServer, run_login
+
+        path = os.path.join(tempfile.mkdtemp(), 'verifiers.bin')
+        VerifierStore.build(path, users)
+
+        async def drop(port):
+            # Leaves once it has salt and B, before sending its HMAC
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            client = Client(*users[0])
+            write_frames(writer, client.E, encode_element(client.A))
+            await read_frame(reader)
+            await read_frame(reader)
+            writer.close()
+
+        async def main():
+            server = SRPServer(VerifierStore(path), pool_size=4, workers=0)
+            port = await server.start(port=0)
+            await drop(port)
+
+            results = await asyncio.gather(*[run_login('127.0.0.1', port, *user) for user in users * 2],
+                                           run_login('127.0.0.1', port, b'foo@bar', b'wrong'),
+                                           run_login('127.0.0.1', port, b'eve@bar', b'bazquxquux'))
+            await server.stop()
+
+            return results, server.report()
+
+        results, report = asyncio.run(main())
+        assert results == [True] * 6 + [False, False]
+        assert report['logins'] == 6
+        assert report['failed'] == 2
+        assert report['login']['count'] == 7  # Unknown email is turned away before B
+
+        os.remove(path)
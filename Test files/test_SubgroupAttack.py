@@ -0,0 +1,52 @@
+from unittest import TestCase
+from challenge_57 import p, g, q
+
+
+def serve_bob(bob, channel):
+    # Bob_8-1.py: answers each A with B and a reply under the key derived from A**b, until STOP
+    from Framing import STOP, decode_element
+
+    while True:
+        data_A = channel.recv()
+        if data_A == STOP:
+            break
+
+        bob.A = decode_element(data_A)
+        channel.send_element(bob.B)
+        bob.s = bob.gen_s()
+        bob.iv = channel.recv()
+        bob.key = bob.gen_key()
+        bob.send_encrypted(channel, b'Crazy flamboyant for the rap enjoyment', mac=True)
+
+
+class TestSmallSubgroupAttack(TestCase):
+    def test_run(self):
+        import socket
+        import threading
+        from DH import DHAttacker, DHReceiver
+        from Framing import Channel, STOP
+        from Group import ModP, CycGroup
+        from SubgroupAttack import SmallSubgroupAttack
+
+        group = CycGroup.from_generator(ModP(p), g, q)
+        bob = DHReceiver(group)
+        eve = DHAttacker(group)
+
+        factors = [2, 5, 109, 7963]
+        attack = SmallSubgroupAttack(eve, p - 1, factors, workers=2)
+
+        a, b = socket.socketpair()
+        with a, b:
+            bob_thread = threading.Thread(target=serve_bob, args=(bob, Channel(b)))
+            bob_thread.start()
+
+            channel = Channel(a)
+            x, n = attack.run(channel)
+            channel.send(STOP)
+            bob_thread.join()
+
+        assert n == 2 * 5 * 109 * 7963
+        assert x == bob.b % n
+        assert (eve.part_key, eve.part_key_mod) == (x, n)
+        assert eve.pub_key == bob.B
+        assert sorted(attack.searches) == factors
@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+
+class TestTimingAttack(TestCase):
+    def test_recover(self):
+        # Simulated server: each correct leading character adds a delay, plus noise
+        from random import Random
+        from TimingAttack import TimingAttack
+
+        target = '3f2a9c'
+        noise = Random(0)
+
+        def query(signature):
+            n_correct = 0
+            for a, b in zip(signature, target):
+                if a != b:
+                    break
+                n_correct += 1
+
+            return n_correct * 5e-3 + noise.gauss(0, 1e-3)
+
+        attack = TimingAttack(query, sig_len=len(target), seed=1)
+        assert attack.recover() == target
+        assert len(attack.requests_per_char) == len(target)
+        assert all(n % 16 == 0 for n in attack.requests_per_char)
+
+    def test_recover_concurrent(self):
+        # Candidates of a round measured from 4 threads, each correct leading character adds a delay
+        import time
+        from TimingAttack import TimingAttack
+
+        target = '9c'
+
+        def query(signature):
+            n_correct = 0
+            for a, b in zip(signature, target):
+                if a != b:
+                    break
+                n_correct += 1
+
+            start = time.perf_counter()
+            time.sleep(1e-3 + n_correct * 4e-3)
+            return time.perf_counter() - start
+
+        attack = TimingAttack(query, sig_len=len(target), seed=1, workers=4)
+        assert attack.recover() == target
+
+    def test_zero_spread(self):
+        # Identical samples do not make a gap below the timer resolution significant
+        from TimingAttack import TimingAttack, TIMER_RESOLUTION
+
+        attack = TimingAttack(lambda signature: 0.0)
+        times = {'a': [1.0] * 5, 'b': [1.0 - TIMER_RESOLUTION / 10] * 5}
+        assert attack.significant(times) is None
+        times['b'] = [0.5] * 5
+        assert attack.significant(times) == 'a'
+
+    def test_trimmed_mean(self):
+        from TimingAttack import trimmed_mean
+        assert trimmed_mean([1, 2, 3, 4, 100, 0, 2, 3, 3, 2], 0.1) == 2.5
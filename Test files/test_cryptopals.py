@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+
+class TestRunner(TestCase):
+    def test_select(self):
+        from cryptopals import discover, select
+        challenges = discover()
+        assert list(challenges)[:2] == ['1-1', '1-2']
+        assert list(challenges).index('2-10') > list(challenges).index('1-8')
+
+        assert '4-31' not in select(challenges)  # Needs the HMAC server
+        assert list(select(challenges, ['3-18', '1'])) == ['1-1', '1-2', '1-3', '1-4', '1-5', '1-6', '1-7', '1-8',
+                                                           '3-18']
+        with self.assertRaises(ValueError):
+            select(challenges, ['9-99'])
+
+    def test_run(self):
+        import os
+        import tempfile
+        from cryptopals import discover, run
+        directory = tempfile.mkdtemp()
+        scripts = {'fail': 'assert 1 == 2\n', 'timeout': 'import time\ntime.sleep(10)\n'}
+        challenges = {'2-10': discover()['2-10']}  # Reads Challenge_2-10.txt
+        for name, script in scripts.items():
+            challenges[name] = os.path.join(directory, f'{name}.py')
+            with open(challenges[name], 'w') as f:
+                f.write(script)
+
+        results = dict(run(challenges, workers=2, timeout=2.0))
+        assert {c: result['status'] for c, result in results.items()} == \
+               {'2-10': 'pass', 'fail': 'fail', 'timeout': 'timeout'}
+        assert "I'm back and I'm ringin' the bell" in results['2-10']['output']
+        assert results['fail']['error'] == 'AssertionError'
+        if results['2-10']['peak_rss'] is not None:
+            assert results['2-10']['peak_rss'] > 2 ** 20
+
+    def test_run_without_max_tasks_per_child(self):
+        import sys
+        from unittest import mock
+        from cryptopals import discover, run
+
+        # Before Python 3.11 each challenge gets a pool of its own
+        challenges = {c: discover()[c] for c in ['1-1', '2-10']}
+        with mock.patch.object(sys, 'version_info', (3, 10)):
+            results = dict(run(challenges, workers=2))
+        assert {c: result['status'] for c, result in results.items()} == {'1-1': 'pass', '2-10': 'pass'}
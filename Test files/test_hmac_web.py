@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+
+def hmac_web():
+    # hmac_web.py sits with the challenge 4 scripts
+    import os
+    import sys
+    directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Cryptopals_challenges_Ch4')
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+    import hmac_web
+    return hmac_web
+
+
+class TestApp(TestCase):
+    def test_signatures(self):
+        from SHA_1 import gen_hmac
+        app = hmac_web().create_app(b'clef anglaise', delay=0)
+        client = app.test_client()
+        signature = gen_hmac(b'clef anglaise', 'hex')(b'foo')
+
+        assert client.get(f'/test?file=foo&signature={signature}').text == 'Success'
+        assert client.get(f'/test?file=foo&signature={signature}').text == 'Success'
+        assert client.get('/test?file=foo&signature=' + '0' * 40).text.startswith('Failure')
+        assert app.expected_hmac.cache_info().hits == 2
+        assert app.expected_hmac.cache_info().misses == 1
+
+        # Missing parameters
+        assert client.get(f'/test?signature={signature}').status_code == 400
+        assert client.get('/test?file=foo').status_code == 400
+
+    def test_metrics(self):
+        app = hmac_web().create_app(b'clef anglaise', delay=0)
+        client = app.test_client()
+        for i in range(5):
+            client.get(f'/test?file=foo{i}&signature=00')
+            client.get(f'/made/up/{i}')
+
+        metrics = client.get('/metrics').get_json()
+        assert {rule: entry['count'] for rule, entry in metrics.items()} == {'/test': 5, '<unmatched>': 5}
@@ -0,0 +1,157 @@
+"""
+Timing attack on a character-at-a-time signature comparison with early exit
+See challenges 4-31 and 4-32, and the server in hmac_web.py
+
+Candidates for the next character are interleaved within each round of sampling,
+so that any drift in the server's response time affects all candidates equally.
+With workers > 1 the candidates of a round are measured concurrently, from a pool of threads.
+Rounds are repeated until one candidate is significantly slower than all others.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+from statistics import median
+
+# Statistics
+def trimmed_mean(samples, trim=0.1):
+    # Mean of samples, discarding the proportion trim of highest and lowest values
+    samples = sorted(samples)
+    n_cut = int(len(samples) * trim)
+    kept = samples[n_cut:len(samples) - n_cut]
+
+    return sum(kept) / len(kept)
+
+def spread(samples):
+    # Robust estimate of the standard deviation of samples, using the median absolute deviation
+    centre = median(samples)
+    return 1.4826 * median([abs(x - centre) for x in samples])
+
+# Smallest spread assumed in significance tests: identical samples only mean the timer cannot tell them apart
+TIMER_RESOLUTION = time.get_clock_info('perf_counter').resolution
+
+def gen_http_query(url: str, file: str, session=None) -> callable:
+    # Returns a function timing a request to url for file and a given signature
+    # Keep-alive sessions are used so that each request does not open a new connection:
+    # session if given, otherwise one per thread, as a requests.Session is not thread safe
+    import requests
+
+    local = threading.local()
+
+    def get_session():
+        if session is not None:
+            return session
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def query(signature: str):
+        # Returns the time taken by the server to answer for signature
+        s = get_session()
+        start = time.perf_counter()
+        s.get(url, params={'file': file, 'signature': signature}).content
+        return time.perf_counter() - start
+
+    return query
+
+class TimingAttack:
+    """Recovers a signature one character at a time from the response time of a server
+
+    Attributes
+    ----------
+    requests_per_char: list of int
+        Number of queries used to recover each character of the signature
+
+    Parameters
+    ----------
+    query: callable
+        Takes a signature (str), returns the time taken to check it
+    sig_len: int
+        Length of the signature, 40 hex characters for a SHA-1 HMAC
+    alphabet: str
+        Characters the signature is made of
+    stat: str
+        'median' or 'trimmed' (trimmed mean), statistic used to compare candidates
+    min_rounds: int
+        Number of rounds taken before considering stopping
+    max_rounds: int
+        Greatest number of rounds for a single character
+    confidence: float
+        The slowest candidate is accepted once it is ahead of the second slowest by
+        confidence times the standard error of the difference
+    seed: int, optional
+        Seed for the order in which candidates are interleaved
+    workers: int
+        Number of threads the candidates of a round are measured by, query must then be thread safe
+    """
+    def __init__(self, query: callable, sig_len=40, alphabet='0123456789abcdef', stat='median',
+                 min_rounds=5, max_rounds=50, confidence=4.0, seed=None, workers=1):
+        if stat == 'median':
+            self.stat = median
+        elif stat == 'trimmed':
+            self.stat = trimmed_mean
+        else:
+            raise Exception('Unknown statistic')
+
+        self.query = query
+        self.sig_len = sig_len
+        self.alphabet = alphabet
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.confidence = confidence
+        self.rand = Random(seed)
+        self.workers = workers
+        self.requests_per_char = []
+
+    def significant(self, times: dict):
+        # Returns the candidate that is significantly slower than all others, or None
+        # Spreads are floored at the timer resolution, so that a gap between two constant series
+        # is not taken as infinitely significant
+        ranked = sorted(times, key=lambda c: self.stat(times[c]), reverse=True)
+        best, second = ranked[0], ranked[1]
+        n = len(times[best])
+
+        gap = self.stat(times[best]) - self.stat(times[second])
+        spreads = [max(spread(times[c]), TIMER_RESOLUTION) for c in (best, second)]
+        std_err = ((spreads[0] ** 2 + spreads[1] ** 2) / n) ** 0.5
+
+        return best if gap > self.confidence * std_err else None
+
+    def next_char(self, prefix: str):
+        # Returns the character following prefix in the signature, and the number of queries used
+        times = {c: [] for c in self.alphabet}
+        candidates = list(self.alphabet)
+
+        # With a single worker, candidates are measured one after another
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for n_round in range(1, self.max_rounds + 1):
+                # Interleave candidates in a new order each round to cancel drift
+                self.rand.shuffle(candidates)
+                round_times = pool.map(self.query, [prefix + c for c in candidates])
+                for c, t in zip(candidates, round_times):
+                    times[c].append(t)
+
+                if n_round >= self.min_rounds:
+                    found = self.significant(times)
+                    if found is not None:
+                        return found, n_round * len(candidates)
+
+        # Out of rounds, settle for the slowest candidate
+        best = max(times, key=lambda c: self.stat(times[c]))
+        return best, self.max_rounds * len(candidates)
+
+    def recover(self, verbose=False):
+        # Returns the signature, recovered one character at a time
+        sig = ''
+        self.requests_per_char = []
+
+        for k in range(self.sig_len):
+            c, n_requests = self.next_char(sig)
+            sig += c
+            self.requests_per_char.append(n_requests)
+
+            if verbose:
+                print(f'{k + 1}/{self.sig_len}: {sig} ({n_requests} requests)')
+
+        return sig
@@ -0,0 +1,259 @@
+"""
+Repeating key and stream XOR ciphers, with the text tests used to break them
+@author: Lawrence Arscott
+"""
+
+##
+import math
+import time
+from collections.abc import Generator  # For generator type hinting
+
+# My files
+from EasyByte import EasyByte
+from ByteUtils import xorbytes, str_split
+import Metrics
+
+# Tests
+def count_special_character(string):
+    # Returns the number of special characters in a string
+    # (Does not count spaces)
+    special_char = 0
+
+    for i in range(0, len(string)):
+        ch = string[i]
+        if not ch.isalpha() and not ch.isdigit() and ch != ' ':
+            special_char += 1
+
+    return special_char
+
+def simple_space_test(ans: str, freq=10):
+    # Tests whether the number of spaces in the answer is plausible
+    n = len(ans)//freq  # For every freq characters, require a space
+    return ans.count(' ') >= n
+
+def simple_ch_test(ans: str, freq=7):
+    # Tests whether string has too many special characters
+    n = len(ans)//freq + 1
+    return count_special_character(ans) < n
+
+# Classes
+class VCode:
+    """Class for the manipulation of messages encoded with a Vigenère cipher
+
+    Attributes
+    ----------
+    easybyte : EasyByte
+        See class EasyByte
+
+    Parameters
+    ----------
+    code : str or .txt file
+        Message. May be passed as a .txt file
+        May be plain text or encrypted
+        Purpose of the class is to then encrypt or decrypt 'code'
+    base : str, optional
+        Base in which the code is encoded.
+        If not given, it is assumed the code is in byte format.
+        May otherwise be 'text' for text, 'hex' for hexadecimal or 'b64' for base64
+        """
+    def __init__(self, code, base=None):
+        self.easybyte = EasyByte(code, base)
+        self.key = None
+        self.keys = None
+        self.key_poss = None
+
+    def gen_keys(self, space_test=True, char_test=True, keys=None):
+        # Given a list of keys, assigns those that pass tests to self.keys
+        self.keys = VCode.test_keys(self, keys, space_test, char_test)
+        return self
+
+    def use_keys(self):
+        # Prints byte decrypted against all keys in self.keys as text
+        for key in self.keys:
+            print(self.easybyte.xor(key).convert('text'))
+
+    def single_byte_keys(self, space_test=True, char_test=True):
+        # Assigns plausible single byte keys to self.keys
+        keys = [int(i).to_bytes(1, byteorder='big') for i in range(256)]
+        self.keys = self.test_keys(keys, space_test, char_test)
+        return self
+
+    def test_keys(self, keys, space_test=True, char_test=True):
+        # Given a list of keys, returns a list of those which pass all tests
+        passed = []
+        for key in keys:
+            try:
+                s = self.easybyte.xor(key).convert('text')
+
+                # Check whether answer passes tests before yielding
+                if not space_test or simple_space_test(s):
+                    if not char_test or simple_ch_test(s):
+                        passed.append(key)
+
+            except ValueError:  # Sometimes there is no corresponding ASCII unicode character
+                pass
+
+        return passed
+
+    def key_length(self, m=1, n=40):
+        # Prints a score for each key length
+        # Low score is more plausible
+        for i in range(1, n):
+            ham = 0
+
+            for k in range(m):
+                indent = 2 * k * i
+                chunk1 = EasyByte(self.easybyte.b[indent:indent + i])
+                chunk2 = EasyByte(self.easybyte.b[indent + i: indent + 2 * i])
+                assert len(chunk1.b) == len(chunk2.b)
+
+                ham += chunk1.hamming(chunk2.b)
+
+            print(str(i) + ' has score ' + str(ham / i / m))
+
+    def split(self, key_l: int):
+        # Divides the message into strips according to the key length,
+        # so as to obtain key_l single byte encoded strips
+        return [VCode(byte_i) for byte_i in str_split(self.easybyte.b, key_l)]
+
+    def find_v_key(self, key_l):
+        # Given a key length, assigns plausible Vigenère keys of that length
+        # to self.key_poss
+        start = time.perf_counter()
+        strips = self.split(key_l)
+        keys_by_strip = []
+
+        for strip in strips:
+            keys_by_strip.append(strip.single_byte_keys(True, True).keys)
+
+        self.key_poss = keys_by_strip  # Record possibilities
+        seconds = time.perf_counter() - start
+        Metrics.record('vcode.find_v_key', seconds)
+        Metrics.mark('vcode.single_byte_keys', 256 * key_l, seconds)  # Keys tested
+
+        # Analysis of possibilities
+        if Metrics.REGISTRY.enabled:
+            Metrics.event('vcode.find_v_key', key_length=key_l, seconds=seconds,
+                          possibilities=math.prod([len(keys) for keys in keys_by_strip]),
+                          single_possibility=sum([1 if len(lst) == 1 else 0 for lst in keys_by_strip]))
+
+        return self
+
+    def keys_from_poss(self):
+        # From self.key_poss, which contains possibilities for each byte of the key,
+        # assigns possible keys to self.keys, or if only 1 possible key, assigns to self.key
+        keys = [sing_byte for sing_byte in self.key_poss[0]]
+        for i in range(1, len(self.key_poss)):
+            keys = [old_key + new_byte for old_key in keys for new_byte in self.key_poss[i]]
+
+        if len(keys) > 1:
+            print('Several keys.')
+            self.keys = keys
+
+        if len(keys) == 1:
+            print('Only 1 key !')
+            self.key = keys[0]
+
+        else:
+            raise Exception("Error: no keys ?")
+
+    def solve(self):
+        # Prints code decyphered according to self.key
+        print(self.easybyte.xor(self.key).convert('text'))
+
+    def freq(self):
+        # Returns the frequency of each byte in the encoded message
+        freqs = [0]*256
+        for byt in self.easybyte.b:
+            # Each byt is an integer representing ord(byte)
+            freqs[byt] += 1
+
+        return freqs
+
+    def simple_freq_test(self, lb_max_freq=10):
+        # Simple frequency test to detect Vigenère ciphers
+        # Expects most common byte to appear once in every lb_max_freq bytes
+        # You would expect a fair amount of spaces, for example
+        freqs = self.freq()
+
+        return max(freqs) > len(self.easybyte.b) / lb_max_freq
+
+class ListVCode:
+    """Class to deal with multiple messages, passed as lines in a .txt file
+
+    Attributes
+    ----------
+    codes : list of VCode
+        See class VCode
+
+    Parameters
+    ----------
+    code_file : .txt file
+        Message, passed as a .txt file
+    base : str, optional
+        Base in which the code is encoded.
+        If not given, it is assumed the code is in byte format.
+        May otherwise be 'text' for text, 'hex' for hexadecimal or 'b64' for base64
+    """
+    def __init__(self, code_file, base=None):
+        with open(code_file) as file:
+            self.codes = [VCode(line, base) for line in file]
+
+    def detect_single_byte(self):
+        # Prints the line number of codes possibly encrypted with a single byte repeating key
+        # Decrypts those lines
+        for i in range(len(self.codes)):
+            code = self.codes[i]
+
+            # Run code through simple singly byte key detection
+            if code.simple_freq_test():
+                print(i)
+
+                # If passes, then decrypt
+                code = code.single_byte_keys()
+                code.use_keys()
+
+    def truncate_and_join(self):
+        # Truncates each byte string to the length of the shortest one
+        # Joins byte strings up to single line and returns as VCode
+        full_text = [code.easybyte.b for code in self.codes]  # List of lines as bytes
+        min_len = min([len(line) for line in full_text])  # Find length of shortest line
+        sngl_line = b''.join([line[:min_len] for line in full_text])  # Truncate and join
+        print(f'The shortest line has length {min_len}.')  # Print length of shortest line
+
+        return VCode(sngl_line)
+
+def zero_bytes_y():
+    # Infinitely yields b'0'
+    while True:
+        yield b'0'
+
+class StreamCipher:
+    """Class for encoding/decoding of stream ciphers
+
+    Attributes
+    ----------
+    stream : Generator[bytes, None, None]
+        Generates the stream against which plaintext will be XORed
+
+    Parameters
+    ----------
+    """
+    def __init__(self, code=b'', base=None, stream=zero_bytes_y):
+        self.easybyte = EasyByte(code, base)
+        # noinspection PyTypeChecker
+        self.stream = stream
+
+    def encode(self):
+        # XOR's self.easybyte.b against the byte stream generated by self.stream
+        # Note this irreversibly unwinds the generator self.stream
+
+        encoded = b''
+
+        # XOR bytes in the code with those yielded by the stream one at a time
+        for i in range(len(self.easybyte.b)):
+            # noinspection PyTypeChecker
+            xor_byte = next(self.stream)
+            encoded += xorbytes(self.easybyte.b[i:i + 1], xor_byte)
+
+        return encoded
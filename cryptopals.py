@@ -0,0 +1,206 @@
+"""
+Runs the challenge scripts and reports wall time, peak RSS and pass/fail for each:
+    python cryptopals.py                        # Every challenge
+    python cryptopals.py 1 3-18                 # Chapter 1 and challenge 3-18
+    python cryptopals.py --json runs.json       # Results also written as JSON
+Scripts are found as Cryptopals_challenges_Ch*/Challenge_<chapter>-<n>.py and run as __main__,
+each in a fresh process of a pool, with Challenge_txt_files as working directory so that
+their data files are found. A script passes if it runs to the end without raising: scripts that
+print a failure and end normally (ex: 4-29 printing 'Authentication error') still pass.
+Needs Python 3.11 for max_tasks_per_child, older versions run each challenge in a pool of its own.
+"""
+
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import platform
+import re
+import runpy
+import signal
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA = os.path.join(ROOT, 'Challenge_txt_files')
+
+# Challenges needing more than their script, only run when named
+NEEDS = {'4-31': 'hmac_web.py serving on 127.0.0.1:5001'}
+
+# Printed under the results, a status only reflects whether the script raised
+PASS_NOTE = 'pass means the script ended without raising, failures it only prints are not caught'
+
+
+class ChallengeTimeout(BaseException):
+    # Raised in a challenge out of time, a BaseException so that the script does not catch it
+    pass
+
+
+def discover() -> dict:
+    # Returns {challenge: path to its script}, in challenge order
+    found = {}
+    for path in glob.glob(os.path.join(ROOT, 'Cryptopals_challenges_Ch*', 'Challenge_*.py')):
+        match = re.fullmatch(r'Challenge_(\d+-\d+)\.py', os.path.basename(path))
+        if match:
+            found[match.group(1)] = path
+
+    return dict(sorted(found.items(), key=lambda item: [int(n) for n in item[0].split('-')]))
+
+def select(challenges: dict, names=()) -> dict:
+    # Challenges named by number ('3-18') or chapter ('3') in names
+    # All but those in NEEDS if names is empty
+    if not names:
+        return {c: path for c, path in challenges.items() if c not in NEEDS}
+
+    unknown = [name for name in names if not any(name in (c, c.split('-')[0]) for c in challenges)]
+    if unknown:
+        raise ValueError(f'No challenge {", ".join(unknown)}')
+
+    return {c: path for c, path in challenges.items() if c in names or c.split('-')[0] in names}
+
+def peak_rss():
+    # Peak resident set size of this process in bytes, None where the resource module is missing
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return rss if sys.platform == 'darwin' else rss * 1024  # Bytes on macOS, kilobytes elsewhere
+
+def _alarm(signum, frame):
+    raise ChallengeTimeout()
+
+def run_challenge(path: str, timeout: float = None) -> dict:
+    # Runs the script at path as __main__ in this process, returns its result
+    # Meant for a process of its own: the working directory, sys.path and peak RSS are the process's
+    os.chdir(DATA)
+    sys.path[:0] = [ROOT, os.path.dirname(path)]
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    output = io.StringIO()
+    status, error = 'pass', None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            runpy.run_path(path, run_name='__main__')
+
+    except ChallengeTimeout:
+        status, error = 'timeout', f'Over {timeout}s'
+
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            status, error = 'fail', f'SystemExit: {e.code}'
+
+    except Exception as e:
+        status, error = 'fail', ''.join(traceback.format_exception_only(type(e), e)).strip()
+
+    finally:
+        seconds = time.perf_counter() - start
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return {'status': status, 'seconds': seconds, 'peak_rss': peak_rss(), 'error': error,
+            'output': output.getvalue()}
+
+def _run_alone(path: str, timeout: float = None, context=None) -> dict:
+    # Runs a challenge in a pool of a single process, made for it
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_challenge, path, timeout).result()
+
+def run(challenges: dict, workers: int = None, timeout: float = None):
+    # Runs the challenges in a pool of workers processes, yields (challenge, result) as they finish
+    # Every challenge gets a new process (max_tasks_per_child=1), for a clean state and its own peak RSS
+    # Before Python 3.11, which has no max_tasks_per_child, workers threads each start a pool per challenge
+    context = multiprocessing.get_context('spawn')  # max_tasks_per_child does not go with fork
+    if sys.version_info >= (3, 11):
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, max_tasks_per_child=1)
+        submit = lambda path: pool.submit(run_challenge, path, timeout)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+        submit = lambda path: pool.submit(_run_alone, path, timeout, context)
+
+    with pool:
+        futures = {submit(path): c for c, path in challenges.items()}
+
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:  # Worker died, for instance killed for lack of memory
+                result = {'status': 'fail', 'seconds': None, 'peak_rss': None, 'error': repr(e), 'output': ''}
+
+            yield futures[future], result
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Runs the challenges in parallel, with timings')
+    parser.add_argument('only', nargs='*', help="challenges ('3-18') or chapters ('3') to run, default all")
+    parser.add_argument('--workers', type=int, default=None, help='processes, default one per CPU')
+    parser.add_argument('--timeout', type=float, default=300.0, help='seconds allowed per challenge')
+    parser.add_argument('--json', default=None, help='JSON file the results are written to')
+    parser.add_argument('--verbose', action='store_true', help="print each challenge's output")
+    parser.add_argument('--list', action='store_true', help='list the challenges and exit')
+    args = parser.parse_args()
+
+    try:
+        challenges = select(discover(), args.only)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.list:
+        for c, path in challenges.items():
+            print(f'{c:6} {os.path.relpath(path, ROOT)}' + (f'  (needs {NEEDS[c]})' if c in NEEDS else ''))
+        return 0
+
+    start = time.perf_counter()
+    results = {}
+    for c, result in run(challenges, args.workers, args.timeout):
+        results[c] = result
+        seconds = f'{result["seconds"]:9.3f} s' if result['seconds'] is not None else ' ' * 11
+        rss = f'{result["peak_rss"] / 2 ** 20:8.1f} MB' if result['peak_rss'] else ' ' * 11
+        print(f'{c:6} {result["status"]:8} {seconds} {rss}  {result["error"] or ""}')
+        if args.verbose and result['output']:
+            print(result['output'])
+    wall = time.perf_counter() - start
+
+    results = {c: results[c] for c in challenges}  # Back in challenge order
+    passed = sum(result['status'] == 'pass' for result in results.values())
+    print(f'\n{passed} of {len(results)} passed in {wall:.1f} s ({PASS_NOTE})')
+
+    if args.json:
+        report = {
+            'commit': git_commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'workers': args.workers or os.cpu_count(),
+            'note': PASS_NOTE,
+            'seconds': wall,
+            'results': {c: {key: value for key, value in result.items() if key != 'output'}
+                        for c, result in results.items()},
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())